@@ -13,8 +13,10 @@ https://docs.djangoproject.com/en/5.1/ref/settings/
 from pathlib import Path
 from decouple import config
 from datetime import timedelta
+from company.structured_logging import parse_levels as parse_log_levels
 
 import os
+import sys
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -91,6 +93,14 @@ TWILIO_ACCOUNT_SID = config("TWILIO_ACCOUNT_SID")
 TWILIO_AUTH_TOKEN = config("TWILIO_AUTH_TOKEN")
 TWILIO_WHATSAPP_NUMBER = config("TWILIO_WHATSAPP_NUMBER")
 
+# Outbound WhatsApp queue (whatsapp.outbox). Set WHATSAPP_OUTBOX_DISPATCH to "worker"
+# when running `manage.py run_whatsapp_outbox` processes instead of in-process threads.
+WHATSAPP_OUTBOX_DISPATCH = config("WHATSAPP_OUTBOX_DISPATCH", default="thread")
+WHATSAPP_TRANSPORT = config("WHATSAPP_TRANSPORT", default="whatsapp.transports.TwilioTransport")
+WHATSAPP_SEND_RATE_LIMIT = config("WHATSAPP_SEND_RATE_LIMIT", default=10, cast=int)
+# WhatsApp conversation state (whatsapp.sessions): DatabaseBackend, FileBackend or LocalBackend.
+WHATSAPP_SESSION_BACKEND = config("WHATSAPP_SESSION_BACKEND", default="whatsapp.sessions.DatabaseBackend")
+
 
 
 
@@ -118,6 +128,7 @@ INSTALLED_APPS = [
     'company',
     'bsf',
     'catFishFarm',
+    'whatsapp',
 
     # Third Party
     'rest_framework',
@@ -186,6 +197,7 @@ SIMPLE_JWT = {
 }
 
 MIDDLEWARE = [
+    'company.instrumentation.InstrumentationMiddleware',  # Per-request query/cache/HTTP counters and latency
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -200,6 +212,40 @@ MIDDLEWARE = [
     'django_otp.middleware.OTPMiddleware',
 ]
 
+# Request instrumentation (company.instrumentation)
+SLOW_REQUEST_MS = config('SLOW_REQUEST_MS', default=1000, cast=int)
+SLOW_REQUEST_SAMPLE_RATE = config('SLOW_REQUEST_SAMPLE_RATE', default=1.0, cast=float)
+INSTRUMENTATION_HEADERS = config('INSTRUMENTATION_HEADERS', default=DEBUG, cast=bool)
+# Views decorated with @query_budget raise when over budget, so CI catches query regressions.
+QUERY_BUDGETS_ENFORCED = config('QUERY_BUDGETS_ENFORCED', default='test' in sys.argv, cast=bool)
+
+# Logging: records go through company.structured_logging.QueuedStreamHandler, which writes
+# from a background thread. LOG_LEVELS sets per-module levels, e.g. "bsf.views=DEBUG,company=WARNING".
+LOG_LEVEL = config('LOG_LEVEL', default='DEBUG' if DEBUG else 'INFO')
+LOG_FORMAT = config('LOG_FORMAT', default='json')  # "json" or "text"
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'json': {'()': 'company.structured_logging.StructuredFormatter'},
+        'text': {'format': '%(asctime)s %(levelname)s %(name)s: %(message)s'},
+    },
+    'handlers': {
+        'console': {
+            '()': 'company.structured_logging.QueuedStreamHandler',
+            'stream': 'ext://sys.stdout',
+            'formatter': LOG_FORMAT,
+        },
+    },
+    'root': {'handlers': ['console'], 'level': LOG_LEVEL},
+    'loggers': {
+        'django': {'level': config('DJANGO_LOG_LEVEL', default='INFO')},
+        'django.db.backends': {'level': 'INFO'},  # SQL is counted by company.instrumentation instead
+        **parse_log_levels(config('LOG_LEVELS', default='')),
+    },
+}
+
 # Optional settings for 2FA
 TWO_FACTOR_REMEMBER_COOKIE_AGE = 1209600  # 2 weeks
 TWO_FACTOR_QR_FACTORY = 'qrcode.image.pil.PilImage'
@@ -246,6 +292,38 @@ DATABASES = {
         'PASSWORD': config('DB_PASSWORD'),
         'HOST': config('DB_HOST', default='localhost'),
         'PORT': config('DB_PORT', default='3306'),
+        # Persistent connections: reuse a worker's connection across requests instead of
+        # reconnecting every time; health checks drop connections the server has closed.
+        'CONN_MAX_AGE': config('DB_CONN_MAX_AGE', default=60, cast=int),
+        'CONN_HEALTH_CHECKS': config('DB_CONN_HEALTH_CHECKS', default=True, cast=bool),
+    }
+}
+
+# Number of web worker processes (gunicorn/uwsgi workers) serving this settings file.
+# Used by the startup self-check in company.checks to catch caches the workers cannot share safely.
+WEB_CONCURRENCY = config('WEB_CONCURRENCY', default=1, cast=int)
+
+# Cache shared by every worker (permission cache, WhatsApp login state, outbox rate limit).
+#   redis     - CACHE_LOCATION=redis://host:6379/1; multi-host deployments (needs the redis package)
+#   memcached - CACHE_LOCATION=host:11211; multi-host deployments (needs pymemcache)
+#   database  - cache table in MySQL; single-box installs (run `manage.py createcachetable`)
+#   file      - CACHE_LOCATION directory; one worker only (incr() is not atomic across processes)
+#   locmem    - per-process; development with one worker only
+CACHE_BACKEND = config('CACHE_BACKEND', default='file')
+CACHE_BACKENDS = {
+    'redis': ('django.core.cache.backends.redis.RedisCache', 'redis://127.0.0.1:6379/1'),
+    'memcached': ('django.core.cache.backends.memcached.PyMemcacheCache', '127.0.0.1:11211'),
+    'database': ('django.core.cache.backends.db.DatabaseCache', 'django_cache'),
+    'file': ('django.core.cache.backends.filebased.FileBasedCache', os.path.join(BASE_DIR, 'var', 'cache')),
+    'locmem': ('django.core.cache.backends.locmem.LocMemCache', 'backend'),
+}
+
+CACHES = {
+    'default': {
+        'BACKEND': CACHE_BACKENDS[CACHE_BACKEND][0],
+        'LOCATION': config('CACHE_LOCATION', default=CACHE_BACKENDS[CACHE_BACKEND][1]),
+        'TIMEOUT': config('CACHE_TIMEOUT', default=300, cast=int),
+        'KEY_PREFIX': config('CACHE_KEY_PREFIX', default='backend'),
     }
 }
 
@@ -270,9 +348,17 @@ AUTH_PASSWORD_VALIDATORS = [
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
-FILE_UPLOAD_MAX_MEMORY_SIZE = 104857600
-
-#FILE_UPLOAD_TEMP_DIR = "C:\Users\uprin\Documents\PHYTON\temp"
+# Uploads are received by company.uploads.StreamingUploadHandler: files up to FILE_UPLOAD_MAX_MEMORY_SIZE
+# stay in memory, larger ones are written to FILE_UPLOAD_TEMP_DIR chunk by chunk and hashed on the way.
+# Keep FILE_UPLOAD_TEMP_DIR on the same filesystem as MEDIA_ROOT so storing an upload is a rename, not a copy.
+FILE_UPLOAD_HANDLERS = ['company.uploads.StreamingUploadHandler']
+FILE_UPLOAD_MAX_MEMORY_SIZE = config('FILE_UPLOAD_MAX_MEMORY_SIZE', default=512 * 1024, cast=int)
+FILE_UPLOAD_TEMP_DIR = config('FILE_UPLOAD_TEMP_DIR', default=os.path.join(BASE_DIR, 'var', 'uploads'))
+if FILE_UPLOAD_TEMP_DIR:
+    os.makedirs(FILE_UPLOAD_TEMP_DIR, exist_ok=True)  # Django's files.E001 check requires it to exist
+MEDIA_UPLOAD_CHUNK_SIZE = config('MEDIA_UPLOAD_CHUNK_SIZE', default=64 * 1024, cast=int)
+MEDIA_UPLOAD_MAX_FILE_SIZE = config('MEDIA_UPLOAD_MAX_FILE_SIZE', default=250 * 1024 * 1024, cast=int)  # Per file
+MEDIA_UPLOAD_MAX_REQUEST_SIZE = config('MEDIA_UPLOAD_MAX_REQUEST_SIZE', default=500 * 1024 * 1024, cast=int)  # All files of a request
 
 
 
@@ -0,0 +1,45 @@
+"""
+Settings for `manage.py benchmark_api` (company.benchmarks).
+
+Runs the API benchmark on a throwaway SQLite database with no external
+services: no MySQL, no Twilio, no SMTP and no shared cache. Usage:
+
+    python manage.py benchmark_api --settings=backend.settings_benchmark
+"""
+
+import os
+import tempfile
+
+# Secrets and service settings the base settings require but the benchmark never uses.
+for name, value in {
+    'SECRET_KEY': 'benchmark-only-secret-key',
+    'TWILIO_ACCOUNT_SID': 'benchmark',
+    'TWILIO_AUTH_TOKEN': 'benchmark',
+    'TWILIO_WHATSAPP_NUMBER': '+10000000000',
+    'EMAIL_HOST_USER': 'benchmark@example.com',
+    'EMAIL_HOST_PASSWORD': 'benchmark',
+    'DB_NAME': 'benchmark',
+    'DB_USER': 'benchmark',
+    'DB_PASSWORD': 'benchmark',
+    'CACHE_BACKEND': 'locmem',
+    'WHATSAPP_OUTBOX_DISPATCH': 'worker',  # Queue outbound messages, never send them
+    'WHATSAPP_TRANSPORT': 'whatsapp.transports.FakeTransport',
+    'LOG_LEVEL': 'WARNING',
+    'QUERY_BUDGETS_ENFORCED': 'False',  # Over-budget views are reported by the benchmark, not raised
+}.items():
+    os.environ.setdefault(name, value)
+
+from .settings import *  # noqa: E402,F401,F403
+
+# The benchmark creates and destroys its own test database (in memory for SQLite).
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.path.join(BASE_DIR, 'var', 'benchmark.sqlite3'),
+        'TEST': {'NAME': None},
+    }
+}
+
+EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+MEDIA_ROOT = os.path.join(tempfile.gettempdir(), 'backend-benchmark-media')
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']  # Seeding creates many users
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import StaffMember, Farm, Net, Batch, DurationSettings, Pond, NetUseStats, PondUseStats
+from .models import StaffMember, Farm, Net, Batch, BatchNameSequence, DurationSettings, Pond, NetUseStats, PondUseStats
 
 @admin.register(Farm)
 class FarmAdmin(admin.ModelAdmin):
@@ -52,6 +52,13 @@ class BatchAdmin(admin.ModelAdmin):
     readonly_fields = ("batch_name", "created_at")
 
 
+@admin.register(BatchNameSequence)
+class BatchNameSequenceAdmin(admin.ModelAdmin):
+    list_display = ("farm", "next_value", "updated_at")
+    search_fields = ("farm__name",)
+    readonly_fields = ("updated_at",)
+
+
 @admin.register(DurationSettings)
 class DurationSettingsAdmin(admin.ModelAdmin):
     list_display = ["id", "company", "farm", "laying_duration", "nursery_duration", "incubation_duration"]
@@ -0,0 +1,94 @@
+from django.apps import apps
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils.timezone import now
+import re
+
+
+# Batches per letter prefix: A1 ... A10, B1 ... B10, ..., Z10, AA1 ...
+NUMBERS_PER_PREFIX = 10
+
+_BATCH_NAME = re.compile(r"^([A-Z]+)(\d+)$")
+
+
+def _prefix(index):
+    # Bijective base 26: 0 -> A, 25 -> Z, 26 -> AA, 27 -> AB, ...
+    letters = ""
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(ord("A") + remainder) + letters
+    return letters
+
+
+def batch_name(sequence):
+    """
+    Name of the batch with 0-based position `sequence` in its farm: 0 -> A1, 9 -> A10, 10 -> B1.
+    """
+    prefix_index, number = divmod(sequence, NUMBERS_PER_PREFIX)
+    return f"{_prefix(prefix_index)}{number + 1}"
+
+
+def parse_batch_name(name):
+    """
+    Inverse of batch_name(); None for names outside the scheme.
+    """
+    match = _BATCH_NAME.match((name or "").strip().upper())
+    if not match:
+        return None
+    letters, number = match.group(1), int(match.group(2))
+    if not 1 <= number <= NUMBERS_PER_PREFIX:
+        return None
+    prefix_index = 0
+    for letter in letters:
+        prefix_index = prefix_index * 26 + ord(letter) - ord("A") + 1
+    return (prefix_index - 1) * NUMBERS_PER_PREFIX + number - 1
+
+
+def _seed_value(farm_id):
+    # First allocation for a farm without a sequence row: continue after its highest existing name.
+    Batch = apps.get_model("bsf", "Batch")
+    used = [parse_batch_name(name) for name in Batch.objects.filter(farm_id=farm_id).values_list("batch_name", flat=True)]
+    return max((sequence for sequence in used if sequence is not None), default=-1) + 1
+
+
+def reserve_batch_names(farm_id, count=1):
+    """
+    Atomically reserve the next `count` batch names of a farm.
+
+    One conditional UPDATE advances the farm's BatchNameSequence row; the row
+    stays locked until the surrounding transaction ends, so concurrent
+    callers always get disjoint ranges. Reserved names that end up unused
+    (e.g. a rolled-back import) are simply skipped.
+    """
+    BatchNameSequence = apps.get_model("bsf", "BatchNameSequence")
+    if count < 1:
+        return []
+
+    with transaction.atomic():
+        sequences = BatchNameSequence.objects.filter(farm_id=farm_id)
+        if not sequences.update(next_value=F("next_value") + count, updated_at=now()):
+            try:
+                with transaction.atomic():
+                    BatchNameSequence.objects.create(farm_id=farm_id, next_value=_seed_value(farm_id) + count)
+            except IntegrityError:
+                # Another request created the row first; take the next range from it.
+                sequences.update(next_value=F("next_value") + count, updated_at=now())
+        end = sequences.values_list("next_value", flat=True).get()
+    return [batch_name(sequence) for sequence in range(end - count, end)]
+
+
+def next_batch_name(farm_id):
+    return reserve_batch_names(farm_id, 1)[0]
+
+
+def note_batch_name(farm_id, name):
+    """
+    Move a farm's sequence past an explicitly chosen name so it is never handed out again.
+    """
+    BatchNameSequence = apps.get_model("bsf", "BatchNameSequence")
+    sequence = parse_batch_name(name)
+    if sequence is not None:
+        BatchNameSequence.objects.filter(farm_id=farm_id, next_value__lte=sequence).update(
+            next_value=sequence + 1, updated_at=now()
+        )
@@ -0,0 +1,84 @@
+from difflib import SequenceMatcher
+from django.apps import apps
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
+from django.db.models.functions import Length
+import re
+import unicodedata
+
+
+SIMILARITY_THRESHOLD = getattr(settings, "FARM_NAME_SIMILARITY_THRESHOLD", 0.8)
+# Candidates (by shared trigrams) that are compared exactly with SequenceMatcher.
+MAX_CANDIDATES = getattr(settings, "FARM_NAME_MAX_CANDIDATES", 25)
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+
+
+def normalize_name(name):
+    """
+    Lowercase, strip accents and collapse punctuation/whitespace runs to single spaces.
+    """
+    text = unicodedata.normalize("NFKD", name or "")
+    text = "".join(char for char in text if not unicodedata.combining(char)).lower()
+    return _NON_ALNUM.sub(" ", text).strip()
+
+
+def trigrams(normalized):
+    """
+    Character trigrams of a normalized name, padded so short names still produce some.
+    """
+    padded = f"  {normalized} "
+    return {padded[index:index + 3] for index in range(len(padded) - 2)}
+
+
+def similarity(a, b):
+    return SequenceMatcher(None, a, b).ratio()
+
+
+def find_similar_farms(company_id, name, exclude_pk=None, threshold=SIMILARITY_THRESHOLD):
+    """
+    Farms of a company whose normalized name is at least `threshold` similar to `name`.
+
+    Candidates come from the FarmNameTrigram index: farms sharing a trigram with
+    the name and whose name length can still reach the threshold. Of those, only
+    the MAX_CANDIDATES with the most shared trigrams are compared exactly, so a save
+    never scans every farm of the company. Returns [(farm, ratio)], best first.
+    """
+    FarmNameTrigram = apps.get_model("bsf", "FarmNameTrigram")
+    Farm = apps.get_model("bsf", "Farm")
+
+    normalized = normalize_name(name)
+    if not normalized:
+        return []
+    # SequenceMatcher.ratio() is at most 2 * min(len) / (len_a + len_b).
+    min_length = int(len(normalized) * threshold / (2 - threshold))
+    max_length = int(len(normalized) * (2 - threshold) / threshold) + 1
+
+    # The length bound is applied before ranking, so long names that cannot reach
+    # the threshold never take a candidate slot from a real near-duplicate.
+    candidates = FarmNameTrigram.objects.filter(company_id=company_id, trigram__in=trigrams(normalized)).alias(
+        name_length=Length("farm__normalized_name")
+    ).filter(name_length__gte=min_length, name_length__lte=max_length)
+    if exclude_pk is not None:
+        candidates = candidates.exclude(farm_id=exclude_pk)
+    farm_ids = list(
+        candidates.values("farm_id").annotate(shared=Count("id")).order_by("-shared").values_list("farm_id", flat=True)[:MAX_CANDIDATES]
+    )
+    farms = Farm.objects.filter(pk__in=farm_ids).only("id", "name", "normalized_name", "company_id")
+
+    matches = [(farm, similarity(normalized, farm.normalized_name)) for farm in farms]
+    return sorted([match for match in matches if match[1] > threshold], key=lambda match: -match[1])
+
+
+def index_farm(farm):
+    """
+    Replace a farm's trigram rows with those of its current normalized name.
+    """
+    FarmNameTrigram = apps.get_model("bsf", "FarmNameTrigram")
+    with transaction.atomic():
+        FarmNameTrigram.objects.filter(farm_id=farm.pk).delete()
+        FarmNameTrigram.objects.bulk_create([
+            FarmNameTrigram(farm_id=farm.pk, company_id=farm.company_id, trigram=trigram)
+            for trigram in trigrams(farm.normalized_name)
+        ])
@@ -0,0 +1,61 @@
+from concurrent.futures import ThreadPoolExecutor
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+import time
+
+from bsf import batch_names
+from bsf.models import Farm
+
+
+class Command(BaseCommand):
+    help = (
+        "Reserve batch names for one farm from concurrent threads and report throughput, "
+        "latency and any duplicate or skipped names. Reserved names are consumed, so run it "
+        "against a test farm."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("farm", type=int, help="Farm id whose sequence is used.")
+        parser.add_argument("--threads", type=int, default=8)
+        parser.add_argument("--reservations", type=int, default=50, help="Reservations made by each thread.")
+        parser.add_argument("--count", type=int, default=1, help="Names per reservation (bulk reservation size).")
+
+    def handle(self, *args, **options):
+        for option in ("threads", "reservations", "count"):
+            if options[option] < 1:
+                raise CommandError(f"--{option} must be at least 1.")
+        if not Farm.objects.filter(pk=options["farm"]).exists():
+            raise CommandError(f"Farm {options['farm']} does not exist.")
+
+        def worker(_):
+            names, latencies = [], []
+            try:
+                for _ in range(options["reservations"]):
+                    started = time.perf_counter()
+                    names.extend(batch_names.reserve_batch_names(options["farm"], options["count"]))
+                    latencies.append(time.perf_counter() - started)
+            finally:
+                close_old_connections()
+            return names, latencies
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options["threads"]) as executor:
+            results = list(executor.map(worker, range(options["threads"])))
+        elapsed = time.perf_counter() - started
+
+        names = [name for result in results for name in result[0]]
+        latencies = sorted(latency for result in results for latency in result[1])
+        sequences = sorted(batch_names.parse_batch_name(name) for name in names)
+        duplicates = len(names) - len(set(names))
+        gaps = (sequences[-1] - sequences[0] + 1 - len(set(sequences))) if sequences else 0
+
+        self.stdout.write(
+            f"{len(latencies)} reservation(s), {len(names)} name(s) in {elapsed:.2f}s "
+            f"({len(latencies) / elapsed:.0f} reservations/s); "
+            f"p50 {latencies[len(latencies) // 2] * 1000:.1f} ms, "
+            f"p99 {latencies[min(int(len(latencies) * 0.99), len(latencies) - 1)] * 1000:.1f} ms; "
+            f"range {names and batch_names.batch_name(sequences[0])} - {names and batch_names.batch_name(sequences[-1])}"
+        )
+        if duplicates or gaps:
+            raise CommandError(f"{duplicates} duplicate and {gaps} skipped name(s) across threads.")
+        self.stdout.write(self.style.SUCCESS("No duplicate or skipped names."))
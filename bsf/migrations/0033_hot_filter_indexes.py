@@ -0,0 +1,24 @@
+# Generated by Django 5.1.3 on 2026-10-16 21:03
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bsf', '0032_remove_farm_branch'),
+        ('company', '0052_hot_filter_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='netusestats',
+            index=models.Index(fields=['net', 'stats'], name='bsf_netuses_net_id_fc2f7a_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pondusestats',
+            index=models.Index(fields=['pond', 'status'], name='bsf_ponduse_pond_id_6e4cfc_idx'),
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.1.3 on 2026-10-16 22:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_farm_names(apps, schema_editor):
+    from bsf.farm_names import normalize_name, trigrams
+
+    Farm = apps.get_model('bsf', 'Farm')
+    FarmNameTrigram = apps.get_model('bsf', 'FarmNameTrigram')
+    for farm in Farm.objects.only('id', 'name', 'company_id').iterator():
+        normalized = normalize_name(farm.name)
+        Farm.objects.filter(pk=farm.pk).update(normalized_name=normalized)
+        FarmNameTrigram.objects.bulk_create([
+            FarmNameTrigram(farm_id=farm.pk, company_id=farm.company_id, trigram=trigram)
+            for trigram in trigrams(normalized)
+        ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bsf', '0033_hot_filter_indexes'),
+        ('company', '0055_recurring_task_scheduler'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='farm',
+            name='normalized_name',
+            field=models.CharField(blank=True, editable=False, help_text='Lowercased, accent- and punctuation-free name used for similarity checks.', max_length=255),
+        ),
+        migrations.AddIndex(
+            model_name='farm',
+            index=models.Index(fields=['company', 'normalized_name'], name='bsf_farm_company_985b48_idx'),
+        ),
+        migrations.CreateModel(
+            name='FarmNameTrigram',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('trigram', models.CharField(max_length=3)),
+                ('company', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='farm_name_trigrams', to='company.company')),
+                ('farm', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='name_trigrams', to='bsf.farm')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['company', 'trigram'], name='bsf_farmnam_company_a3710a_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_farm_names, migrations.RunPython.noop),
+    ]
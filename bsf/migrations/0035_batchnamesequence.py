@@ -0,0 +1,39 @@
+# Generated by Django 5.1.3 on 2026-10-16 22:55
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def seed_sequences(apps, schema_editor):
+    from bsf.batch_names import parse_batch_name
+
+    Batch = apps.get_model('bsf', 'Batch')
+    BatchNameSequence = apps.get_model('bsf', 'BatchNameSequence')
+    next_values = {}
+    for farm_id, name in Batch.objects.values_list('farm_id', 'batch_name').iterator():
+        sequence = parse_batch_name(name)
+        if sequence is not None:
+            next_values[farm_id] = max(next_values.get(farm_id, 0), sequence + 1)
+    BatchNameSequence.objects.bulk_create(
+        [BatchNameSequence(farm_id=farm_id, next_value=value) for farm_id, value in next_values.items()],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bsf', '0034_farm_name_trigrams'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BatchNameSequence',
+            fields=[
+                ('farm', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='batch_name_sequence', serialize=False, to='bsf.farm')),
+                ('next_value', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(seed_sequences, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.1.3 on 2026-10-16 23:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_current_use(apps, schema_editor):
+    # Latest ongoing use per net/pond; older duplicates from before the guard stay as they are.
+    for resource_model, use_model, resource_field, status_field, ongoing in (
+        ('Net', 'NetUseStats', 'net', 'stats', 'ongoing'),
+        ('Pond', 'PondUseStats', 'pond', 'status', 'Ongoing'),
+    ):
+        Resource = apps.get_model('bsf', resource_model)
+        Use = apps.get_model('bsf', use_model)
+        current = {}
+        for use_id, resource_id in Use.objects.filter(**{status_field: ongoing}).order_by('id').values_list('id', f'{resource_field}_id'):
+            current[resource_id] = use_id
+        for resource_id, use_id in current.items():
+            Resource.objects.filter(pk=resource_id).update(current_use_id=use_id)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bsf', '0035_batchnamesequence'),
+        ('company', '0055_recurring_task_scheduler'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='net',
+            name='current_use',
+            field=models.OneToOneField(blank=True, editable=False, help_text='Ongoing NetUseStats occupying the Net; empty while the Net is available.', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='occupied_net', to='bsf.netusestats'),
+        ),
+        migrations.AddField(
+            model_name='pond',
+            name='current_use',
+            field=models.OneToOneField(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='occupied_pond', to='bsf.pondusestats', verbose_name='Current Use'),
+        ),
+        migrations.AddIndex(
+            model_name='net',
+            index=models.Index(fields=['branch', 'current_use'], name='bsf_net_branch__11a1eb_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pond',
+            index=models.Index(fields=['farm', 'status', 'current_use'], name='bsf_pond_farm_id_78d89e_idx'),
+        ),
+        migrations.RunPython(backfill_current_use, migrations.RunPython.noop),
+    ]
@@ -1,9 +1,9 @@
 # models.py
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth import get_user_model
 from company.models import Company, Branch
 from django.core.exceptions import ValidationError
-from difflib import SequenceMatcher
+from . import batch_names, farm_names, occupancy
 from django.utils.timezone import now
 
 User = get_user_model()
@@ -35,29 +35,79 @@ class Farm(models.Model):
     )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    normalized_name = models.CharField(max_length=255, blank=True, editable=False, help_text="Lowercased, accent- and punctuation-free name used for similarity checks.")
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["company", "normalized_name"]),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored name so clean()/save() can tell whether it changed
+        instance._loaded_name = instance.__dict__.get('name')
+        instance._loaded_company_id = instance.__dict__.get('company_id')
+        return instance
+
+    def name_changed(self):
+        return (
+            self._state.adding
+            or self.name != getattr(self, '_loaded_name', None)
+            or self.company_id != getattr(self, '_loaded_company_id', None)
+        )
 
     def clean(self):
+        # Names are only checked when they change; status or contact updates skip the lookups.
+        if not self.name_changed():
+            return
+
         # Ensure unique farm name within the same company and location
-        if Farm.objects.filter(name=self.name, company=self.company, location=self.location).exists():
+        if Farm.objects.filter(name=self.name, company=self.company, location=self.location).exclude(pk=self.pk).exists():
             raise ValidationError(f"A farm with the name '{self.name}' already exists in this company and location.")
 
         # Warn about closely matching names
-        farms_in_company = Farm.objects.filter(company=self.company)
-        for farm in farms_in_company:
-            similarity = SequenceMatcher(None, self.name.lower(), farm.name.lower()).ratio()
-            if similarity > 0.8:  # Threshold for similarity warning
-                raise ValidationError(
-                    f"The name '{self.name}' is very similar to an existing farm: '{farm.name}'."
-                )
+        similar = farm_names.find_similar_farms(self.company_id, self.name, exclude_pk=self.pk)
+        if similar:
+            raise ValidationError(
+                f"The name '{self.name}' is very similar to an existing farm: '{similar[0][0].name}'."
+            )
 
     def save(self, *args, **kwargs):
         self.full_clean()  # Trigger the clean method before saving
+        reindex = self.name_changed()
+        if reindex:
+            self.normalized_name = farm_names.normalize_name(self.name)
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None:
+                kwargs['update_fields'] = set(update_fields) | {'normalized_name'}
         super().save(*args, **kwargs)
+        if reindex:
+            farm_names.index_farm(self)
+        self._loaded_name = self.name
+        self._loaded_company_id = self.company_id
 
     def __str__(self):
         return f"{self.name} - {self.company.name} ({self.status})"
 
 
+class FarmNameTrigram(models.Model):
+    """
+    Character trigram of a farm's normalized name; maintained by bsf.farm_names.index_farm.
+    """
+    farm = models.ForeignKey(Farm, on_delete=models.CASCADE, related_name="name_trigrams")
+    company = models.ForeignKey(Company, on_delete=models.CASCADE, related_name="farm_name_trigrams")
+    trigram = models.CharField(max_length=3)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["company", "trigram"]),
+        ]
+
+    def __str__(self):
+        return f"{self.trigram!r} - farm {self.farm_id}"
+
+
 class StaffMember(models.Model):
     STATUS_CHOICES = [
         ('active', 'Active'),
@@ -127,6 +177,10 @@ class Net(models.Model):  # New model for Black Soldier Fly's Love Cage
     farm = models.ForeignKey(
         Farm, on_delete=models.CASCADE, related_name="nets", help_text="The farm to which the Net is assigned."
     )
+    current_use = models.OneToOneField(
+        "NetUseStats", null=True, blank=True, editable=False, on_delete=models.SET_NULL, related_name="occupied_net",
+        help_text="Ongoing NetUseStats occupying the Net; empty while the Net is available."
+    )
 
     def __str__(self):
         return f"{self.name} (Farm: {self.farm.name}, Company: {self.company.name})"
@@ -135,6 +189,9 @@ class Net(models.Model):  # New model for Black Soldier Fly's Love Cage
         verbose_name = "Net"
         verbose_name_plural = "Nets"
         unique_together = ('name', 'farm', 'company')  # Ensure unique Net name within the same farm and company
+        indexes = [
+            models.Index(fields=["branch", "current_use"]),  # Available nets per branch
+        ]
 
 
 class Batch(models.Model):
@@ -202,40 +259,28 @@ class Batch(models.Model):
     def save(self, *args, **kwargs):
         if not self.batch_name:
             self.batch_name = self.generate_batch_name()
+        elif self._state.adding:
+            batch_names.note_batch_name(self.farm_id, self.batch_name)
         super().save(*args, **kwargs)
 
     def generate_batch_name(self):
         """
-        Generates a unique batch name based on the farm.
-        Follows the pattern: A1, A2 ... A10, B1, B2 ... AB10
-        """
-        last_batch = Batch.objects.filter(farm=self.farm).order_by("created_at").last()
-        if not last_batch:
-            return "A1"
-
-        # Extract prefix and number from the last batch name
-        last_name = last_batch.batch_name
-        prefix, number = last_name[:-1], int(last_name[-1])
-
-        if number < 10:
-            return f"{prefix}{number + 1}"
-        else:
-            # Increment prefix (e.g., AA -> AB)
-            new_prefix = self.increment_prefix(prefix)
-            return f"{new_prefix}1"
-
-    @staticmethod
-    def increment_prefix(prefix):
+        Reserves the farm's next batch name from its BatchNameSequence.
+        Follows the pattern: A1, A2 ... A10, B1, B2 ... Z10, AA1 ...
         """
-        Increments the prefix alphabetically (e.g., A -> Z, AZ -> BA)
-        """
-        prefix_list = list(prefix)
-        for i in range(len(prefix_list) - 1, -1, -1):
-            if prefix_list[i] != "Z":
-                prefix_list[i] = chr(ord(prefix_list[i]) + 1)
-                break
-            prefix_list[i] = "A"
-        return "".join(prefix_list)
+        return batch_names.next_batch_name(self.farm_id)
+
+
+class BatchNameSequence(models.Model):
+    """
+    Position of the next batch name of a farm; advanced by bsf.batch_names.reserve_batch_names.
+    """
+    farm = models.OneToOneField(Farm, on_delete=models.CASCADE, primary_key=True, related_name="batch_name_sequence")
+    next_value = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.farm_id} - next {batch_names.batch_name(self.next_value)}"
 
 
 class DurationSettings(models.Model):
@@ -294,6 +339,26 @@ class NetUseStats(models.Model):
     created_at = models.DateField(null=True, blank=True)
     updated_at = models.DateField(null=True, blank=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["net", "stats"]),  # Net occupancy checks
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_occupancy = (instance.__dict__.get('net_id'), instance.__dict__.get('stats'))
+        return instance
+
+    def save(self, *args, **kwargs):
+        # Keep Net.current_use in step with ongoing uses; a net held by another use rejects the save.
+        if (self.net_id, self.stats) == getattr(self, '_loaded_occupancy', None):
+            return super().save(*args, **kwargs)
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            occupancy.sync_occupancy(self, "net", self.stats == "ongoing")
+        self._loaded_occupancy = (self.net_id, self.stats)
+
     def __str__(self):
         return f"NetUseStats for {self.net.name} in Batch {self.batch.batch_name}"
 
@@ -341,6 +406,10 @@ class Pond(models.Model):
     farm = models.ForeignKey(Farm, on_delete=models.CASCADE, related_name='ponds', verbose_name="Farm")
     company = models.ForeignKey(Company, on_delete=models.CASCADE, related_name='ponds', verbose_name="Company")
     created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, verbose_name="Created By")
+    current_use = models.OneToOneField(
+        "PondUseStats", null=True, blank=True, editable=False, on_delete=models.SET_NULL, related_name="occupied_pond",
+        verbose_name="Current Use"
+    )  # Ongoing PondUseStats occupying the pond; empty while it is available
 
     # Timestamps
     created_date = models.DateTimeField(auto_now_add=True, verbose_name="Created Date")
@@ -352,6 +421,9 @@ class Pond(models.Model):
                 name='unique_pond_name_per_farm_and_company'
             )
         ]
+        indexes = [
+            models.Index(fields=["farm", "status", "current_use"]),  # Available ponds per farm
+        ]
         verbose_name = "Pond"
         verbose_name_plural = "Ponds"
 
@@ -405,12 +477,27 @@ class PondUseStats(models.Model):
     class Meta:
         verbose_name = "Pond Use Stats"
         verbose_name_plural = "Pond Use Stats"
+        indexes = [
+            models.Index(fields=["pond", "status"]),  # Pond occupancy checks
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_occupancy = (instance.__dict__.get('pond_id'), instance.__dict__.get('status'))
+        return instance
 
     def save(self, *args, **kwargs):
         # Automatically set pond_name from the associated Pond instance
         if not self.pond_name:
             self.pond_name = getattr(self.pond, 'pond_name', 'Unknown Pond')
-        super().save(*args, **kwargs)
+        # Keep Pond.current_use in step with ongoing uses; a pond held by another use rejects the save.
+        if (self.pond_id, self.status) == getattr(self, '_loaded_occupancy', None):
+            return super().save(*args, **kwargs)
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            occupancy.sync_occupancy(self, "pond", self.status == "Ongoing")
+        self._loaded_occupancy = (self.pond_id, self.status)
 
     def __str__(self):
         return f"{self.pond_name} - {self.harvest_stage} ({self.start_date})"
@@ -0,0 +1,271 @@
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import Case, Max, Value, When
+import math
+import os
+
+from company.media_ingestion import enqueue_media_ingestion
+from company.models import Media
+from company.task_completion import completion_entry
+from company.uploads import store_upload, upload_checksum
+
+from .models import Net, NetUseStats
+
+
+class BulkIngestionError(Exception):
+    """
+    A bulk lay-start/lay-end submission was rejected; nothing was written.
+
+    `failures` lists {"index", "field", "error"} for every entry that failed.
+    """
+
+    def __init__(self, failures):
+        self.failures = failures
+        super().__init__(f"{len(failures)} entr{'y' if len(failures) == 1 else 'ies'} failed validation.")
+
+
+def _failure(index, field, error):
+    return {"index": index, "field": field, "error": error}
+
+
+def _numeric(value):
+    return value is not None and str(value).strip().isdigit()
+
+
+def _weight(value):
+    """
+    A submitted weight as a non-negative float (missing counts as 0), or None when it is not one.
+    """
+    if value is None or str(value).strip() == "":
+        return 0.0
+    try:
+        weight = float(value)
+    except (TypeError, ValueError):
+        return None
+    return weight if math.isfinite(weight) and weight >= 0 else None
+
+
+def laying_rating(harvested, expected):
+    """
+    NetUseStats.laying_ratting for a harvest against the net's expected harvest.
+    """
+    if not expected:
+        return NetUseStats._meta.get_field("laying_ratting").default
+    score = float(harvested) / float(expected) * 100
+    if score >= 90:
+        return "outstanding"
+    if score >= 75:
+        return "exceeds_expectation"
+    if score >= 50:
+        return "satisfactory"
+    if score >= 25:
+        return "unsatisfactory"
+    return "poor"
+
+
+class NetUseIngestion:
+    """
+    Bulk mode of NetUseStatsListCreateView: every net_<i> entry of one submission at once.
+
+    All entries are validated up front with one query for the nets (or
+    NetUseStats rows) and their occupancy. Only when every entry is valid are
+    the rows written, with bulk_create/bulk_update and a single conditional
+    UPDATE of Net.current_use, inside one transaction together with the media
+    rows. Media files go through company.uploads.store_upload, so they are
+    moved (spooled uploads) or copied in chunks instead of read into memory.
+    Any failure raises BulkIngestionError naming the failing indexes and
+    leaves the database and storage as they were.
+    """
+
+    def __init__(self, request, company, branch, farm, batch, common_data):
+        self.data = request.data
+        self.files = request.FILES
+        self.user = request.user
+        self.company = company
+        self.branch = branch
+        self.farm = farm
+        self.batch = batch
+        self.common_data = common_data
+        self.completion_entries = []
+
+    def _indexes(self):
+        index = 0
+        while f"net_{index}" in self.data:
+            yield index
+            index += 1
+
+    def lay_starts(self):
+        """
+        Start a NetUseStats row on every submitted net. Returns the rows in index order.
+        """
+        entries, failures, seen = [], [], {}
+        for index in self._indexes():
+            net_id, lay_start = self.data.get(f"net_{index}"), self.data.get(f"startDate_{index}")
+            if not _numeric(net_id):
+                failures.append(_failure(index, f"net_{index}", "A numeric net id is required."))
+            elif not lay_start:
+                failures.append(_failure(index, f"startDate_{index}", "Start date is required."))
+            elif int(net_id) in seen:
+                failures.append(_failure(index, f"net_{index}", f"Net {net_id} is also submitted at index {seen[int(net_id)]}."))
+            else:
+                seen[int(net_id)] = index
+                entries.append((index, int(net_id), lay_start))
+
+        # One query validates every net and reads its occupancy (Net.current_use).
+        nets = Net.objects.filter(pk__in=seen, company=self.company, farm=self.farm).only("id", "name", "current_use").in_bulk()
+        for index, net_id, _ in entries:
+            net = nets.get(net_id)
+            if net is None:
+                failures.append(_failure(index, f"net_{index}", f"Net {net_id} does not exist in this farm."))
+            elif net.current_use_id:
+                failures.append(_failure(
+                    index, f"net_{index}", f"Net {net.name} is already in use with ongoing status. by batch {self.batch.batch_name}"
+                ))
+        if failures:
+            raise BulkIngestionError(sorted(failures, key=lambda failure: failure["index"]))
+
+        with transaction.atomic():
+            rows = NetUseStats.objects.bulk_create([
+                NetUseStats(
+                    batch=self.batch, farm=self.farm, company=self.company, net_id=net_id,
+                    lay_start=lay_start, created_by=self.user,
+                )
+                for _, net_id, lay_start in entries
+            ])
+            self._assign_pks(rows)
+            self._claim_nets(rows, seen)
+            indexed = [(index, row) for (index, _, _), row in zip(entries, rows)]
+            self._store_media(indexed)
+
+        for _, row in indexed:
+            self.completion_entries.append(completion_entry(
+                self.common_data["appName"], self.common_data["modelName"], row.pk, self.common_data["activity"], ["lay_start"]
+            ))
+        return rows
+
+    def lay_ends(self):
+        """
+        Complete the ongoing NetUseStats row of every entry (modelID_<i>) and free its net. Returns the rows.
+        """
+        entries, failures, seen = [], [], {}
+        for index in self._indexes():
+            # The single-entry form sends `modelID`; accept it for the first entry.
+            model_id = self.data.get(f"modelID_{index}") or (self.data.get("modelID") if index == 0 else None)
+            if not _numeric(model_id):
+                failures.append(_failure(index, f"modelID_{index}", "A numeric NetUseStats id is required."))
+            elif not self.data.get(f"endDate_{index}"):
+                failures.append(_failure(index, f"endDate_{index}", "End date is required."))
+            elif _weight(self.data.get(f"harvestWeight_{index}")) is None:
+                failures.append(_failure(index, f"harvestWeight_{index}", "Harvest weight must be a non-negative number."))
+            elif int(model_id) in seen:
+                failures.append(_failure(index, f"modelID_{index}", f"NetUseStats {model_id} is also submitted at index {seen[int(model_id)]}."))
+            else:
+                seen[int(model_id)] = index
+                entries.append((index, int(model_id)))
+
+        # One query loads every ongoing row with its net.
+        rows = NetUseStats.objects.select_related("net").filter(
+            pk__in=seen, company=self.company, farm=self.farm, batch=self.batch, stats="ongoing"
+        ).in_bulk()
+        for index, model_id in entries:
+            row = rows.get(model_id)
+            if row is None:
+                failures.append(_failure(index, f"modelID_{index}", "No ongoing NetUseStats found for the specified ID."))
+            elif row.net.branch_id != self.branch.pk or row.net.status != "active":
+                failures.append(_failure(index, f"modelID_{index}", f"Net {row.net.name} is not an active net of this branch."))
+        if failures:
+            raise BulkIngestionError(sorted(failures, key=lambda failure: failure["index"]))
+
+        indexed = [(index, rows[model_id]) for index, model_id in entries]
+        for index, row in indexed:
+            harvested = _weight(self.data.get(f"harvestWeight_{index}"))
+            row.lay_end = self.data.get(f"endDate_{index}")
+            row.harvest_weight = harvested
+            row.stats = "completed"
+            row.created_by = self.user
+            row.laying_ratting = laying_rating(harvested, row.net.expect_harvest)
+
+        with transaction.atomic():
+            NetUseStats.objects.bulk_update(
+                [row for _, row in indexed], ["lay_end", "harvest_weight", "stats", "created_by", "laying_ratting"]
+            )
+            # bulk_update skips NetUseStats.save(); free the nets of the completed rows here.
+            Net.objects.filter(current_use__in=list(rows)).update(current_use=None)
+            self._store_media(indexed)
+
+        for _, row in indexed:
+            self.completion_entries.append(completion_entry(
+                self.common_data["appName"], self.common_data["modelName"], row.pk, self.common_data["activity"],
+                ["lay_end", "harvest_weight"],
+            ))
+        return [row for _, row in indexed]
+
+    def _assign_pks(self, rows):
+        if all(row.pk for row in rows):
+            return
+        # Backends that don't return ids from bulk inserts (MySQL): each new row is its net's newest ongoing row.
+        pks = dict(
+            NetUseStats.objects.filter(net_id__in=[row.net_id for row in rows], farm=self.farm, stats="ongoing")
+            .values("net_id").annotate(last=Max("pk")).values_list("net_id", "last")
+        )
+        for row in rows:
+            row.pk = pks[row.net_id]
+
+    def _claim_nets(self, rows, index_by_net):
+        # One conditional UPDATE points every free net at its new row; a net claimed since validation is skipped.
+        claimed = Net.objects.filter(pk__in=index_by_net, current_use__isnull=True).update(
+            current_use=Case(*[When(pk=row.net_id, then=Value(row.pk)) for row in rows])
+        )
+        if claimed == len(rows):
+            return
+        lost = Net.objects.filter(pk__in=index_by_net).exclude(current_use__in=[row.pk for row in rows]).values_list("pk", flat=True)
+        raise BulkIngestionError([
+            _failure(index_by_net[net_id], f"net_{index_by_net[net_id]}", f"Net {net_id} was taken by another submission.")
+            for net_id in sorted(lost, key=index_by_net.get)
+        ])
+
+    def _store_media(self, indexed):
+        """
+        Stream the media_file_<i>_<j> uploads of every entry to storage and create their Media rows.
+        """
+        app_name, model_name = self.common_data["appName"], self.common_data["modelName"]
+        saved, media = [], []
+        try:
+            for index, row in indexed:
+                media_index = 0
+                while f"media_title_{index}_{media_index}" in self.data:
+                    field = f"media_file_{index}_{media_index}"
+                    upload = self.files.get(field)
+                    if upload is None:
+                        raise BulkIngestionError([_failure(index, field, "Media file is required.")])
+                    path = os.path.join(app_name, model_name, str(row.pk), f"media_{index}_{media_index}_{upload.name}")
+                    try:
+                        checksum = upload_checksum(upload)
+                        saved.append(store_upload(upload, path))
+                    except Exception as exc:
+                        raise BulkIngestionError([_failure(index, field, f"Could not store the media file: {exc}")]) from exc
+                    media.append(Media(
+                        title=self.data[f"media_title_{index}_{media_index}"],
+                        file=saved[-1],
+                        checksum=checksum,
+                        comments=self.data.get(f"media_comments_{index}_{media_index}", ""),
+                        company=self.company,
+                        branch=self.branch,
+                        app_name=app_name,
+                        model_name=model_name,
+                        model_id=row.pk,
+                        uploaded_by=self.user,
+                        status="active",
+                    ))
+                    media_index += 1
+            Media.objects.bulk_create(media)
+        except Exception:
+            # The transaction rolls back the rows; remove the files stored so far as well.
+            for name in saved:
+                default_storage.delete(name)
+            raise
+
+        if saved:
+            # bulk_create skips Media.save(), which queues metadata extraction for new files.
+            media_ids = list(Media.objects.filter(file__in=saved).values_list("pk", flat=True))
+            transaction.on_commit(lambda: [enqueue_media_ingestion(media_id) for media_id in media_ids])
@@ -0,0 +1,34 @@
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+
+class OccupiedError(ValidationError):
+    """
+    The net or pond already has an ongoing use.
+    """
+
+
+def sync_occupancy(use, resource_field, ongoing):
+    """
+    Point the resource of a use record (NetUseStats.net, PondUseStats.pond) at it while it is ongoing.
+
+    The resource is claimed with a conditional UPDATE that only succeeds while
+    its current_use is empty or already this record, so two concurrent starts
+    on the same net or pond cannot both win. Call inside the transaction that
+    saves `use`; raises OccupiedError when another record holds the resource.
+    """
+    Resource = use._meta.get_field(resource_field).related_model
+    resource_id = getattr(use, f"{resource_field}_id")
+
+    held = Resource.objects.filter(current_use=use)
+    if not ongoing:
+        held.update(current_use=None)
+        return
+
+    # The record moved to another resource: release the one it held.
+    held.exclude(pk=resource_id).update(current_use=None)
+    claimed = Resource.objects.filter(pk=resource_id).filter(
+        Q(current_use__isnull=True) | Q(current_use=use)
+    ).update(current_use=use)
+    if not claimed:
+        raise OccupiedError(f"{Resource._meta.verbose_name.capitalize()} {resource_id} already has an ongoing use.")
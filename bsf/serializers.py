@@ -4,9 +4,9 @@ from rest_framework import serializers
 from .models import Farm, StaffMember, Net, Batch, DurationSettings, NetUseStats, Pond, PondUseStats
 from company.models import Company, Staff, Media
 from users.models import User
-from company.utils import has_permission
+from company.utils import has_permission, prefetch_associated_media
 from rest_framework.exceptions import PermissionDenied, ValidationError
-from company.serializers import CompanySerializer, MediaSerializer # Import the CompanySerializer for nested serialization
+from company.serializers import CompanySerializer, MediaSerializer, SparseFieldsetMixin # Import the CompanySerializer for nested serialization
 
 
 class FarmSerializer(serializers.ModelSerializer):
@@ -181,7 +181,7 @@ class StaffMemberSerializer(serializers.ModelSerializer):
         return instance
 
 
-class NetSerializer(serializers.ModelSerializer):
+class NetSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = Net
         fields = ['id', 'name', 'length', 'width', 'height', 'status', 'created_at', 'company', 'farm']
@@ -216,7 +216,27 @@ class NetSerializer(serializers.ModelSerializer):
 
 
 
-class BatchSerializer(serializers.ModelSerializer):
+class BatchListSerializer(serializers.ListSerializer):
+    """
+    Prefetches the associated media of every batch in one query before the
+    child serializer renders the rows.
+    """
+
+    def to_representation(self, data):
+        batches = list(data.all() if hasattr(data, 'all') else data)
+        if 'associated_media' in self.child.fields:
+            self.child._associated_media = prefetch_associated_media(batches, "bsf", "Batch")
+        if 'duration_settings' in self.child.fields:
+            farm_ids = {batch.farm_id for batch in batches}
+            self.child._duration_settings = {
+                (settings.company_id, settings.farm_id): settings
+                for settings in DurationSettings.objects.filter(farm_id__in=farm_ids).order_by('-id')
+            }
+            self.child._default_duration_settings = DurationSettings.objects.filter(id=1).first()
+        return super().to_representation(batches)
+
+
+class BatchSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     associated_media = serializers.SerializerMethodField()
     duration_settings = serializers.SerializerMethodField()
 
@@ -224,18 +244,28 @@ class BatchSerializer(serializers.ModelSerializer):
         model = Batch
         fields = "__all__"
         read_only_fields = ["batch_name", "created_at"]
+        list_serializer_class = BatchListSerializer
 
     def get_associated_media(self, obj):
         """
         Fetch associated media using model_id and app_name.
+        Uses the media prefetched by BatchListSerializer when serializing many batches.
         """
-        media = Media.objects.filter(app_name="bsf", model_name="Batch", model_id=obj.id)
+        prefetched = getattr(self, '_associated_media', None)
+        if prefetched is not None and obj.id in prefetched:
+            media = prefetched[obj.id]
+        else:
+            media = Media.objects.filter(app_name="bsf", model_name="Batch", model_id=obj.id)
         return MediaSerializer(media, many=True).data
 
     def get_duration_settings(self, obj):
         """
         Fetch associated DurationSettings based on the batch's farm and company.
         """
+        prefetched = getattr(self, '_duration_settings', None)
+        if prefetched is not None:
+            duration_settings = prefetched.get((obj.company_id, obj.farm_id), self._default_duration_settings)
+            return DurationSettingsSerializer(duration_settings).data if duration_settings else None
         try:
             duration_settings = DurationSettings.objects.get(company=obj.company, farm=obj.farm)
         except DurationSettings.DoesNotExist:
@@ -290,9 +320,9 @@ class NetUseStatsSerializer(serializers.ModelSerializer):
 
     def validate(self, data):
         net = data.get("net")
-        stats = NetUseStats.objects.filter(net=net, stats="ongoing").first()
+        stats = net.current_use if net and net.current_use_id else None
 
-        if stats:
+        if stats and (self.instance is None or stats.pk != self.instance.pk):
             batch = stats.batch
             raise serializers.ValidationError(
                 f"The specified net is still in use by Batch '{batch.batch_name}' (ID: {batch.id})."
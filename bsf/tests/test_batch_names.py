@@ -0,0 +1,76 @@
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import SimpleTestCase, TestCase
+
+from bsf import batch_names
+from bsf.models import Batch, BatchNameSequence, Farm
+from company import benchmarks
+
+
+class BatchNameMappingTests(SimpleTestCase):
+    """
+    batch_name() and parse_batch_name() map sequence positions to A1 ... Z10, AA1 ... and back.
+    """
+
+    def test_prefix_rollover(self):
+        for sequence, name in [(0, "A1"), (9, "A10"), (10, "B1"), (259, "Z10"), (260, "AA1"), (269, "AA10"), (270, "AB1")]:
+            with self.subTest(name=name):
+                self.assertEqual(batch_names.batch_name(sequence), name)
+                self.assertEqual(batch_names.parse_batch_name(name), sequence)
+
+    def test_round_trip(self):
+        for sequence in range(0, 800):
+            self.assertEqual(batch_names.parse_batch_name(batch_names.batch_name(sequence)), sequence)
+
+    def test_names_outside_the_scheme(self):
+        for name in ["", None, "A0", "A11", "1A", "Batch 3"]:
+            with self.subTest(name=name):
+                self.assertIsNone(batch_names.parse_batch_name(name))
+
+
+class BatchNameSequenceTests(TestCase):
+    """
+    reserve_batch_names hands out each farm's names once, in order.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        dataset = benchmarks.seed_dataset("small", seed=0)
+        cls.owner = dataset["user"]
+        cls.company = Farm.objects.filter(company_id=dataset["company"]).first().company
+        cls.farm = Farm(
+            company=cls.company, creatorId=cls.owner, name="Zebu Crossing", description="Batch name tests.",
+            location="Test", contact_number="+15550000000", email="zebu@example.com", status="active",
+        )
+        cls.farm.save()
+
+    def create_batches(self, *names):
+        # bulk_create skips Batch.save(), like batches that predate the sequence table.
+        Batch.objects.bulk_create([
+            Batch(batch_name=name, company=self.company, farm=self.farm, cretated_by=self.owner) for name in names
+        ])
+
+    def test_new_sequence_continues_after_existing_batches(self):
+        self.create_batches("A1", "B3", "Legacy batch")
+        self.assertFalse(BatchNameSequence.objects.filter(farm=self.farm).exists())
+        self.assertEqual(batch_names.next_batch_name(self.farm.pk), "B4")
+        self.assertEqual(batch_names.next_batch_name(self.farm.pk), "B5")
+
+    def test_bulk_reservations_are_contiguous_and_disjoint(self):
+        first = batch_names.reserve_batch_names(self.farm.pk, 12)
+        second = batch_names.reserve_batch_names(self.farm.pk, 3)
+        sequences = [batch_names.parse_batch_name(name) for name in first + second]
+        self.assertEqual(sequences, list(range(sequences[0], sequences[0] + 15)))
+        self.assertEqual(first[:2], ["A1", "A2"])
+        self.assertEqual(second, ["B3", "B4", "B5"])
+        self.assertEqual(batch_names.reserve_batch_names(self.farm.pk, 0), [])
+
+    def test_explicit_name_moves_the_sequence(self):
+        self.assertEqual(batch_names.next_batch_name(self.farm.pk), "A1")
+        Batch.objects.create(batch_name="C5", company=self.company, farm=self.farm, cretated_by=self.owner)
+        self.assertEqual(Batch.objects.create(company=self.company, farm=self.farm, cretated_by=self.owner).batch_name, "C6")
+
+    def test_benchmark_rejects_empty_runs(self):
+        for option in ("--reservations", "--threads", "--count"):
+            with self.subTest(option=option), self.assertRaises(CommandError):
+                call_command("benchmark_batch_names", str(self.farm.pk), option, "0")
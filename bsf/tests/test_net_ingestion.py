@@ -0,0 +1,131 @@
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from types import SimpleNamespace
+from unittest import mock
+import os
+import tempfile
+
+from bsf.models import Batch, Farm, Net, NetUseStats
+from bsf.net_ingestion import BulkIngestionError, NetUseIngestion
+from company import benchmarks
+from company.models import Branch, Company, Media
+
+
+class NetUseIngestionTests(TestCase):
+    """
+    Bulk lay-start/lay-end submissions write every entry or none, and name the entries that failed.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        dataset = benchmarks.seed_dataset("small", seed=0)
+        cls.user = dataset["user"]
+        cls.company = Company.objects.get(pk=dataset["company"])
+        cls.branch = Branch.objects.get(pk=dataset["branch"])
+        cls.farm = Farm.objects.get(pk=cls.branch.branch_id)
+        cls.batch = Batch.objects.get(farm=cls.farm, batch_name=dataset["batch"])
+        cls.free_nets = list(Net.objects.filter(farm=cls.farm, current_use__isnull=True).order_by("pk")[:3])
+        cls.occupied_net = Net.objects.filter(farm=cls.farm, current_use__isnull=False).order_by("pk")[0]
+
+    def setUp(self):
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        self.media_root = media_root.name
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def ingestion(self, activity, data, files=None):
+        request = SimpleNamespace(data=data, FILES=files or {}, user=self.user)
+        common_data = {"appName": "bsf", "modelName": "NetUseStats", "activity": activity}
+        return NetUseIngestion(request, self.company, self.branch, self.farm, self.batch, common_data)
+
+    def lay_start_data(self, *nets):
+        data = {}
+        for index, net in enumerate(nets):
+            data.update({f"net_{index}": str(net.pk), f"startDate_{index}": "2026-01-05"})
+        return data
+
+    def stored_files(self):
+        return [name for _, _, names in os.walk(self.media_root) for name in names]
+
+    def assertFailedIndexes(self, raised, indexes):
+        self.assertEqual([failure["index"] for failure in raised.exception.failures], indexes)
+
+    def test_lay_starts_claim_every_net(self):
+        rows = self.ingestion("Laying_Start", self.lay_start_data(*self.free_nets[:2])).lay_starts()
+        for net, row in zip(self.free_nets, rows):
+            net.refresh_from_db()
+            self.assertEqual(net.current_use_id, row.pk)
+            self.assertEqual(row.stats, "ongoing")
+
+    def test_occupied_net_is_reported(self):
+        before = NetUseStats.objects.count()
+        with self.assertRaises(BulkIngestionError) as raised:
+            self.ingestion("Laying_Start", self.lay_start_data(self.free_nets[0], self.occupied_net)).lay_starts()
+        self.assertFailedIndexes(raised, [1])
+        self.assertEqual(NetUseStats.objects.count(), before)
+
+    def test_duplicate_net_is_reported(self):
+        with self.assertRaises(BulkIngestionError) as raised:
+            self.ingestion("Laying_Start", self.lay_start_data(self.free_nets[0], self.free_nets[0])).lay_starts()
+        self.assertFailedIndexes(raised, [1])
+
+    def test_net_claimed_after_validation_is_reported(self):
+        raced, other_use = self.free_nets[1], NetUseStats.objects.filter(farm=self.farm, stats="completed").first()
+        assign_pks = NetUseIngestion._assign_pks
+
+        def assign_pks_then_race(ingestion, rows):
+            assign_pks(ingestion, rows)
+            Net.objects.filter(pk=raced.pk).update(current_use=other_use)  # Another submission wins net 1
+
+        before = NetUseStats.objects.count()
+        with mock.patch.object(NetUseIngestion, "_assign_pks", assign_pks_then_race):
+            with self.assertRaises(BulkIngestionError) as raised:
+                self.ingestion("Laying_Start", self.lay_start_data(*self.free_nets[:2])).lay_starts()
+        self.assertFailedIndexes(raised, [1])
+        self.assertEqual(NetUseStats.objects.count(), before)
+        self.free_nets[0].refresh_from_db()
+        self.assertIsNone(self.free_nets[0].current_use_id)
+
+    def test_failed_media_rolls_back_rows_and_files(self):
+        data = self.lay_start_data(*self.free_nets[:2])
+        data.update({"media_title_0_0": "Cage", "media_title_1_0": "Cage"})
+        files = {"media_file_0_0": SimpleUploadedFile("cage.jpg", b"jpeg bytes")}  # media_file_1_0 is missing
+        rows_before, media_before = NetUseStats.objects.count(), Media.objects.count()
+
+        with self.assertRaises(BulkIngestionError) as raised:
+            self.ingestion("Laying_Start", data, files).lay_starts()
+        self.assertFailedIndexes(raised, [1])
+        self.assertEqual(NetUseStats.objects.count(), rows_before)
+        self.assertEqual(Media.objects.count(), media_before)
+        self.assertEqual(self.stored_files(), [])
+        for net in self.free_nets[:2]:
+            net.refresh_from_db()
+            self.assertIsNone(net.current_use_id)
+
+    def test_lay_ends_free_nets(self):
+        rows = self.ingestion("Laying_Start", self.lay_start_data(*self.free_nets[:2])).lay_starts()
+        data = {}
+        for index, row in enumerate(rows):
+            data.update({f"net_{index}": str(row.net_id), f"modelID_{index}": str(row.pk),
+                         f"endDate_{index}": "2026-01-12", f"harvestWeight_{index}": "120.5"})
+
+        ended = self.ingestion("Laying_End", data).lay_ends()
+        self.assertEqual([row.pk for row in ended], [row.pk for row in rows])
+        for net in self.free_nets[:2]:
+            net.refresh_from_db()
+            self.assertIsNone(net.current_use_id)
+        self.assertEqual(set(NetUseStats.objects.filter(pk__in=[row.pk for row in rows]).values_list("stats", flat=True)), {"completed"})
+
+    def test_invalid_harvest_weight_is_reported(self):
+        rows = self.ingestion("Laying_Start", self.lay_start_data(*self.free_nets[:2])).lay_starts()
+        data = {}
+        for index, (row, weight) in enumerate(zip(rows, ["80", "a lot"])):
+            data.update({f"net_{index}": str(row.net_id), f"modelID_{index}": str(row.pk),
+                         f"endDate_{index}": "2026-01-12", f"harvestWeight_{index}": weight})
+
+        with self.assertRaises(BulkIngestionError) as raised:
+            self.ingestion("Laying_End", data).lay_ends()
+        self.assertEqual(raised.exception.failures[0]["field"], "harvestWeight_1")
+        self.assertEqual(NetUseStats.objects.filter(pk__in=[row.pk for row in rows], stats="ongoing").count(), 2)
@@ -0,0 +1,84 @@
+from datetime import date
+from decimal import Decimal
+from django.test import TestCase
+
+from bsf.models import Batch, Farm, Net, NetUseStats, Pond, PondUseStats
+from bsf.occupancy import OccupiedError
+from company import benchmarks
+from company.models import Branch
+
+
+class OccupancyTests(TestCase):
+    """
+    Net.current_use and Pond.current_use follow the ongoing use of each resource, and only one use holds it.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        dataset = benchmarks.seed_dataset("small", seed=0)
+        cls.user = dataset["user"]
+        branch = Branch.objects.get(pk=dataset["branch"])
+        cls.farm = Farm.objects.get(pk=branch.branch_id)
+        cls.batch = Batch.objects.filter(farm=cls.farm).first()
+        cls.nets = list(Net.objects.filter(farm=cls.farm, current_use__isnull=True).order_by("pk")[:2])
+        cls.ponds = list(Pond.objects.filter(farm=cls.farm, status="Active", current_use__isnull=True).order_by("pk")[:2])
+
+    def start_net_use(self, net):
+        return NetUseStats.objects.create(
+            company=self.farm.company, farm=self.farm, net=net, batch=self.batch,
+            lay_start=date(2026, 1, 5), created_by=self.user,
+        )
+
+    def start_pond_use(self, pond):
+        return PondUseStats.objects.create(
+            company=self.farm.company, farm=self.farm, pond=pond, batch=self.batch, start_date=date(2026, 1, 5),
+            start_weight=Decimal("250"), harvest_stage="Nursery", created_by=self.user,
+        )
+
+    def current_use_id(self, resource):
+        resource.refresh_from_db()
+        return resource.current_use_id
+
+    def test_second_net_use_is_rejected(self):
+        net = self.nets[0]
+        first = self.start_net_use(net)
+        with self.assertRaises(OccupiedError):
+            self.start_net_use(net)
+        self.assertEqual(self.current_use_id(net), first.pk)
+        self.assertEqual(NetUseStats.objects.filter(net=net, stats="ongoing").count(), 1)
+
+    def test_second_pond_use_is_rejected(self):
+        pond = self.ponds[0]
+        first = self.start_pond_use(pond)
+        with self.assertRaises(OccupiedError):
+            self.start_pond_use(pond)
+        self.assertEqual(self.current_use_id(pond), first.pk)
+        self.assertEqual(PondUseStats.objects.filter(pond=pond, status="Ongoing").count(), 1)
+
+    def test_completing_a_use_frees_the_resource(self):
+        net_use, pond_use = self.start_net_use(self.nets[0]), self.start_pond_use(self.ponds[0])
+        net_use.stats = "completed"
+        net_use.save()
+        pond_use.status = "Completed"
+        pond_use.save()
+        self.assertIsNone(self.current_use_id(self.nets[0]))
+        self.assertIsNone(self.current_use_id(self.ponds[0]))
+
+    def test_moving_a_use_moves_the_pointer(self):
+        net_use, pond_use = self.start_net_use(self.nets[0]), self.start_pond_use(self.ponds[0])
+        net_use.net = self.nets[1]
+        net_use.save()
+        pond_use.pond = self.ponds[1]
+        pond_use.save()
+        self.assertIsNone(self.current_use_id(self.nets[0]))
+        self.assertEqual(self.current_use_id(self.nets[1]), net_use.pk)
+        self.assertIsNone(self.current_use_id(self.ponds[0]))
+        self.assertEqual(self.current_use_id(self.ponds[1]), pond_use.pk)
+
+    def test_moving_onto_an_occupied_net_is_rejected(self):
+        held, moved = self.start_net_use(self.nets[0]), self.start_net_use(self.nets[1])
+        moved.net = self.nets[0]
+        with self.assertRaises(OccupiedError):
+            moved.save()
+        self.assertEqual(self.current_use_id(self.nets[0]), held.pk)
+        self.assertEqual(self.current_use_id(self.nets[1]), moved.pk)
@@ -0,0 +1,38 @@
+from django.test import TestCase
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+from unittest import mock
+
+from bsf.views import PondView
+from company import benchmarks, instrumentation
+
+
+class PondViewQueryBudgetTests(TestCase):
+    """
+    PondView.get stays within its @query_budget on a seeded dataset, with budgets enforced.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        instrumentation.install()
+        cls.dataset = benchmarks.seed_dataset("small", seed=0)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.dataset['user'])}")
+        self.params = {"company": self.dataset["company"], "branch": self.dataset["branch"]}
+        patcher = mock.patch.object(instrumentation, "ENFORCE_QUERY_BUDGETS", True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def assertWithinBudget(self, params):
+        self.assertTrue(PondView.get.query_budget)
+        response = self.client.get("/api/bsf/ponds/", params)  # Raises QueryBudgetExceeded over budget
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_all_ponds_within_budget(self):
+        self.assertTrue(self.assertWithinBudget(self.params).data)
+
+    def test_available_ponds_within_budget(self):
+        self.assertTrue(self.assertWithinBudget({**self.params, "available": "true"}).data)
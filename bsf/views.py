@@ -11,7 +11,11 @@ from company.models import Company, Media, Task, ActivityOwner, Branch # Import
 from company.serializers import MediaSerializer
 from .serializers import FarmSerializer, StaffMemberSerializer, NetSerializer, BatchSerializer, DurationSettingsSerializer, NetUseStatsSerializer, PondSerializer, PondUseStatsSerializer
 from rest_framework.permissions import BasePermission, IsAuthenticated
-from company.utils import has_permission, check_user_exists, get_associated_media, handle_media_uploads, extract_common_data
+from company.utils import has_permission, check_user_exists, get_associated_media, prefetch_associated_media, handle_media_uploads, extract_common_data
+from company.task_completion import completion_entry, record_task_completion
+from company.pagination import KeysetCursorPagination
+from company.instrumentation import query_budget
+from .net_ingestion import BulkIngestionError, NetUseIngestion
 from django.shortcuts import get_object_or_404
 from django.db import transaction
 from copy import deepcopy
@@ -45,7 +49,7 @@ import requests
 
 
 from django.core.files.storage import default_storage
-from django.core.files.base import ContentFile
+from company.uploads import store_upload, upload_checksum
 import os
 
 def _handle_media_files(self, request, common_data, net_use_stat, lay_index):
@@ -60,9 +64,8 @@ def _handle_media_files(self, request, common_data, net_use_stat, lay_index):
 
         try:
             # Save the file to a persistent location
-            saved_path = default_storage.save(
-                os.path.join("uploads", file.name), ContentFile(file.read())
-            )
+            checksum = upload_checksum(file)
+            saved_path = store_upload(file, os.path.join("uploads", file.name))
             absolute_path = default_storage.path(saved_path)
 
             company = Company.objects.get(id=common_data["company"])
@@ -72,6 +75,7 @@ def _handle_media_files(self, request, common_data, net_use_stat, lay_index):
                 title=request.data[f"media_title_{lay_index}_{media_index}"],
                 file=saved_path,  # Store the saved path
                 comments=request.data.get(f"media_comments_{lay_index}_{media_index}", ""),
+                checksum=checksum,
                 company=company,
                 app_name=common_data["appName"],
                 model_name=common_data["modelName"],
@@ -81,10 +85,10 @@ def _handle_media_files(self, request, common_data, net_use_stat, lay_index):
                 branch=branch,
                 created_date=now(),
             )
-            logging.info(f"Media file {media_index} uploaded for layStart {lay_index}")
+            logger.info("Media file %s uploaded for layStart %s", media_index, lay_index)
             media_index += 1
         except Exception as e:
-            logging.error(f"Error saving media file: {str(e)}")
+            logger.error("Error saving media file: %s", e)
             raise
 
 
@@ -179,10 +183,10 @@ def validate_company_branch_and_batch(request):
     batch = get_object_or_404(Batch, batch_name=batch_id, farm=farm, company=company)
     #print(batch)
 
-    print(pondusestats)
+    logger.debug("%s", pondusestats)
     # Fetch and validate the pondusestats
     pondusestats = get_object_or_404(PondUseStatsModel, id=pondusestats, batch=batch, company=company, farm=farm)
-    print(pondusestats)
+    logger.debug("%s", pondusestats)
 
     return {"company": company, "branch": branch, "farm":farm, "batch": batch, "status":status, "pondusestats":pondusestats}
 
@@ -583,6 +587,8 @@ class NetListCreateView(generics.ListCreateAPIView):
     """
     serializer_class = NetSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetCursorPagination
+    cursor_ordering = ('-created_at', '-id')
 
     def get_queryset(self):
         """
@@ -724,9 +730,8 @@ class NetDetailView_status(ListAPIView):
 
         queryset = Net.objects.filter(company=company, branch=branch)
 
-        # Exclude Nets with "ongoing" status and include those not in NetUseStats
-        ongoing_net_ids = NetUseStats.objects.filter(stats="ongoing").values_list('net_id', flat=True)
-        queryset = queryset.exclude(id__in=ongoing_net_ids)
+        # Nets without an ongoing NetUseStats (Net.current_use is kept up to date by NetUseStats.save)
+        queryset = queryset.filter(current_use__isnull=True)
 
         return queryset
 
@@ -738,6 +743,8 @@ class BatchListCreateView(generics.ListCreateAPIView):
     """
     serializer_class = BatchSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetCursorPagination
+    cursor_ordering = ('-created_at', '-id')
 
     def get_queryset(self):
         company_id = self.request.query_params.get("company")
@@ -776,7 +783,7 @@ class BatchListCreateView(generics.ListCreateAPIView):
 
         # Determine assigned user for the task
         if laying_staff:
-            print(f"Laying staff found: {laying_staff.owner}")
+            logger.debug("Laying staff found: %s", laying_staff.owner)
             assigned_to = laying_staff.owner  # Use the staff owner if available
             assistant = laying_staff.assistant  # Use the staff owner if available
         else:
@@ -1004,12 +1011,12 @@ class NetUseStatsListCreateView(generics.ListCreateAPIView):
 
             # Check if the request is from WhatsApp
             if "From" in request.data and "Body" in request.data:
-                print("Processing  data sent from whatsapp.....")
+                logger.debug("Processing  data sent from whatsapp.....")
                 return self.process_whatsapp_submission(request)
             
 
             # Extract and validate common data
-            print("Extracting and validating common data...")
+            logger.debug("Extracting and validating common data...")
             common_data = self._extract_and_validate_common_data(request)
             if isinstance(common_data, Response):  # Handle validation errors
                 return common_data
@@ -1021,25 +1028,32 @@ class NetUseStatsListCreateView(generics.ListCreateAPIView):
             #print(f"farm: {self.farm}")
             self.batch = Batch.objects.get(batch_name=common_data["batch"], company=self.company, farm=self.farm)
 
-            # Initialize completeDetails
-            self.completeDetails = ""
+            # Records filled out for the task, stored as TaskCompletionEntry rows
+            self.completion_entries = []
 
             # Process layStarts and associated media
-            print("Processing layStarts and media...")
-            self._process_lay_starts_and_media(request, common_data)
+            if self._bulk_requested(request):
+                logger.debug("Processing layStarts and media in bulk...")
+                self._ingest_bulk(request, common_data)
+            else:
+                logger.debug("Processing layStarts and media...")
+                self._process_lay_starts_and_media(request, common_data)
 
             # Update task and create the next task
-            print("Updating task and creating next task...")
+            logger.debug("Updating task and creating next task...")
             self._update_task_and_create_next_step(request, common_data)
 
-            print("Activity processed successfully.")
+            logger.debug("Activity processed successfully.")
             return Response(
                 {"detail": f"{common_data['activity']} activity processed successfully."},
                 status=status.HTTP_201_CREATED,
             )
+        except BulkIngestionError as e:
+            logger.warning("Bulk NetUseStats submission rejected: %s", e.failures)
+            return Response({"error": str(e), "failures": e.failures}, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             # Log and return the error message
-            logging.error(f"Error during creation: {str(e)}")
+            logger.error("Error during creation: %s", e)
             return Response(
                 {"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
@@ -1064,7 +1078,7 @@ class NetUseStatsListCreateView(generics.ListCreateAPIView):
         # Ensure all required fields are provided
         missing_fields = [field for field, value in data.items() if not value]
         if missing_fields:
-            logging.warning(f"Missing fields: {missing_fields}")
+            logger.warning("Missing fields: %s", missing_fields)
             return Response(
                 {"error": f"Missing required fields: {', '.join(missing_fields)}"},
                 status=status.HTTP_400_BAD_REQUEST,
@@ -1089,9 +1103,9 @@ class NetUseStatsListCreateView(generics.ListCreateAPIView):
                         )
 
                         # Check if net.id, company, and farm with status="ongoing" exist in NetUseStats
-                        print(f"Checking if NetUseStats exists for Net {net}...")
-                        if NetUseStats.objects.filter(net=net, company=self.company, farm=self.farm, stats="ongoing").exists():
-                            print(f"Net {net} is already in use with ongoing status. by batch {self.batch.batch_name}")
+                        logger.debug("Checking if NetUseStats exists for Net %s...", net)
+                        if net.current_use_id:
+                            logger.debug("Net %s is already in use with ongoing status. by batch %s", net, self.batch.batch_name)
                             raise ValidationError(f"Net {net} is already in use with ongoing status. by batch {self.batch.batch_name}")
                         
                         
@@ -1105,34 +1119,36 @@ class NetUseStatsListCreateView(generics.ListCreateAPIView):
                         )
                         self.model_id = net_use_stat.id
                         self._handle_media_files(request, common_data, net_use_stat, lay_index)
-                        self.completeDetails += f"[ - appName = {common_data['appName']},  - modelName = {common_data['modelName']}, - modelId = {net_use_stat.id},  - activity = {common_data['activity']}, - filledOut = {'lay_start'}]"
+                        self.completion_entries.append(completion_entry(
+                            common_data['appName'], common_data['modelName'], net_use_stat.id, common_data['activity'], ['lay_start']
+                        ))
                         
                 
                 elif common_data["activity"] == "Laying_End":
 
-                    print("Processing Laying_End activity...")
+                    logger.debug("Processing Laying_End activity...")
 
                     net_use_id = request.data.get("modelID"); 
-                    print(f"NetUseID is: {net_use_id}")
+                    logger.debug("NetUseID is: %s", net_use_id)
 
                     if not net_use_id:
-                        print("NetUseID is required.")
+                        logger.debug("NetUseID is required.")
                         raise ValidationError("The 'netUseID' parameter is required.")
                     
                     net_use_stat = NetUseStats.objects.filter(company=self.company, id=net_use_id, batch=self.batch, farm=self.farm, stats="ongoing").first(); 
-                    print(f"NetUseStat is: {net_use_stat}")
+                    logger.debug("NetUseStat is: %s", net_use_stat)
                     
                     if not net_use_stat:
                         raise ValidationError("No ongoing NetUseStats found for the specified ID.")
                     
                     netInstance = net_use_stat.net; 
-                    print(f"Net Id is: {netInstance.id}")
+                    logger.debug("Net Id is: %s", netInstance.id)
 
                     net = Net.objects.get(company=self.company, id=netInstance.id, branch=self.branch, farm=self.farm, status="active"); 
-                    print(f"Net: {net.id}")
+                    logger.debug("Net: %s", net.id)
                     
-                    self.harvested_eggs = request.data.get( f"harvestWeight_{lay_index}"); print(f"Harvested Eggs: {self.harvested_eggs}")
-                    expect_harvest = net.expect_harvest; print(f"Expected Harvest: {expect_harvest}")
+                    self.harvested_eggs = request.data.get( f"harvestWeight_{lay_index}"); logger.debug("Harvested Eggs: %s", self.harvested_eggs)
+                    expect_harvest = net.expect_harvest; logger.debug("Expected Harvest: %s", expect_harvest)
                     
                     if self.harvested_eggs is None:
                         self.harvested_eggs = 0
@@ -1151,26 +1167,46 @@ class NetUseStatsListCreateView(generics.ListCreateAPIView):
                     else:
                         laying_ratting = "poor"
 
-                    print(f"percentScore: {percentScore}")
-                    print(f"Laying Ratting: {laying_ratting}")
+                    logger.debug("percentScore: %s", percentScore)
+                    logger.debug("Laying Ratting: %s", laying_ratting)
 
                     # Update the NetUseStats object
-                    net_use_stat.lay_end = request.data.get( f"endDate_{lay_index}");  print(f"Lay End: {net_use_stat.lay_end}")
+                    net_use_stat.lay_end = request.data.get( f"endDate_{lay_index}");  logger.debug("Lay End: %s", net_use_stat.lay_end)
                     net_use_stat.harvest_weight = self.harvested_eggs
                     net_use_stat.stats = "completed"
                     net_use_stat.created_by = request.user
                     net_use_stat.laying_ratting = laying_ratting
                     net_use_stat.save()
                     self._handle_media_files(request, common_data, net_use_stat, 0)
-                    self.completeDetails += f"[ - appName = {common_data['appName']},  - modelName = {common_data['modelName']}, - modelId = {net_use_stat.id},  - activity = {common_data['activity']}, - filledOut = {'lay_end, harvest_weight'}]"
+                    self.completion_entries.append(completion_entry(
+                        common_data['appName'], common_data['modelName'], net_use_stat.id, common_data['activity'], ['lay_end', 'harvest_weight']
+                    ))
                 
                 lay_index += 1
 
 
         except Exception as e:
-            logging.error(f"Error processing lay starts and media: {str(e)}")
+            logger.error("Error processing lay starts and media: %s", e)
             raise
 
+    def _bulk_requested(self, request):
+        flag = request.data.get("bulk") or request.query_params.get("bulk") or ""
+        return str(flag).lower() in ("1", "true")
+
+    def _ingest_bulk(self, request, common_data):
+        """
+        Bulk mode (`bulk=true`): validates every net_<i> entry before writing any, then writes them in one transaction.
+        """
+        ingestion = NetUseIngestion(request, self.company, self.branch, self.farm, self.batch, common_data)
+        if common_data["activity"] == "Laying_Start":
+            rows = ingestion.lay_starts()
+            self.model_id = rows[-1].id if rows else None
+        elif common_data["activity"] == "Laying_End":
+            rows = ingestion.lay_ends()
+            self.model_id = rows[0].id if rows else None
+            self.harvested_eggs = sum(row.harvest_weight or 0 for row in rows)
+        self.completion_entries.extend(ingestion.completion_entries)
+
     def _handle_media_files(self, request, common_data, net_use_stat, lay_index):
         """
         Handles media file uploads associated with a specific layStart.
@@ -1181,7 +1217,7 @@ class NetUseStatsListCreateView(generics.ListCreateAPIView):
             media_title = request.FILES.get(f"media_title_{lay_index}_{media_index}")
 
             if not media_title and not file:
-                print(f"Skipping media upload for layer {lay_index}, media {media_index}")
+                logger.debug("Skipping media upload for layer %s, media %s", lay_index, media_index)
                 return  # Skip if media is missing
 
             #if not file:
@@ -1201,16 +1237,19 @@ class NetUseStatsListCreateView(generics.ListCreateAPIView):
                         str(net_use_stat.id),
                         f"media_{lay_index}_{media_index}_{file.name}"
                     )
-                    saved_path = default_storage.save(upload_path, ContentFile(file.read()))
+                    # Streams the upload (or moves its spooled temp file) instead of reading it into memory
+                    saved_path = store_upload(file, upload_path)
                     return saved_path
 
                 # Usage in the _handle_media_files method
+                checksum = upload_checksum(file)
                 saved_path = save_media_file(file, common_data, net_use_stat, lay_index, media_index)
 
                 Media.objects.create(
                     title=request.data[f"media_title_{lay_index}_{media_index}"],
                     file=saved_path,  # Store the saved path
                     comments=request.data.get(f"media_comments_{lay_index}_{media_index}", ""),
+                    checksum=checksum,
                     company=self.company,
                     app_name=common_data["appName"],
                     model_name=common_data["modelName"],
@@ -1219,10 +1258,10 @@ class NetUseStatsListCreateView(generics.ListCreateAPIView):
                     status="active",
                     branch=self.branch,
                 )
-                print(f"Media file {media_index} uploaded for layStart or layEnd {lay_index}")
+                logger.debug("Media file %s uploaded for layStart or layEnd %s", media_index, lay_index)
                 media_index += 1
             except Exception as e:
-                logging.error(f"Error saving media file: {str(e)}")
+                logger.error("Error saving media file: %s", e)
                 raise
 
     def _update_task_and_create_next_step(self, request, common_data):
@@ -1233,7 +1272,7 @@ class NetUseStatsListCreateView(generics.ListCreateAPIView):
         """
         Creates the next task in the workflow dynamically based on the activity.
         """
-        print("Creating the next task in the workflow...")
+        logger.debug("Creating the next task in the workflow...")
         # Update batch information
         batch = Batch.objects.filter(
             company=self.company,
@@ -1243,7 +1282,7 @@ class NetUseStatsListCreateView(generics.ListCreateAPIView):
         #print(f"Batch: {batch}")
 
         # Fetch duration settings dynamically for the company's branch
-        duration = DurationSettings.objects.filter(company=self.company, farm=self.farm).first(); print(f"Duration: {duration}")
+        duration = DurationSettings.objects.filter(company=self.company, farm=self.farm).first(); logger.debug("Duration: %s", duration)
 
         # Determine the next task based on the activity
         
@@ -1280,13 +1319,13 @@ class NetUseStatsListCreateView(generics.ListCreateAPIView):
                 batch.cretated_by  = request.user
 
                 # Save the updated batch object
-                print("Saving batch...")
+                logger.debug("Saving batch...")
                 batch.save()
-                print("Batch information successfully updated.")
+                logger.debug("Batch information successfully updated.")
         
         elif common_data["activity"] == "Laying_End":
             # Calculate the due date for the next task
-            net = NetUseStats.objects.get(id=request.data.get("modelID"), company=self.company, farm=self.farm); print(f"Net: {net.net}")
+            net = NetUseStats.objects.get(id=getattr(self, "model_id", None) or request.data.get("modelID"), company=self.company, farm=self.farm); logger.debug("Net: %s", net.net)
             next_task_due_date = now()
             next_activity = "Incubation"
             title=f"Need to Incubate the {self.harvested_eggs}grams of eggs harvested from Net{net.net.name}: for batch: {common_data['batch']}",
@@ -1321,9 +1360,9 @@ class NetUseStatsListCreateView(generics.ListCreateAPIView):
                 batch.cretated_by  = request.user
 
                 # Save the updated batch object
-                print("Saving batch...")
+                logger.debug("Saving batch %s", batch.pk)
                 batch.save()
-                print("Batch information successfully updated.")
+                logger.debug("Batch %s information successfully updated.", batch.pk)
 
             # '''
             
@@ -1358,7 +1397,7 @@ class NetUseStatsListCreateView(generics.ListCreateAPIView):
                 else:
                     raise ValidationError("No suitable manager or director found for task assignment.")
         if activity_info:
-            print(f"Activity Owner: {activity_info.owner}")
+            logger.debug("Activity Owner: %s", activity_info.owner)
             self.assigned_to = activity_info.owner if activity_info.owner else (activity_info.assistant if activity_info.assistant else activity_info.owner.lead)
         else:
             self.assigned_to = None
@@ -1387,10 +1426,9 @@ class NetUseStatsListCreateView(generics.ListCreateAPIView):
                 modelName=common_data["modelName"],
                 activity=common_data["activity"],
             ).first()
-            #print(self.completeDetails)
             if task:
                 task.status = "pending"
-                task.completeDetails = self.completeDetails
+                record_task_completion(task, self.completion_entries)
                 task.completed_by = request.user
                 task.completed_date = now()
                 task.save()
@@ -1420,12 +1458,12 @@ class NetUseStatsListCreateView(generics.ListCreateAPIView):
                     batch.cretated_by  = request.user
 
                     # Save the updated batch object
-                    print("Saving batch...")
+                    logger.debug("Saving batch %s", batch.pk)
                     batch.save()
-                    print("Batch information successfully updated.")
+                    logger.debug("Batch %s information successfully updated.", batch.pk)
             '''
         except Exception as e:
-            logging.error(f"Error updating task or batch: {str(e)}")
+            logger.error("Error updating task or batch: %s", e)
             raise
 
     def _create_next_task(self, request, common_data):
@@ -1849,7 +1887,7 @@ class NetUseStatsRetrieveAllView(APIView):
         return None
 
     def get(self, request, *args, **kwargs):
-        print("Retrieving NetUseStats...")
+        logger.debug("Retrieving NetUseStats...")
         # Required query parameters
         query_params = request.query_params
         validation_error = self.validate_query_params(query_params, ["company", "branch", "batch"])
@@ -1927,18 +1965,15 @@ class NetUseStatsRetrieveAllView(APIView):
         """
         if isinstance(data, NetUseStats):
             data = [data]
+        data = list(data)
+
+        # One query for the media of every row
+        media_by_stat = prefetch_associated_media(data, "bsf", "NetUseStats", company)
 
         result = []
         for net_use_stat in data:
             serialized_data = NetUseStatsSerializer(net_use_stat).data
-            associated_media = get_associated_media(
-                data_id=net_use_stat.id,
-                model_name="NetUseStats",
-                app_name="bsf",
-                company=company,
-            )
-            media_serializer = MediaSerializer(associated_media, many=True)
-            serialized_data["associated_media"] = media_serializer.data
+            serialized_data["associated_media"] = MediaSerializer(media_by_stat[net_use_stat.id], many=True).data
             result.append(serialized_data)
 
         return Response(result, status=status.HTTP_200_OK)
@@ -1949,29 +1984,21 @@ class NetUseStatsRetrieveAllView(APIView):
         """
         if isinstance(data, NetUseStats):
             data = [data]
+        else:
+            data = list(data.select_related("net"))
+
+        # One query for the media of every row; nets come from select_related
+        media_by_stat = prefetch_associated_media(data, "bsf", "NetUseStats", company)
 
         result = []
         for net_use_stat in data:
             # Serialize NetUseStats
             serialized_data = NetUseStatsSerializer(net_use_stat).data
-            
-            # Fetch associated media
-            associated_media = get_associated_media(
-                data_id=net_use_stat.id,
-                model_name="NetUseStats",
-                app_name="bsf",
-                company=company,
-            )
-            media_serializer = MediaSerializer(associated_media, many=True)
-            serialized_data["associated_media"] = media_serializer.data
+            serialized_data["associated_media"] = MediaSerializer(media_by_stat[net_use_stat.id], many=True).data
 
-            # Fetch and include associated Net data
-            try:
-                associated_net = Net.objects.get(id=net_use_stat.net_id)
-                net_serializer = NetSerializer(associated_net)
-                serialized_data["associated_net"] = net_serializer.data
-            except Net.DoesNotExist:
-                serialized_data["associated_net"] = None
+            # Include associated Net data
+            associated_net = net_use_stat.net if net_use_stat.net_id else None
+            serialized_data["associated_net"] = NetSerializer(associated_net).data if associated_net else None
 
             # Add to the response list
             result.append(serialized_data)
@@ -1983,6 +2010,7 @@ class NetUseStatsRetrieveAllView(APIView):
 class PondView(APIView):
     permission_classes = [IsAuthenticated]  # Ensure the user is authenticated
 
+    @query_budget(12)
     def get(self, request, *args, **kwargs):
         """
         Handles:
@@ -1994,7 +2022,7 @@ class PondView(APIView):
         self.pond_id = kwargs.get("id")
         self.is_available_query = request.query_params.get("available")  # Request to check if the pond is available for use (no ongoing stats)
 
-        print(f"Company: {self.company_id}, Branch: {self.branch_id}, Pond: self.{self.pond_id}, Available: {self.is_available_query}")
+        logger.debug("Company: %s, Branch: %s, Pond: self.%s, Available: %s", self.company_id, self.branch_id, self.pond_id, self.is_available_query)
 
         if not self.company_id or not self.branch_id:
             return Response({"detail": "'company' and 'Branch' parameters are required."}, status=status.HTTP_400_BAD_REQUEST)
@@ -2003,7 +2031,7 @@ class PondView(APIView):
         company = get_object_or_404(Company, id=self.company_id, status="active")
         branch = get_object_or_404(Branch, id=self.branch_id, company=company, status="active")
         farm = get_object_or_404(Farm, id=branch.branch_id, company=company, status="active")
-        print(f"Company: {company}, Branch: {branch}, Farm: {farm}")
+        logger.debug("Company: %s, Branch: %s, Farm: %s", company, branch, farm)
         
 
         # Check permissions
@@ -2014,10 +2042,9 @@ class PondView(APIView):
             pond = get_object_or_404(Pond, id=self.pond_id, farm=farm, company=company)
 
             if self.is_available_query == "true":
-                pond = get_object_or_404(Pond, id=self.pond_id, farm=farm, company=company, status="Active"); print ( f"pond: {pond}")
+                pond = get_object_or_404(Pond, id=self.pond_id, farm=farm, company=company, status="Active"); logger.debug("pond: %s", pond)
                 # Check if the specific pond is available
-                ongoing_status = PondUseStats.objects.filter(farm=farm, pond=pond, status="Ongoing").exists()
-                if not ongoing_status:
+                if pond.current_use_id is None:
                     media = get_associated_media(pond.id, "Ponds", "bsf", company)
                     pond_data = {
                         "pond": PondSerializer(pond).data,
@@ -2035,36 +2062,29 @@ class PondView(APIView):
             return Response(pond_data, status=status.HTTP_200_OK)
 
         if self.is_available_query == "true":
-            print("Checking for available ponds...")
+            logger.debug("Checking for available ponds...")
             # Fetch only available ponds
             active_ponds = Pond.objects.filter(farm=farm, company=company, status="Active"); #print(f"Active Ponds: {active_ponds}")
 
-            available_ponds = [
-                pond for pond in active_ponds
-                if not PondUseStatsModel.objects.filter(farm=farm, pond=pond, status="Ongoing").exists()
-            ]
-            #print(f"Available Ponds: {available_ponds}")
-            results = []
-
-            for pond in available_ponds:
-                media = get_associated_media(pond.id, "Ponds", "bsf", company); print(f"Available Ponds: {media}")
-                results.append({
-                    "pond": PondSerializer(pond).data,
-                    "associated_media": MediaSerializer(media, many=True).data
-                })
-                #print(f"Available Ponds: {results}")
-            return Response(results, status=status.HTTP_200_OK)
+            available_ponds = list(active_ponds.filter(current_use__isnull=True))
+            return Response(self._serialize_ponds(available_ponds, company), status=status.HTTP_200_OK)
 
         # Default behavior: Fetch all ponds
-        ponds = Pond.objects.filter(farm=farm)
-        results = []
-        for pond in ponds:
-            media = get_associated_media(pond.id, "Ponds", "bsf", company)
-            results.append({
+        ponds = list(Pond.objects.filter(farm=farm))
+        return Response(self._serialize_ponds(ponds, company), status=status.HTTP_200_OK)
+
+    def _serialize_ponds(self, ponds, company):
+        """
+        Serialize ponds with their associated media, fetched for all ponds in one query.
+        """
+        media_by_pond = prefetch_associated_media(ponds, "bsf", "Ponds", company)
+        return [
+            {
                 "pond": PondSerializer(pond).data,
-                "associated_media": MediaSerializer(media, many=True).data
-            })
-        return Response(results, status=status.HTTP_200_OK)
+                "associated_media": MediaSerializer(media_by_pond[pond.id], many=True).data
+            }
+            for pond in ponds
+        ]
 
     def post(self, request, *args, **kwargs):
         """
@@ -2145,7 +2165,7 @@ class PondUseStatsView(APIView):
         }
 
     def get(self, request, *args, **kwargs):
-        print("**********PondUseStatsView ***********")
+        logger.debug("PondUseStatsView")
         """
         Retrieve PondUseStats for a specific batch, farm, and company, optionally filtered by harvest_stage.
         """
@@ -2210,15 +2230,14 @@ class PondUseStatsView(APIView):
         if harvest_stage:
             pondusestats_query = pondusestats_query.filter(harvest_stage=self.VALID_HARVEST_STAGES[harvest_stage])
 
+        pondusestats_list = list(pondusestats_query)
+        media_by_stat = prefetch_associated_media(pondusestats_list, "bsf", "PondUseStats", company)
         results = [
             {
                 "pondusestats": PondUseStatsSerializer(pondusestats).data,
-                "associated_media": MediaSerializer(
-                    get_associated_media(pondusestats.id, "PondUseStats", "bsf", company),
-                    many=True
-                ).data,
+                "associated_media": MediaSerializer(media_by_stat[pondusestats.id], many=True).data,
             }
-            for pondusestats in pondusestats_query
+            for pondusestats in pondusestats_list
         ]
 
         return Response(results, status=status.HTTP_200_OK)
@@ -2318,7 +2337,7 @@ class PondUseStats(APIView):
 
     def create(self, request, *args, **kwargs):
         try:
-            print("********start of create****************")
+            logger.debug("start of create")
 
             # Define the fields to extract
             required_fields = [
@@ -2337,8 +2356,8 @@ class PondUseStats(APIView):
             self.farm = Farm.objects.get(id=self.branch.branch_id, company=self.company, status="active")    
             self.batch = Batch.objects.get(company=self.company, farm=self.farm, batch_name=self.common_data["batch"]); #print(f"Batch: {self.batch}")
 
-            # Initialize completeDetails
-            self.completeDetails = ""
+            # Records filled out for the task, stored as TaskCompletionEntry rows
+            self.completion_entries = []
 
             # Extract activity type from the request
             self.activity = request.data.get("activity")
@@ -2375,7 +2394,7 @@ class PondUseStats(APIView):
         return Response({"error": "Invalid 'stage' parameter."}, status=status.HTTP_400_BAD_REQUEST)
 
     def _start_activity(self, request):
-        print("********Handle the start of an activity.********")
+        logger.debug("Handle the start of an activity.")
         layer_index = 0
 
         while f"pond_{layer_index}" in request.data:
@@ -2384,16 +2403,18 @@ class PondUseStats(APIView):
             start_weight = request.data.get(f"startWeight_{layer_index}")
 
             if not pond_id or not start_date or not start_weight:
-                logging.warning(f"Skipping missing pond entry at index {layer_index}")
+                logger.warning("Skipping missing pond entry at index %s", layer_index)
                 layer_index += 1
                 continue  # Skip this iteration
 
-            pond = get_object_or_404(Pond, id=pond_id, farm=self.farm, company=self.company, status="Active")
+            pond = get_object_or_404(
+                Pond.objects.select_related("current_use"), id=pond_id, farm=self.farm, company=self.company, status="Active"
+            )
 
             if not pond:
                 raise ValidationError(f"Pond '{pond_id}' does not exist or is not active.")
 
-            exisitngPondUseStats = PondUseStatsModel.objects.filter(pond=pond, status="Ongoing").first()
+            exisitngPondUseStats = pond.current_use
 
             if exisitngPondUseStats is not None:
                 if exisitngPondUseStats.batch == self.batch and exisitngPondUseStats.company == self.company and exisitngPondUseStats.farm == self.farm:
@@ -2420,7 +2441,9 @@ class PondUseStats(APIView):
             )
 
             self._handle_layer_media(request, self.pond_use_stats.id, layer_index)
-            self.completeDetails += f"[ - appName=bsf, modelName=PondUseStats, modelId={self.pond_use_stats.id}, activity={self.activity}, filledOut=start_date, start_weight]"
+            self.completion_entries.append(completion_entry(
+                "bsf", "PondUseStats", self.pond_use_stats.id, self.activity, ["start_date", "start_weight"]
+            ))
 
             # Call task completion and next task creation
             self._complete_task_and_create_next(request)
@@ -2434,9 +2457,9 @@ class PondUseStats(APIView):
 
     def _end_activity(self, request):
         """Handle the end of an activity with multiple layers and media."""
-        print("""********Handle the end of an activity.********""")
+        logger.debug("Handle the end of an activity.")
 
-        pond_use_stats_id = request.data.get("modelID"); print(f"pond_use_stats_id: {pond_use_stats_id}")
+        pond_use_stats_id = request.data.get("modelID"); logger.debug("pond_use_stats_id: %s", pond_use_stats_id)
         if not pond_use_stats_id:
             raise ValidationError("'modelID' parameter is required for ending an activity.")
         
@@ -2459,7 +2482,7 @@ class PondUseStats(APIView):
                 batch=self.batch, 
                 status="Ongoing"
             )
-            print(f"Pond Use Stats: {self.dataToSave}")
+            logger.debug("Pond Use Stats: %s", self.dataToSave)
 
             try:
                 with transaction.atomic():
@@ -2485,11 +2508,13 @@ class PondUseStats(APIView):
                     self.dataToSave.save()
             
             except Exception as e:
-                print(f"Transaction error: {str(e)}")
+                logger.warning("Transaction error: %s", e)
 
-            print(f"Layer Index: {layer_index}")
+            logger.debug("Layer Index: %s", layer_index)
             self._handle_layer_media(request, self.dataToSave.id, layer_index)
-            self.completeDetails += f"[ - appName=bsf, modelName=PondUseStats, modelId={self.dataToSave.id}, activity={self.activity}, filledOut=end_date, harvest_weight]"
+            self.completion_entries.append(completion_entry(
+                "bsf", "PondUseStats", self.dataToSave.id, self.activity, ["end_date", "harvest_weight"]
+            ))
             layer_index += 1
 
         self._complete_task_and_create_next(request)
@@ -2507,7 +2532,7 @@ class PondUseStats(APIView):
             media_comments = request.data.get(f"media_comments_{layer_index}_{media_index}", "")
             
             if not media_title and not media_file:
-                print(f"Skipping media upload for layer {layer_index}, media {media_index}")
+                logger.debug("Skipping media upload for layer %s, media %s", layer_index, media_index)
                 return  # Skip if media is missing
 
             Media.objects.create(
@@ -2538,10 +2563,10 @@ class PondUseStats(APIView):
             if task:
                 task.status = "pending"
                 task.completed_date = now()
-                task.completeDetails = self.completeDetails
+                record_task_completion(task, self.completion_entries)
                 task.completed_by = request.user
                 task.save()
-                print(f"Task: {task}")
+                logger.debug("Task: %s", task)
         return self._create_next_task()
     
     
@@ -2640,7 +2665,7 @@ class PondUseStats(APIView):
 
 from twilio.twiml.messaging_response import MessagingResponse
 from rest_framework.authentication import TokenAuthentication, SessionAuthentication
-from twilio.rest import Client
+from whatsapp.outbox import enqueue_message, twiml_ack
 import requests
 
 class WhatsAppTaskViewArchive(APIView):
@@ -2655,7 +2680,7 @@ class WhatsAppTaskViewArchive(APIView):
         Process WhatsApp messages to start, update, or complete tasks.
         """
 
-        print('how are you')
+        logger.debug("how are you")
         sender = request.data.get("From")  # Staff's WhatsApp number
         message = request.data.get("Body", "").strip().lower()  # WhatsApp message body
         media_url = request.data.get("MediaUrl0")  # Media file (if any)
@@ -2806,7 +2831,7 @@ class WhatsAppTaskView(APIView):
         while runStep:
 
             current_step = cache.get(f"whatsapp_step_{sender_phone}", "start_task")
-            print(f"🔄 Processing Step: {current_step} for Task {task_id}")
+            logger.debug("🔄 Processing Step: %s for Task %s", current_step, task_id)
 
             # ✅ Step 0: Start Task - Ask for End Date
             if current_step == "start_task":
@@ -2932,14 +2957,9 @@ class WhatsAppTaskView(APIView):
         Sends a WhatsApp notification to the manager after task completion.
         """
         manager_phone = task.assigned_to.manager.phone_number  # Ensure manager field exists in model
-        client = Client(os.getenv("TWILIO_ACCOUNT_SID"), os.getenv("TWILIO_AUTH_TOKEN"))
 
         message = f"📢 Task {task.id} completed by {task.assigned_to.username}."
-        client.messages.create(
-            body=message,
-            from_="whatsapp:+14155238886",
-            to=f"whatsapp:{manager_phone}"
-        )
+        enqueue_message(manager_phone, message)
 
     def extract_task_id(self, message):
         """
@@ -2971,18 +2991,10 @@ class WhatsAppTaskView(APIView):
         """
         Sends a WhatsApp message to the user.
         """
-        TWILIO_ACCOUNT_SID = config("TWILIO_ACCOUNT_SID")
-        TWILIO_AUTH_TOKEN = config("TWILIO_AUTH_TOKEN")
-        client = Client(TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN)
+        enqueue_message(sender_phone, message_body)
 
-        client.messages.create(
-            from_="whatsapp:+14155238886",
-            to=f"whatsapp:{sender_phone}",
-            body=message_body
-        )
-
-        print(f"📤 Sent WhatsApp Message to {sender_phone}: {message_body}")
-        return Response({"message": "WhatsApp message sent"}, status=200)
+        logger.debug("📤 Queued WhatsApp Message to %s: %s", sender_phone, message_body)
+        return twiml_ack()
     
     def submit_task(self, sender_phone, task_id):
         """
@@ -2990,10 +3002,6 @@ class WhatsAppTaskView(APIView):
         """
         try:
 
-            TWILIO_ACCOUNT_SID = config("TWILIO_ACCOUNT_SID")
-            TWILIO_AUTH_TOKEN = config("TWILIO_AUTH_TOKEN")
-            client = Client(TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN)
-
             end_date = cache.get(f"task_{sender_phone}_end_date", "")
             harvest_weight = cache.get(f"task_{sender_phone}_harvest_weight", "")
             harvest_date = cache.get(f"task_{sender_phone}_harvest_date", "")
@@ -3007,19 +3015,15 @@ class WhatsAppTaskView(APIView):
                 "media": media
             }
 
-            print(f"📤 Submitting Task Data: {form_data}")
+            logger.debug("📤 Submitting Task Data: %s", form_data)
 
-            client.messages.create(
-                from_="whatsapp:+14155238886",
-                to=f"whatsapp:{sender_phone}",
-                body="✅ Task submission complete! Sending for approval."
-            )
+            enqueue_message(sender_phone, "✅ Task submission complete! Sending for approval.")
 
             # ✅ Ensure response is always returned
             return Response({"message": "Task successfully submitted"}, status=200)
         
         except Exception as e:
-            print(f"❌ Error in submit_task: {e}")
+            logger.warning("❌ Error in submit_task: %s", e)
             return Response({"error": "Task submission failed"}, status=500)
  
 
@@ -8,27 +8,27 @@ from decimal import Decimal
 from django.shortcuts import get_object_or_404
 from django.db import transaction
 from company.models import Task  
+from company.task_forms import InvalidFormSchema, get_task_form
 from users.models import User
 from bsf.models import PondUseStats  
+import logging
 
-def extract_data(data, keyword):
-        if isinstance(data, dict):
-            data = str(data)
-        match = re.search(rf'"{keyword}"\s*:\s*"(\w+)"', data)
-        if not match:
-            match = re.search(rf'"{keyword}"\s*:\s*(\d+)', data)  
-        if match:
-            value = (match.group(1))
-            return value
-        elif match is None:
-            print(f"Keyword '{keyword}' not found in data")
-        return None
+logger = logging.getLogger(__name__)
+
+def extract_data(task, keyword):
+        """
+        Value of a scalar attribute (model_id, Batch, Stage, ...) from the task's compiled form.
+        """
+        value = get_task_form(task).get(keyword)
+        if value is None:
+            logger.warning("Keyword '%s' not found in data", keyword)
+        return value
 
 def get_from_folder(data, key):
     value = data.get(key)
     if value is None:
         raise ValueError(f"Key '{key}' not found in data")
-    print(f"Value for '{key}' extracted: {value}")
+    logger.debug("Value for '%s' extracted: %s", key, value)
     return value
 
 def PondUseStats_whatsapp(task_id, processed_data, user_id):
@@ -43,9 +43,9 @@ def PondUseStats_whatsapp(task_id, processed_data, user_id):
     # get task by task_id
     task = get_object_or_404(Task, id=task_id)
 
-    modelId = extract_data(task.description, "model_id")
-    activity = extract_data(task.description, "Activity")
-    current_stage = extract_data(task.description, "Stage")
+    modelId = extract_data(task, "model_id")
+    activity = extract_data(task, "Activity")
+    current_stage = extract_data(task, "Stage")
 
     model = get_object_or_404(PondUseStats, id=modelId)
 
@@ -62,13 +62,13 @@ def _end_activity(task, processed_data):
     """
     End the current activity for the given task.
     """
-    print("******** Handle the end of an activity. ********")
+    logger.debug("Handle the end of an activity.")
 
     # ✅ Check if required data is complete
     try:
         data_complete = checkIfDataComplete(task, processed_data)
         if not data_complete["status"]:
-                    print(f"❌ Data is incomplete: {data_complete['message']}. Stopping processing.")
+                    logger.warning("❌ Data is incomplete: %s. Stopping processing.", data_complete['message'])
                     return False  # Stop processing if data is incomplete
         
         # Retrieve the farm dynamically based on the company and branch from the task
@@ -76,20 +76,20 @@ def _end_activity(task, processed_data):
             apps.get_model("bsf", "Farm"),
             company=task.company,
         )
-        print(f"Farm: {farm}")
+        logger.debug("Farm: %s", farm)
 
         batch = get_object_or_404(
             apps.get_model("bsf", "Batch"),
             farm=farm,
             company=task.company,
-            batch_name=extract_data(task.description, "Batch")
+            batch_name=extract_data(task, "Batch")
         )
-        print(f"Batch: {batch}")
+        logger.debug("Batch: %s", batch)
 
         
 
-        model_id = extract_data(task.description, "model_id")
-        print(f"Model ID: {model_id}")
+        model_id = extract_data(task, "model_id")
+        logger.debug("Model ID: %s", model_id)
         dataToSaveIn = get_object_or_404(
             PondUseStats, 
             id=model_id,
@@ -98,14 +98,14 @@ def _end_activity(task, processed_data):
             batch=batch, 
             status="ongoing"
         )
-        print(f"Pond Use Stats: {dataToSaveIn}")
+        logger.debug("Pond Use Stats: %s", dataToSaveIn)
 
         try:
             with transaction.atomic():
 
                 # Convert end_date to a datetime.date object
                 end_date = get_from_folder(processed_data, "end_date")
-                print(f"End date: {end_date}")
+                logger.debug("End date: %s", end_date)
                 if isinstance(end_date, str):
                     try:
                         end_date = datetime.datetime.strptime(end_date, "%Y-%m-%d").date()
@@ -119,7 +119,7 @@ def _end_activity(task, processed_data):
                 try:
                     harvest_weight = get_from_folder(processed_data, "harvest_weight")
                     harvest_weight = Decimal(harvest_weight)
-                    print(f"Harvest weight: {harvest_weight}")
+                    logger.debug("Harvest weight: %s", harvest_weight)
                 except (ValueError, TypeError):
                     raise ValueError(f"Invalid harvest_weight: {harvest_weight}. Expected a float or Decimal.")
                 dataToSaveIn.harvest_weight = harvest_weight
@@ -128,13 +128,13 @@ def _end_activity(task, processed_data):
                 dataToSaveIn.save()
         
         except Exception as e:
-            print(f"Transaction error: {str(e)}")
+            logger.warning("Transaction error: %s", e)
 
     except (ValueError, TypeError) as e:
-        print(f"❌ Data validation failed: {e}")
+        logger.warning("❌ Data validation failed: %s", e)
         return False  # Stop processing if an error is encountered
 
-    print(f"✅ Task {task.id} completed successfully with processed data: {processed_data}")
+    logger.debug("✅ Task %s completed successfully with processed data: %s", task.id, processed_data)
     return True  # Proceed with activity completion
 
 
@@ -143,41 +143,24 @@ def checkIfDataComplete(task, processed_data):
     Checks if all required fields from task.description exist and are valid in processed_data.
     """
     try:
-        # ✅ Load task description as JSON
-        form_data = json.loads(task.description)
-    except json.JSONDecodeError:
-        print("❌ Error: Task description is not a valid JSON.")
+        form = get_task_form(task)
+    except InvalidFormSchema as e:
+        logger.warning("❌ Error: %s", e)
         raise ValueError("❌ Task description is invalid. Data validation failed.")
 
-    # ✅ Ensure 'fields' key exists in task description
-    fields = form_data.get("fields", [])
-    print(f"Fields in task description: {fields}")
-    if not fields:
-        print("❌ Error: 'fields' not found in task description.")
+    # ✅ Ensure the form has fields
+    if not form.fields:
+        logger.warning("❌ Error: 'fields' not found in task description.")
         raise ValueError("❌ Task description is missing the 'fields' key. Data validation failed.")
 
-    required_fields = []
-    missing_fields = []
-
-    # ✅ Identify required fields
-    for field in fields:
-        if field.get("required", False):  # Only check required fields
-            required_fields.append(field["name"])
-
     # ✅ Validate required fields in processed_data
-    for field_name in required_fields:
-        if field_name in processed_data:
-            print(f"Checking field '{field_name}' for '{processed_data[field_name]}' in processed_data...")
-        else:
-            print(f"Field '{field_name}' is missing in processed_data.")
-        if field_name not in processed_data or not processed_data[field_name]:  # Check if key is missing or empty
-            missing_fields.append(field_name)
+    missing_fields = [field.name for field in form.missing_fields(processed_data)]
 
     if missing_fields:
-        print(f"❌ Missing required fields: {', '.join(missing_fields)}")
+        logger.warning("❌ Missing required fields: %s", ', '.join(missing_fields))
         return {"status": False, "message": f"Missing required fields: {', '.join(missing_fields)}"}
 
-    print("✅ All required fields are present and valid.")
+    logger.debug("✅ All required fields are present and valid.")
     return {"status": True, "message": f"✅ All required fields are present and valid."}
 
 
@@ -4,6 +4,7 @@ from .models import Farm, Pond, Batch, BatchMovement, StockingHistory, Destockin
 from company.utils import has_permission
 from django.core.exceptions import PermissionDenied
 from company.models import Company
+from company.serializers import SparseFieldsetMixin
 
 FEED_SIZE_CHOICES = [
     ('0.1mm', '0.1mm'), ('0.2mm', '0.2mm'), ('0.5mm', '0.5mm'),
@@ -13,7 +14,7 @@ FEED_SIZE_CHOICES = [
 ]
 
 # Farm Serializer
-class FarmSerializer(serializers.ModelSerializer):
+class FarmSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     name = serializers.CharField(required=False)  # Make 'name' optional
     company = serializers.PrimaryKeyRelatedField(queryset=Company.objects.all(), required=False)  # Make 'company' optional
 
@@ -53,7 +54,7 @@ class FarmSerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
    
-class StaffMemberSerializer(serializers.ModelSerializer):
+class StaffMemberSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     user_username = serializers.CharField(source="user.username", read_only=True)
     leader_username = serializers.CharField(source="leader.username", read_only=True)
 
@@ -73,14 +74,14 @@ class StaffMemberSerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
 
-class PondSerializer(serializers.ModelSerializer):  # Handles Pond serialization
+class PondSerializer(SparseFieldsetMixin, serializers.ModelSerializer):  # Handles Pond serialization
     class Meta:
         model = Pond
         fields = '__all__'
 
 
 from .models import PondMaintenanceLog
-class PondMaintenanceLogSerializer(serializers.ModelSerializer):
+class PondMaintenanceLogSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     pond_name = serializers.CharField(source="pond.name", read_only=True)
     performed_by_name = serializers.CharField(source="performed_by.username", read_only=True)
 
@@ -98,25 +99,25 @@ class PondMaintenanceLogSerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
 
-class BatchSerializer(serializers.ModelSerializer):  # Handles Batch serialization
+class BatchSerializer(SparseFieldsetMixin, serializers.ModelSerializer):  # Handles Batch serialization
     class Meta:
         model = Batch
         fields = '__all__'
 
 
-class BatchMovementSerializer(serializers.ModelSerializer):  # Handles Batch Movement serialization
+class BatchMovementSerializer(SparseFieldsetMixin, serializers.ModelSerializer):  # Handles Batch Movement serialization
     class Meta:
         model = BatchMovement
         fields = '__all__'
 
 
-class StockingHistorySerializer(serializers.ModelSerializer):  # Handles Stocking History serialization
+class StockingHistorySerializer(SparseFieldsetMixin, serializers.ModelSerializer):  # Handles Stocking History serialization
     class Meta:
         model = StockingHistory
         fields = '__all__'
 
 
-class DestockingHistorySerializer(serializers.ModelSerializer):  # Handles Destocking History serialization
+class DestockingHistorySerializer(SparseFieldsetMixin, serializers.ModelSerializer):  # Handles Destocking History serialization
     class Meta:
         model = DestockingHistory
         fields = '__all__'
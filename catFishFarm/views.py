@@ -8,6 +8,7 @@ from django.db import models
 from django.db.models import Prefetch
 from rest_framework.permissions import IsAuthenticated
 from company.utils import has_permission
+from company.pagination import KeysetCursorPagination
 from django.core.exceptions import PermissionDenied
 from .serializers import FarmSerializer, PondSerializer, BatchSerializer, BatchMovementSerializer, StockingHistorySerializer, DestockingHistorySerializer, StaffMemberSerializer, PondMaintenanceLogSerializer
 import logging
@@ -25,7 +26,7 @@ User = get_user_model()
 
 def get_user_company(user, company_id=None):
     if company_id:
-        print("company_id: ", company_id)
+        logger.debug("company_id: %s", company_id)
         try:
             company = Company.objects.get(id=company_id)
             if not user.staff_members.filter(company=company).exists():
@@ -87,6 +88,8 @@ class FarmViewSet(viewsets.ModelViewSet):
     queryset = Farm.objects.all()
     serializer_class = FarmSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetCursorPagination
+    cursor_ordering = ('-created_at', '-id')
 
     def get_queryset(self):
         company_id = self.request.query_params.get('company')
@@ -154,6 +157,8 @@ class StaffMemberViewSet(viewsets.ModelViewSet):
     queryset = StaffMember.objects.all()
     serializer_class = StaffMemberSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetCursorPagination
+    cursor_ordering = ('-assigned_at', '-id')
 
     queryset = StaffMember.objects.all()
     serializer_class = StaffMemberSerializer
@@ -203,7 +208,7 @@ class StaffMemberViewSet(viewsets.ModelViewSet):
             # Deactivate existing staff record before adding a new one
             existing_staff_member.status = "inactive"
             existing_staff_member.save()
-            logger.info(f"Existing Staff Member {existing_staff_member.id} set to inactive.")
+            logger.info("Existing Staff Member %s set to inactive.", existing_staff_member.id)
 
         # ✅ Enforce permission check
         if not has_permission(self.request.user, company, "catFishFarm", "StaffMember", "add"):
@@ -219,7 +224,7 @@ class StaffMemberViewSet(viewsets.ModelViewSet):
         )
 
         # ✅ Logging for debugging
-        logger.info(f"Staff Member {staff_member.id} added by {self.request.user} to farm {farm.id} in company {company.id}")
+        logger.info("Staff Member %s added by %s to farm %s in company %s", staff_member.id, self.request.user, farm.id, company.id)
 
 
 class PondViewSet(viewsets.ModelViewSet):
@@ -228,6 +233,8 @@ class PondViewSet(viewsets.ModelViewSet):
     """
     serializer_class = PondSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetCursorPagination
+    cursor_ordering = ('-created_at', '-id')
 
     def get_queryset(self):
         """
@@ -271,7 +278,7 @@ class PondViewSet(viewsets.ModelViewSet):
 
         if has_permission(self.request.user, company, 'catFishFarm', 'Pond', 'edit'):
             instance = serializer.save()
-            logger.info(f"Pond {instance.id} updated by {self.request.user} in farm {farm.id}")
+            logger.info("Pond %s updated by %s in farm %s", instance.id, self.request.user, farm.id)
         else:
             raise PermissionDenied("You do not have permission to update this pond.")
 
@@ -282,7 +289,7 @@ class PondViewSet(viewsets.ModelViewSet):
         company, farm = validate_company_and_farm(self.request)
 
         if has_permission(self.request.user, company, 'catFishFarm', 'Pond', 'delete'):
-            logger.info(f"Pond {instance.id} deleted by {self.request.user} in farm {farm.id}")
+            logger.info("Pond %s deleted by %s in farm %s", instance.id, self.request.user, farm.id)
             instance.delete()
         else:
             raise PermissionDenied("You do not have permission to delete this pond.")
@@ -298,6 +305,8 @@ class PondMaintenanceLogViewSet(viewsets.ModelViewSet):
     queryset = PondMaintenanceLog.objects.all()
     serializer_class = PondMaintenanceLogSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetCursorPagination
+    cursor_ordering = ('-id',)
     filter_backends = [DjangoFilterBackend, filters.SearchFilter]
     filterset_fields = ['pond', 'maintenance_type', 'date']  # Allows filtering by pond, type, and date
     search_fields = ['description']  # Enables text search
@@ -365,6 +374,8 @@ class BatchViewSet(viewsets.ModelViewSet):
     queryset = Batch.objects.all()
     serializer_class = BatchSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetCursorPagination
+    cursor_ordering = ('-id',)
 
     def perform_create(self, serializer):
         company = get_user_company(self.request.user)
@@ -391,6 +402,8 @@ class BatchMovementViewSet(viewsets.ModelViewSet):
     queryset = BatchMovement.objects.all()
     serializer_class = BatchMovementSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetCursorPagination
+    cursor_ordering = ('-id',)
 
     def perform_create(self, serializer):
         company = get_user_company(self.request.user)
@@ -403,6 +416,8 @@ class StockingHistoryViewSet(viewsets.ModelViewSet):
     queryset = StockingHistory.objects.all()
     serializer_class = StockingHistorySerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetCursorPagination
+    cursor_ordering = ('-id',)
 
     def perform_create(self, serializer):
         company = get_user_company(self.request.user)
@@ -415,6 +430,8 @@ class DestockingHistoryViewSet(viewsets.ModelViewSet):
     queryset = DestockingHistory.objects.all()
     serializer_class = DestockingHistorySerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetCursorPagination
+    cursor_ordering = ('-id',)
 
     def perform_create(self, serializer):
         company = get_user_company(self.request.user)
@@ -58,6 +58,14 @@ class TaskAdmin(admin.ModelAdmin):
     search_fields = ['title', 'description']
 
 
+from .models import TaskCompletionEntry
+@admin.register(TaskCompletionEntry)
+class TaskCompletionEntryAdmin(admin.ModelAdmin):
+    list_display = ('id', 'task', 'app_name', 'model_name', 'model_id', 'activity', 'created_at')
+    search_fields = ('task__title', 'app_name', 'model_name')
+    list_filter = ('app_name', 'model_name', 'activity')
+    readonly_fields = ('created_at',)
+
 from .models import ActivityOwner
 @admin.register(ActivityOwner)
 class ActivityOwnerAdmin(admin.ModelAdmin):
@@ -81,7 +89,30 @@ class RewardsPointsTrackerAdmin(admin.ModelAdmin):
     search_fields = ('user__username', 'company__name', 'branch__name', 'task__title')
     list_filter = ('company', 'branch', 'credit_date', 'debit_date', 'updated_at')
     readonly_fields = ('points_available', 'points_pending', 'updated_at')
-    list_editable = ('credit', 'debit')
+
+    def get_readonly_fields(self, request, obj=None):
+        # Posted entries are append-only; only annotations can still be edited.
+        if obj is not None:
+            return self.readonly_fields + ('user', 'company', 'transaction_type', 'credit', 'blocked', 'debit', 'credit_date')
+        return self.readonly_fields
+
+
+from .models import RewardsPointsBalance
+@admin.register(RewardsPointsBalance)
+class RewardsPointsBalanceAdmin(admin.ModelAdmin):
+    list_display = ('id', 'user', 'company', 'points_available', 'points_pending', 'updated_at')
+    search_fields = ('user__username', 'company__name')
+    list_filter = ('company',)
+    readonly_fields = ('user', 'company', 'points_available', 'points_pending', 'updated_at')
+
+
+from .models import RewardsPointsMonthlyRollup
+@admin.register(RewardsPointsMonthlyRollup)
+class RewardsPointsMonthlyRollupAdmin(admin.ModelAdmin):
+    list_display = ('id', 'user', 'company', 'month', 'credit_total', 'blocked_total', 'debit_total', 'pending_total')
+    search_fields = ('user__username', 'company__name')
+    list_filter = ('company', 'month')
+    readonly_fields = ('user', 'company', 'month', 'credit_total', 'blocked_total', 'debit_total', 'pending_total')
 
 
 from .models import Expectations
@@ -112,3 +143,12 @@ class ExpectationAdmin(admin.ModelAdmin):
         if not obj.created_by:
             obj.created_by = request.user
         super().save_model(request, obj, form, change)
+
+
+from .models import QueuedEmail
+@admin.register(QueuedEmail)
+class QueuedEmailAdmin(admin.ModelAdmin):
+    list_display = ('id', 'recipient', 'subject', 'status', 'attempts', 'created_at', 'sent_at')
+    search_fields = ('recipient', 'subject')
+    list_filter = ('status',)
+    readonly_fields = ('attempts', 'last_error', 'created_at', 'sent_at')
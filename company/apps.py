@@ -8,3 +8,4 @@ class CompanyConfig(AppConfig):
 
     def ready(self):
         import company.signals  # Register signals
+        import company.checks  # Register system checks
@@ -0,0 +1,416 @@
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Count
+from django.utils.timezone import make_aware
+import django
+import math
+import platform
+import random
+
+from bsf.batch_names import reserve_batch_names
+from bsf.models import Batch, Farm, Net, NetUseStats, Pond, PondUseStats, StaffMember
+from company import instrumentation
+from company.media_ingestion import DONE
+from company.models import Branch, Company, Media, Staff, Task
+from users.models import User, UserProfile
+
+
+# Rows seeded per company (users) or per farm (everything else).
+SCALES = {
+    "small": {"companies": 1, "farms": 2, "staff": 5, "nets": 10, "ponds": 10, "batches": 4,
+              "net_uses": 250, "pond_uses": 250, "tasks": 500, "media_per_use": 1},
+    "medium": {"companies": 2, "farms": 3, "staff": 10, "nets": 40, "ponds": 40, "batches": 12,
+               "net_uses": 2500, "pond_uses": 2500, "tasks": 5000, "media_per_use": 2},
+    "large": {"companies": 3, "farms": 4, "staff": 20, "nets": 100, "ponds": 100, "batches": 30,
+              "net_uses": 10000, "pond_uses": 10000, "tasks": 20000, "media_per_use": 2},
+}
+
+# Distinct enough to pass Farm.clean()'s similar-name check within a company.
+FARM_NAMES = ["Amber Ridge", "Kola Valley", "Osun Delta", "Iroko Grove", "Baobab Hill", "Niger Bend", "Sahel Plain"]
+
+# Fixed calendar anchor so two runs with the same seed store identical rows.
+BASE_DATE = date(2025, 1, 6)
+
+# A scenario regresses when a latency percentile grows by more than the tolerance
+# (and by at least MIN_LATENCY_DELTA_MS, so sub-millisecond noise is ignored), or
+# when it runs more queries or fails more requests than the baseline.
+DEFAULT_TOLERANCE = 0.25
+MIN_LATENCY_DELTA_MS = 2.0
+COMPARED_PERCENTILES = ("p50", "p90")
+
+ACTIVITIES = ["Incubation", "Nursery", "Growout", "PrePuppa", "Puppa"]
+
+
+def _day(rng, span=365):
+    return BASE_DATE + timedelta(days=rng.randrange(span))
+
+
+def _moment(day):
+    return make_aware(datetime.combine(day, time(8)))
+
+
+def _ids(queryset):
+    return list(queryset.order_by("pk").values_list("pk", flat=True))
+
+
+def _seed_users(company_index, count):
+    users = []
+    for index in range(count + 1):
+        user = User.objects.create_user(
+            email=f"user{company_index}-{index}@benchmark.example",
+            username=f"bench{company_index}-{index}",
+            password="benchmark",
+        )
+        UserProfile.objects.filter(user=user).update(phone=f"+1555{company_index:02d}{index:05d}")
+        users.append(user)
+    return users[0], users[1:]
+
+
+def _seed_farm(rng, counts, company, owner, staff, name, benchmark_user):
+    farm = Farm(
+        company=company, creatorId=owner, name=name, description=f"Synthetic farm {name}.",
+        location=name, contact_number="+15550000000", email=f"{name.replace(' ', '').lower()}@benchmark.example",
+        status="active",
+    )
+    farm.save()  # Creates the Branch through company.signals
+    branch = Branch.objects.get(branch_id=farm.pk, appName="bsf")
+
+    StaffMember.objects.bulk_create([
+        StaffMember(
+            user=user, company=company, farm=farm, branch=branch, created_by=owner,
+            position="manager" if user == benchmark_user else "worker",
+            level=5 if user == benchmark_user else rng.randint(1, 4),
+        )
+        for user in staff
+    ])
+
+    Net.objects.bulk_create([
+        Net(name=f"Net {index + 1}", length=rng.uniform(2, 6), width=rng.uniform(2, 6), height=rng.uniform(1, 3),
+            expect_harvest=rng.uniform(100, 900), company=company, branch=branch, farm=farm)
+        for index in range(counts["nets"])
+    ])
+    Pond.objects.bulk_create([
+        Pond(pond_name=f"{company.pk}-{farm.pk}-P{index + 1}", pond_type=rng.choice(["Concrete", "Rubber-Tire"]),
+             pond_use=rng.choice(["Incubator", "Nursery", "Grow Out", "Multiple"]),
+             width=Decimal("2.50"), length=Decimal("4.00"), depth=Decimal("1.20"), shape="Rectangular",
+             status="Active" if rng.random() < 0.9 else "Inactive", farm=farm, company=company, created_by=owner)
+        for index in range(counts["ponds"])
+    ])
+    Batch.objects.bulk_create([
+        Batch(batch_name=batch_name, company=company, farm=farm, cretated_by=owner, laying_start_date=_day(rng))
+        for batch_name in reserve_batch_names(farm.pk, counts["batches"])
+    ])
+
+    net_ids = _ids(Net.objects.filter(farm=farm))
+    pond_ids = _ids(Pond.objects.filter(farm=farm))
+    active_pond_ids = _ids(Pond.objects.filter(farm=farm, status="Active"))
+    pond_names = dict(Pond.objects.filter(farm=farm).values_list("pk", "pond_name"))
+    batch_ids = _ids(Batch.objects.filter(farm=farm))
+    workers = [user.pk for user in staff]
+
+    net_uses = []
+    for _ in range(counts["net_uses"]):
+        lay_start = _day(rng)
+        net_uses.append(NetUseStats(
+            company=company, farm=farm, net_id=rng.choice(net_ids), batch_id=rng.choice(batch_ids),
+            lay_start=lay_start, lay_end=lay_start + timedelta(days=rng.randint(3, 10)),
+            harvest_weight=rng.uniform(50, 900), stats="completed", created_by_id=rng.choice(workers),
+            created_at=lay_start, updated_at=lay_start,
+        ))
+    # Half of the nets are in use; their ongoing row becomes Net.current_use below.
+    for net_id in net_ids[::2]:
+        lay_start = BASE_DATE + timedelta(days=365)
+        net_uses.append(NetUseStats(
+            company=company, farm=farm, net_id=net_id, batch_id=rng.choice(batch_ids), lay_start=lay_start,
+            stats="ongoing", created_by_id=rng.choice(workers), created_at=lay_start, updated_at=lay_start,
+        ))
+    NetUseStats.objects.bulk_create(net_uses, batch_size=1000)
+
+    pond_uses = []
+    for _ in range(counts["pond_uses"]):
+        start_date = _day(rng)
+        pond_id = rng.choice(pond_ids)
+        pond_uses.append(PondUseStats(
+            company=company, farm=farm, pond_id=pond_id, pond_name=pond_names[pond_id], batch_id=rng.choice(batch_ids),
+            start_date=start_date, start_weight=Decimal(rng.randint(100, 5000)), harvest_date=start_date + timedelta(days=14),
+            harvest_weight=Decimal(rng.randint(1, 50)), harvest_stage=rng.choice(["Incubation", "Nursery", "Growout"]),
+            status="Completed", created_by_id=rng.choice(workers),
+        ))
+    for pond_id in active_pond_ids[::2]:
+        pond_uses.append(PondUseStats(
+            company=company, farm=farm, pond_id=pond_id, pond_name=pond_names[pond_id], batch_id=rng.choice(batch_ids),
+            start_date=BASE_DATE + timedelta(days=365), start_weight=Decimal(rng.randint(100, 5000)),
+            harvest_stage="Nursery", status="Ongoing", created_by_id=rng.choice(workers),
+        ))
+    PondUseStats.objects.bulk_create(pond_uses, batch_size=1000)
+
+    # bulk_create skips save(), so point the occupied nets and ponds at their ongoing rows here.
+    Net.objects.bulk_update([
+        Net(pk=net_id, current_use_id=use_id)
+        for use_id, net_id in NetUseStats.objects.filter(farm=farm, stats="ongoing").values_list("pk", "net_id")
+    ], ["current_use"])
+    Pond.objects.bulk_update([
+        Pond(pk=pond_id, current_use_id=use_id)
+        for use_id, pond_id in PondUseStats.objects.filter(farm=farm, status="Ongoing").values_list("pk", "pond_id")
+    ], ["current_use"])
+
+    media = []
+    for model_name, ids in (
+        ("NetUseStats", _ids(NetUseStats.objects.filter(farm=farm))),
+        ("PondUseStats", _ids(PondUseStats.objects.filter(farm=farm))),
+        ("Ponds", pond_ids),
+    ):
+        for model_id in ids:
+            for index in range(counts["media_per_use"]):
+                media.append(Media(
+                    company=company, branch=branch, app_name="bsf", model_name=model_name, model_id=model_id,
+                    title=f"{model_name} {model_id} #{index + 1}", file=f"benchmark/{model_name.lower()}/{model_id}-{index}.jpg",
+                    status="active", uploaded_by_id=rng.choice(workers), processing_status=DONE,
+                ))
+    Media.objects.bulk_create(media, batch_size=1000)
+
+    tasks = []
+    for index in range(counts["tasks"]):
+        activity = rng.choice(ACTIVITIES)
+        tasks.append(Task(
+            company=company, branch=branch, appName="bsf", modelName=rng.choice(["NetUseStats", "PondUseStats"]),
+            activity=activity, title=f"{rng.choice(['Start', 'End'])} - {activity} activity #{index + 1}",
+            description="Synthetic benchmark task.", due_date=_moment(_day(rng)),
+            assigned_to_id=rng.choice(workers), assistant_id=rng.choice(workers),
+            status=rng.choice(["active", "active", "pending", "completed"]),
+        ))
+    Task.objects.bulk_create(tasks, batch_size=1000)
+    return farm, branch
+
+
+def seed_dataset(scale="small", seed=0, pond_pool=0):
+    """
+    Create a synthetic dataset of the given scale (see SCALES); the same seed always produces the same rows.
+
+    Returns the ids the scenarios need. The first staff member of the first
+    company is the benchmark user; `pond_pool` free ponds are created on an
+    extra farm of that company so every pondsTask request can start a new use.
+    """
+    counts = SCALES[scale]
+    rng = random.Random(seed)
+    dataset = {}
+
+    for company_index in range(counts["companies"]):
+        owner, staff = _seed_users(company_index, counts["staff"])
+        company = Company.objects.create(
+            name=f"Benchmark Company {company_index + 1}", email=f"company{company_index}@benchmark.example",
+            creator=owner, status="active",
+        )
+        Staff.objects.bulk_create([Staff(user=user, company=company, added_by=owner) for user in staff])
+
+        benchmark_user = staff[0] if company_index == 0 else None
+        farms = [
+            _seed_farm(rng, counts, company, owner, staff, FARM_NAMES[farm_index], benchmark_user)
+            for farm_index in range(counts["farms"])
+        ]
+        if benchmark_user is None:
+            continue
+
+        farm, branch = farms[0]
+        pool_farm = Farm(
+            company=company, creatorId=owner, name=FARM_NAMES[counts["farms"]], description="Ponds used by pondsTask.",
+            location="Pool", contact_number="+15550000000", email="pool@benchmark.example", status="active",
+        )
+        pool_farm.save()
+        pool_branch = Branch.objects.get(branch_id=pool_farm.pk, appName="bsf")
+        Pond.objects.bulk_create([
+            Pond(pond_name=f"{company.pk}-pool-P{index + 1}", pond_type="Concrete", pond_use="Multiple",
+                 width=Decimal("2.50"), length=Decimal("4.00"), depth=Decimal("1.20"), shape="Rectangular",
+                 status="Active", farm=pool_farm, company=company, created_by=owner)
+            for index in range(pond_pool)
+        ])
+        pool_batch = Batch.objects.create(company=company, farm=pool_farm, cretated_by=owner)
+
+        dataset.update({
+            "user": benchmark_user,
+            "phone": UserProfile.objects.get(user=benchmark_user).phone,
+            "company": company.pk,
+            "branch": branch.pk,
+            # The batch with the most NetUseStats rows in the benchmark farm
+            "batch": Batch.objects.filter(farm=farm).annotate(uses=Count("net_use_stats")).order_by("-uses", "pk")[0].batch_name,
+            "pool_branch": pool_branch.pk,
+            "pool_batch": pool_batch.batch_name,
+            "pool_ponds": _ids(Pond.objects.filter(farm=pool_farm)),
+        })
+
+    dataset["rows"] = {
+        model._meta.label: model.objects.count()
+        for model in (Company, Branch, Farm, Net, Pond, Batch, NetUseStats, PondUseStats, Media, Task)
+    }
+    return dataset
+
+
+def build_scenarios(dataset):
+    """
+    The hot endpoints as {name: (method, path, data(iteration), prepare(iteration) or None, authenticated)}.
+    """
+    params = {"company": dataset["company"], "branch": dataset["branch"]}
+
+    def whatsapp_login(iteration):
+        # A confirmed WhatsApp login, so the webhook goes straight to task retrieval.
+        cache.set(f"whatsapp_logged_in_{dataset['phone']}", dataset["user"].pk, timeout=86400)
+
+    return {
+        "company.tasks": (
+            "get", "/api/company/tasks/", lambda iteration: {"page_size": 50}, None, True,
+        ),
+        "bsf.ponds.available": (
+            "get", "/api/bsf/ponds/", lambda iteration: {**params, "available": "true"}, None, True,
+        ),
+        "bsf.net_use_stats.retrieve_all": (
+            "get", "/api/bsf/net-use-stats/retrieve-all/", lambda iteration: {**params, "batch": dataset["batch"]}, None, True,
+        ),
+        "bsf.ponds_task.start": (
+            "post", "/api/bsf/pondsTask",
+            lambda iteration: {
+                "company": dataset["company"], "branch": dataset["pool_branch"], "batch": dataset["pool_batch"],
+                "activity": "Incubation", "stage": "Start", "pond_0": dataset["pool_ponds"][iteration],
+                "startDate_0": BASE_DATE.isoformat(), "startWeight_0": "250",
+            },
+            None, True,
+        ),
+        "whatsapp.webhook.my_tasks": (
+            "post", "/api/users/whatsApp/",
+            lambda iteration: {"From": f"whatsapp:{dataset['phone']}", "Body": "My tasks"}, whatsapp_login, False,
+        ),
+    }
+
+
+def percentile(values, fraction):
+    """
+    Nearest-rank percentile of already sorted values.
+    """
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, max(0, math.ceil(fraction * len(values)) - 1))]
+
+
+def summarize(latencies, queries, db_ms, statuses):
+    latencies, queries = sorted(latencies), sorted(queries)
+    codes = {}
+    for code in statuses:
+        codes[str(code)] = codes.get(str(code), 0) + 1
+    return {
+        "requests": len(latencies),
+        "errors": sum(1 for code in statuses if code >= 400),
+        "status_codes": codes,
+        "latency_ms": {
+            "p50": round(percentile(latencies, 0.50), 2),
+            "p90": round(percentile(latencies, 0.90), 2),
+            "p99": round(percentile(latencies, 0.99), 2),
+            "mean": round(sum(latencies) / len(latencies), 2) if latencies else 0.0,
+            "max": round(latencies[-1], 2) if latencies else 0.0,
+        },
+        "queries": {
+            "min": queries[0] if queries else 0,
+            "max": queries[-1] if queries else 0,
+            "mean": round(sum(queries) / len(queries), 2) if queries else 0.0,
+        },
+        "db_ms_mean": round(sum(db_ms) / len(db_ms), 2) if db_ms else 0.0,
+    }
+
+
+def run_scenario(client, scenario, iterations, warmup=0):
+    """
+    Send the scenario's request warmup + iterations times; only the measured iterations are summarized.
+    """
+    method, path, data, prepare, _ = scenario
+    latencies, queries, db_ms, statuses = [], [], [], []
+    for iteration in range(warmup + iterations):
+        if prepare:
+            prepare(iteration)
+        payload = data(iteration)
+        with instrumentation.measure() as metrics:
+            response = getattr(client, method)(path, payload)
+            elapsed = metrics.elapsed_ms
+        if iteration < warmup:
+            continue
+        latencies.append(elapsed)
+        queries.append(metrics.queries)
+        db_ms.append(metrics.db_ms)
+        statuses.append(response.status_code)
+    return summarize(latencies, queries, db_ms, statuses)
+
+
+def run_benchmark(scale="small", seed=0, iterations=50, warmup=5, only=None, stdout=None):
+    """
+    Seed a dataset and drive every scenario through the test client; returns the JSON-ready report.
+
+    Must run against a disposable database: it writes thousands of rows.
+    """
+    from rest_framework.test import APIClient
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    instrumentation.install()
+    started = datetime.now()
+    dataset = seed_dataset(scale, seed, pond_pool=warmup + iterations)
+    if stdout:
+        stdout.write(f"Seeded {scale} dataset in {(datetime.now() - started).total_seconds():.1f}s: {dataset['rows']}")
+
+    authenticated = APIClient()
+    authenticated.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(dataset['user'])}")
+    anonymous = APIClient()
+
+    results = {}
+    for name, scenario in build_scenarios(dataset).items():
+        if only and name not in only:
+            continue
+        client = authenticated if scenario[4] else anonymous
+        results[name] = run_scenario(client, scenario, iterations, warmup)
+        if stdout:
+            summary = results[name]
+            stdout.write(
+                f"{name}: p50 {summary['latency_ms']['p50']} ms, p90 {summary['latency_ms']['p90']} ms, "
+                f"p99 {summary['latency_ms']['p99']} ms, {summary['queries']['max']} queries, "
+                f"status {summary['status_codes']}"
+            )
+
+    return {
+        "meta": {
+            "scale": scale,
+            "seed": seed,
+            "iterations": iterations,
+            "warmup": warmup,
+            "rows": dataset["rows"],
+            "database": connection.vendor,
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+        },
+        "scenarios": results,
+    }
+
+
+def compare_reports(baseline, current, tolerance=DEFAULT_TOLERANCE):
+    """
+    List the regressions of `current` against `baseline` as human-readable strings; empty when none.
+    """
+    regressions = []
+    for key in ("scale", "seed"):
+        if baseline["meta"].get(key) != current["meta"].get(key):
+            regressions.append(
+                f"Runs are not comparable: {key} {baseline['meta'].get(key)!r} vs {current['meta'].get(key)!r}."
+            )
+    if regressions:
+        return regressions
+
+    for name, before in baseline["scenarios"].items():
+        after = current["scenarios"].get(name)
+        if after is None:
+            continue
+        for key in COMPARED_PERCENTILES:
+            old, new = before["latency_ms"][key], after["latency_ms"][key]
+            if new > old * (1 + tolerance) and new - old >= MIN_LATENCY_DELTA_MS:
+                regressions.append(f"{name}: {key} latency {old} ms -> {new} ms (+{(new / old - 1) * 100 if old else 100:.0f}%)")
+        if after["queries"]["max"] > before["queries"]["max"]:
+            regressions.append(f"{name}: queries {before['queries']['max']} -> {after['queries']['max']}")
+        if after["errors"] > before["errors"]:
+            regressions.append(f"{name}: failed requests {before['errors']} -> {after['errors']} ({after['status_codes']})")
+    return regressions
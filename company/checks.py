@@ -0,0 +1,74 @@
+from django.conf import settings
+from django.core import checks
+
+
+PROCESS_LOCAL_CACHES = (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+# Shared between workers, but incr() is a non-atomic get and set, so concurrent
+# counters (outbox rate limit, permission cache version) lose updates.
+NON_ATOMIC_CACHES = (
+    "django.core.cache.backends.filebased.FileBasedCache",
+)
+
+
+@checks.register(checks.Tags.caches)
+def check_shared_state(app_configs, **kwargs):
+    """
+    Warn when several web workers are configured but caches or WhatsApp sessions live in each process,
+    or the cache cannot count atomically across them.
+    """
+    workers = getattr(settings, "WEB_CONCURRENCY", 1)
+    if workers <= 1:
+        return []
+
+    messages = []
+    for alias, cache_settings in settings.CACHES.items():
+        if cache_settings.get("BACKEND") in PROCESS_LOCAL_CACHES:
+            messages.append(checks.Warning(
+                f"Cache '{alias}' uses the process-local {cache_settings['BACKEND'].rsplit('.', 1)[-1]} "
+                f"but WEB_CONCURRENCY is {workers}.",
+                hint="Each worker would keep its own permission cache, login state and send rate limit. "
+                     "Set CACHE_BACKEND to redis, memcached or database.",
+                id="company.W001",
+            ))
+        elif cache_settings.get("BACKEND") in NON_ATOMIC_CACHES:
+            messages.append(checks.Warning(
+                f"Cache '{alias}' uses {cache_settings['BACKEND'].rsplit('.', 1)[-1]}, whose incr() is not atomic, "
+                f"but WEB_CONCURRENCY is {workers}.",
+                hint="Concurrent workers would lose outbox rate-limit counts and permission cache version bumps. "
+                     "Set CACHE_BACKEND to redis, memcached or database.",
+                id="company.W004",
+            ))
+    if getattr(settings, "WHATSAPP_SESSION_BACKEND", "").endswith(".LocalBackend"):
+        messages.append(checks.Warning(
+            f"WhatsApp conversations use the in-process LocalBackend but WEB_CONCURRENCY is {workers}.",
+            hint="Use whatsapp.sessions.DatabaseBackend or FileBackend.",
+            id="company.W002",
+        ))
+    return messages
+
+
+@checks.register(checks.Tags.database, deploy=True)
+def check_persistent_connections(app_configs, **kwargs):
+    """
+    Warn (with --deploy) when database connections are closed after every request.
+    """
+    return [
+        checks.Warning(
+            f"Database '{alias}' opens a new connection for every request (CONN_MAX_AGE is 0).",
+            hint="Set DB_CONN_MAX_AGE to keep connections open between requests.",
+            id="company.W003",
+        )
+        for alias, database in settings.DATABASES.items()
+        if not database.get("CONN_MAX_AGE")
+    ]
+
+
+def log_startup_warnings(logger):
+    """
+    Run the shared-state check when a server process starts; WSGI servers don't run system checks themselves.
+    """
+    for message in check_shared_state(None):
+        logger.warning("%s: %s %s", message.id, message.msg, message.hint)
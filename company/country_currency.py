@@ -0,0 +1,88 @@
+from pathlib import Path
+from django.conf import settings
+import json
+import logging
+import threading
+import time
+import unicodedata
+
+
+logger = logging.getLogger(__name__)
+
+# Country -> currency table shipped with the app. `manage.py load_country_currencies`
+# refreshes it (or the file named by COUNTRY_CURRENCY_DATA_PATH) from restcountries.com.
+BUNDLED_DATA_PATH = Path(__file__).resolve().parent / "data" / "country_currencies.json"
+CACHE_TTL_SECONDS = getattr(settings, "COUNTRY_CURRENCY_CACHE_TTL", 60 * 60 * 24)
+UNKNOWN_SYMBOL = "N/A"
+
+_lock = threading.Lock()
+_table = None
+_loaded_at = 0.0
+
+
+def get_data_path():
+    return Path(getattr(settings, "COUNTRY_CURRENCY_DATA_PATH", None) or BUNDLED_DATA_PATH)
+
+
+def normalize_country(name):
+    """
+    Case-, accent- and whitespace-insensitive key for a country name or ISO code.
+    """
+    name = unicodedata.normalize("NFKD", str(name).replace("’", "'"))
+    return " ".join(name.encode("ascii", "ignore").decode("ascii").casefold().split())
+
+
+def build_table(records):
+    """
+    Index records by normalized name, aliases and ISO alpha-2/alpha-3 codes.
+    """
+    table = {}
+    for record in records:
+        keys = [record.get("name"), record.get("alpha2"), record.get("alpha3"), *record.get("aliases", [])]
+        for key in filter(None, keys):
+            table.setdefault(normalize_country(key), record)
+    return table
+
+
+def load_records(path=None):
+    with open(path or get_data_path(), encoding="utf-8") as data_file:
+        return json.load(data_file)
+
+
+def get_table():
+    """
+    Return the in-memory lookup table, reloading it from disk once the TTL has expired.
+
+    A failed reload keeps serving the previous table; lookups never touch the network.
+    """
+    global _table, _loaded_at
+    with _lock:
+        if _table is None or time.monotonic() - _loaded_at > CACHE_TTL_SECONDS:
+            try:
+                _table = build_table(load_records())
+            except (OSError, ValueError) as e:
+                logger.error("Could not load country currency data from %s: %s", get_data_path(), e)
+                if _table is None:
+                    _table = {}
+            _loaded_at = time.monotonic()
+        return _table
+
+
+def clear_cache():
+    global _table
+    with _lock:
+        _table = None
+
+
+def lookup_country(country):
+    """
+    Return the currency record for a country name or ISO code, or None.
+    """
+    if not country:
+        return None
+    return get_table().get(normalize_country(country))
+
+
+def get_currency_symbol(country, default=UNKNOWN_SYMBOL):
+    record = lookup_country(country)
+    return (record or {}).get("currency_symbol") or default
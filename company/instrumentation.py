@@ -0,0 +1,288 @@
+from contextvars import ContextVar
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from functools import wraps
+from urllib.parse import urlparse
+import heapq
+import logging
+import random
+import threading
+import time
+
+
+logger = logging.getLogger(__name__)
+
+# Requests slower than this are logged with their slowest queries, for a sample of them.
+SLOW_REQUEST_MS = getattr(settings, "SLOW_REQUEST_MS", 1000)
+SLOW_REQUEST_SAMPLE_RATE = getattr(settings, "SLOW_REQUEST_SAMPLE_RATE", 1.0)
+SLOW_REQUEST_TOP_QUERIES = getattr(settings, "SLOW_REQUEST_TOP_QUERIES", 5)
+# Add a Server-Timing header with the request's counters to every response.
+TIMING_HEADERS = getattr(settings, "INSTRUMENTATION_HEADERS", settings.DEBUG)
+# Raise QueryBudgetExceeded instead of logging when a view exceeds its query budget (test runs).
+ENFORCE_QUERY_BUDGETS = getattr(settings, "QUERY_BUDGETS_ENFORCED", False)
+STATS_REPORT_EVERY = 1000  # Log per-endpoint totals every N requests
+
+CACHE_METHODS = ("get", "set", "add", "delete", "incr", "decr", "get_many", "set_many", "delete_many", "touch", "has_key")
+
+# Metrics scopes active in the current request/task; contextvars keep concurrent requests apart.
+_scopes = ContextVar("instrumentation_scopes", default=())
+# Set while an outgoing HTTP call is timed, so redirects followed inside it are not counted again.
+_in_http = ContextVar("instrumentation_in_http", default=False)
+_installed = False
+_install_lock = threading.Lock()
+_stats_lock = threading.Lock()
+_endpoint_stats = {}
+_requests_seen = 0
+
+
+class QueryBudgetExceeded(AssertionError):
+    """
+    A view ran more SQL queries than its declared budget.
+    """
+
+
+class Metrics:
+    """
+    Counters for one request (or one query_budget scope).
+    """
+
+    def __init__(self, keep_queries=SLOW_REQUEST_TOP_QUERIES):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_ms = 0.0
+        self.cache_calls = 0
+        self.cache_ms = 0.0
+        self.http_calls = 0
+        self.http_ms = 0.0
+        self.http_hosts = {}
+        self.keep_queries = keep_queries
+        self.slowest = []  # min-heap of (ms, sql)
+
+    @property
+    def elapsed_ms(self):
+        return (time.perf_counter() - self.started) * 1000
+
+    def add_query(self, sql, ms):
+        self.queries += 1
+        self.db_ms += ms
+        if self.keep_queries:
+            entry = (ms, sql[:500])
+            if len(self.slowest) < self.keep_queries:
+                heapq.heappush(self.slowest, entry)
+            elif ms > self.slowest[0][0]:
+                heapq.heapreplace(self.slowest, entry)
+
+    def top_queries(self):
+        return sorted(self.slowest, reverse=True)
+
+    def as_dict(self):
+        return {
+            "queries": self.queries,
+            "db_ms": round(self.db_ms, 1),
+            "cache_calls": self.cache_calls,
+            "cache_ms": round(self.cache_ms, 1),
+            "http_calls": self.http_calls,
+            "http_ms": round(self.http_ms, 1),
+            "http_hosts": dict(self.http_hosts),
+            "total_ms": round(self.elapsed_ms, 1),
+        }
+
+
+class measure:
+    """
+    Context manager that collects Metrics for the code it wraps; scopes nest.
+    """
+
+    def __init__(self, keep_queries=0):
+        self.metrics = Metrics(keep_queries=keep_queries)
+
+    def __enter__(self):
+        self._token = _scopes.set(_scopes.get() + (self.metrics,))
+        return self.metrics
+
+    def __exit__(self, *exc_info):
+        _scopes.reset(self._token)
+
+
+def _record_query(execute, sql, params, many, context):
+    scopes = _scopes.get()
+    if not scopes:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        ms = (time.perf_counter() - started) * 1000
+        for metrics in scopes:
+            metrics.add_query(sql, ms)
+
+
+def _wrap_cache_method(method):
+    @wraps(method)
+    def wrapper(*args, **kwargs):
+        scopes = _scopes.get()
+        if not scopes:
+            return method(*args, **kwargs)
+        started = time.perf_counter()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            ms = (time.perf_counter() - started) * 1000
+            for metrics in scopes:
+                metrics.cache_calls += 1
+                metrics.cache_ms += ms
+    wrapper._instrumented = True
+    return wrapper
+
+
+def _wrap_http_send(method):
+    # Session.send is what every requests call ends in, including clients that
+    # prepare requests themselves (TwilioHttpClient); redirects re-enter it.
+    @wraps(method)
+    def wrapper(session, request, **kwargs):
+        scopes = _scopes.get()
+        if not scopes or _in_http.get():
+            return method(session, request, **kwargs)
+        token = _in_http.set(True)
+        started = time.perf_counter()
+        try:
+            return method(session, request, **kwargs)
+        finally:
+            _in_http.reset(token)
+            ms = (time.perf_counter() - started) * 1000
+            host = urlparse(str(request.url)).hostname or "unknown"
+            for metrics in scopes:
+                metrics.http_calls += 1
+                metrics.http_ms += ms
+                metrics.http_hosts[host] = metrics.http_hosts.get(host, 0) + 1
+    wrapper._instrumented = True
+    return wrapper
+
+
+def _instrument_connection(sender, connection, **kwargs):
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_query)
+
+
+def install():
+    """
+    Hook query, cache and outgoing HTTP counters into Django and requests; idempotent.
+
+    The hooks only do work while a Metrics scope is active, so code running
+    outside a request (workers, commands) pays a single context lookup.
+    """
+    global _installed
+    with _install_lock:
+        if _installed:
+            return
+        from django.core.cache import caches
+        from django.core.cache.backends.base import BaseCache
+        from django.db import connections
+        import requests
+
+        connection_created.connect(_instrument_connection, dispatch_uid="company.instrumentation")
+        for connection in connections.all(initialized_only=True):
+            _instrument_connection(None, connection)
+
+        for alias in settings.CACHES:
+            cache_class = type(caches[alias])
+            for name in CACHE_METHODS:
+                # BaseCache fallbacks (get_many, has_key, ...) call the backend's own methods; count those once.
+                if not any(name in klass.__dict__ for klass in cache_class.__mro__ if klass is not BaseCache):
+                    continue
+                method = getattr(cache_class, name)
+                if not getattr(method, "_instrumented", False):
+                    setattr(cache_class, name, _wrap_cache_method(method))
+
+        if not getattr(requests.Session.send, "_instrumented", False):
+            requests.Session.send = _wrap_http_send(requests.Session.send)
+        _installed = True
+
+
+def _record_endpoint(endpoint, metrics):
+    global _requests_seen
+    with _stats_lock:
+        stats = _endpoint_stats.setdefault(endpoint, {"requests": 0, "queries": 0, "db_ms": 0.0, "total_ms": 0.0})
+        stats["requests"] += 1
+        stats["queries"] += metrics.queries
+        stats["db_ms"] += metrics.db_ms
+        stats["total_ms"] += metrics.elapsed_ms
+        _requests_seen += 1
+        report = _requests_seen % STATS_REPORT_EVERY == 0
+    if report:
+        for name, totals in endpoint_stats().items():
+            logger.info(
+                "Endpoint %s: %s requests, %.1f queries and %.1f ms on average",
+                name, totals["requests"], totals["queries"] / totals["requests"], totals["total_ms"] / totals["requests"],
+            )
+
+
+def endpoint_stats():
+    """
+    Per-endpoint totals since the process started: {url name: {requests, queries, db_ms, total_ms}}.
+    """
+    with _stats_lock:
+        return {endpoint: dict(stats) for endpoint, stats in _endpoint_stats.items()}
+
+
+class InstrumentationMiddleware:
+    """
+    Records query count, DB time, cache calls, outgoing HTTP calls and latency of every request, tagged by URL name.
+    """
+
+    def __init__(self, get_response):
+        install()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        scope = measure(keep_queries=SLOW_REQUEST_TOP_QUERIES)
+        with scope as metrics:
+            response = self.get_response(request)
+
+        match = getattr(request, "resolver_match", None)
+        endpoint = (match.view_name if match and match.view_name else None) or request.path
+        _record_endpoint(endpoint, metrics)
+
+        summary = metrics.as_dict()
+        logger.debug("%s %s %s", request.method, endpoint, summary, extra={"endpoint": endpoint, "metrics": summary})
+        if summary["total_ms"] >= SLOW_REQUEST_MS and random.random() < SLOW_REQUEST_SAMPLE_RATE:
+            logger.warning(
+                "Slow request %s %s (%s ms, %s queries, %s ms in DB); slowest queries: %s",
+                request.method, endpoint, summary["total_ms"], summary["queries"], summary["db_ms"],
+                [f"{ms:.1f} ms: {sql}" for ms, sql in metrics.top_queries()],
+                extra={"endpoint": endpoint, "metrics": summary},
+            )
+        if TIMING_HEADERS:
+            response["Server-Timing"] = (
+                f'db;dur={summary["db_ms"]};desc="{summary["queries"]} queries", '
+                f'cache;dur={summary["cache_ms"]};desc="{summary["cache_calls"]} calls", '
+                f'http;dur={summary["http_ms"]};desc="{summary["http_calls"]} calls", '
+                f'total;dur={summary["total_ms"]}'
+            )
+        return response
+
+
+def query_budget(max_queries):
+    """
+    Declare the most SQL queries a view method may run.
+
+    Over budget, the view logs a warning, or raises QueryBudgetExceeded when
+    QUERY_BUDGETS_ENFORCED is set (as in test runs), so a regression fails CI.
+    """
+    def decorator(view_method):
+        @wraps(view_method)
+        def wrapper(*args, **kwargs):
+            with measure(keep_queries=max_queries + 1) as metrics:
+                response = view_method(*args, **kwargs)
+            if metrics.queries > max_queries:
+                message = (
+                    f"{view_method.__qualname__} ran {metrics.queries} queries, over its budget of {max_queries}: "
+                    f"{[sql for _, sql in metrics.top_queries()]}"
+                )
+                if ENFORCE_QUERY_BUDGETS:
+                    raise QueryBudgetExceeded(message)
+                logger.warning(message)
+            return response
+        wrapper.query_budget = max_queries
+        return wrapper
+    return decorator
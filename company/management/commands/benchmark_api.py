@@ -0,0 +1,63 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+import json
+import os
+
+from company import benchmarks
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a synthetic dataset in a throwaway test database, drive the hot API endpoints "
+        "through the test client and write latency percentiles and query counts as JSON. "
+        "With --compare, fail when the run regressed against a baseline. Runs on SQLite with "
+        "no external services: use --settings=backend.settings_benchmark."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--scale", choices=sorted(benchmarks.SCALES), default="small")
+        parser.add_argument("--seed", type=int, default=0, help="Random seed of the synthetic dataset.")
+        parser.add_argument("--iterations", type=int, default=50, help="Measured requests per scenario.")
+        parser.add_argument("--warmup", type=int, default=5, help="Unmeasured requests per scenario.")
+        parser.add_argument("--scenario", action="append", dest="scenarios", help="Only run this scenario (repeatable).")
+        parser.add_argument("--output", default="benchmark-results.json", help="Where to write the JSON report.")
+        parser.add_argument("--compare", metavar="BASELINE", help="Baseline JSON report to compare this run against.")
+        parser.add_argument("--tolerance", type=float, default=benchmarks.DEFAULT_TOLERANCE,
+                            help="Allowed relative latency growth before a scenario counts as regressed.")
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options["compare"]:
+            try:
+                with open(options["compare"]) as handle:
+                    baseline = json.load(handle)
+            except (OSError, ValueError) as exc:
+                raise CommandError(f"Cannot read baseline {options['compare']}: {exc}")
+
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            report = benchmarks.run_benchmark(
+                scale=options["scale"], seed=options["seed"], iterations=options["iterations"],
+                warmup=options["warmup"], only=options["scenarios"], stdout=self.stdout,
+            )
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        directory = os.path.dirname(options["output"])
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(options["output"], "w") as handle:
+            json.dump(report, handle, indent=2, sort_keys=True)
+        self.stdout.write(f"Report written to {options['output']}.")
+
+        if baseline is None:
+            return
+        regressions = benchmarks.compare_reports(baseline, report, options["tolerance"])
+        if regressions:
+            for regression in regressions:
+                self.stderr.write(regression)
+            raise CommandError(f"{len(regressions)} regression(s) against {options['compare']}.")
+        self.stdout.write(self.style.SUCCESS(f"No regressions against {options['compare']}."))
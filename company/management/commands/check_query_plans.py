@@ -0,0 +1,93 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.timezone import now
+
+from bsf.models import NetUseStats, PondUseStats
+from company.models import ActivityOwner, Media, Task
+
+
+def index_name(model, fields):
+    """
+    Return the name Django generated for the Meta index on exactly `fields`.
+    """
+    for index in model._meta.indexes:
+        if list(index.fields) == list(fields):
+            return index.name
+    raise CommandError(f"{model._meta.label} has no index on {fields}.")
+
+
+def hot_filters():
+    """
+    (label, queryset, expected index) for the filters the API runs on every request.
+    """
+    overdue = now() - timedelta(days=2)
+    return [
+        (
+            "Media associated-media lookup",
+            Media.objects.filter(app_name="bsf", model_name="Batch", model_id=1, company_id=1),
+            index_name(Media, ["app_name", "model_name", "model_id", "company"]),
+        ),
+        (
+            "Media by company/branch/status",
+            Media.objects.filter(company_id=1, branch_id=1, status="active"),
+            index_name(Media, ["company", "branch", "status"]),
+        ),
+        (
+            "Tasks assigned to a user by status",
+            Task.objects.filter(assigned_to_id=1, status="active", due_date__lt=overdue),
+            index_name(Task, ["assigned_to", "status", "due_date"]),
+        ),
+        (
+            "Late tasks for an assistant",
+            Task.objects.filter(assistant_id=1, status="active", due_date__lt=overdue),
+            index_name(Task, ["assistant", "status", "due_date"]),
+        ),
+        (
+            "Delayed active tasks",
+            Task.objects.filter(status="active", due_date__lt=overdue),
+            index_name(Task, ["status", "due_date"]),
+        ),
+        (
+            "Tasks by company/branch/status",
+            Task.objects.filter(company_id=1, branch_id=1, status="active"),
+            index_name(Task, ["company", "branch", "status"]),
+        ),
+        (
+            "ActivityOwner by company/branch/activity/status",
+            ActivityOwner.objects.filter(company_id=1, branch_id=1, activity="Laying_Start", status="active"),
+            index_name(ActivityOwner, ["company", "branch", "activity", "status"]),
+        ),
+        (
+            "Ongoing NetUseStats for a net",
+            NetUseStats.objects.filter(net_id=1, stats="ongoing"),
+            index_name(NetUseStats, ["net", "stats"]),
+        ),
+        (
+            "Ongoing PondUseStats for a pond",
+            PondUseStats.objects.filter(pond_id=1, status="Ongoing"),
+            index_name(PondUseStats, ["pond", "status"]),
+        ),
+    ]
+
+
+class Command(BaseCommand):
+    help = "Run EXPLAIN on the hot Media/Task/ActivityOwner/NetUseStats/PondUseStats filters and assert they use their composite indexes."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--verbose-plans", action="store_true", help="Print every query plan.")
+
+    def handle(self, *args, **options):
+        failures = []
+        for label, queryset, expected_index in hot_filters():
+            plan = queryset.explain()
+            if options["verbose_plans"]:
+                self.stdout.write(f"{label}:\n{plan}\n")
+            if expected_index in plan:
+                self.stdout.write(self.style.SUCCESS(f"OK    {label} -> {expected_index}"))
+            else:
+                self.stdout.write(self.style.ERROR(f"FAIL  {label}: expected {expected_index}"))
+                failures.append(label)
+
+        if failures:
+            raise CommandError(f"{len(failures)} hot filter(s) do not use their index: {', '.join(failures)}")
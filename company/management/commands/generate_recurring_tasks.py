@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+from company import recurring_tasks
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate the tasks of recurring activity owners whose next period is due, "
+        "including periods missed while the scheduler was not running."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="Report what would be generated without writing anything.")
+        parser.add_argument("--company", type=int, help="Only schedule activity owners of this company id.")
+
+    def handle(self, *args, **options):
+        company = None
+        if options["company"]:
+            from company.models import Company
+            company = Company.objects.get(pk=options["company"])
+
+        report = recurring_tasks.generate_recurring_tasks(dry_run=options["dry_run"], company=company)
+        for detail in report["details"]:
+            if detail["periods"]:
+                self.stdout.write(f"Activity owner {detail['activity_owner']} ({detail['activity']}): {', '.join(detail['periods'])}")
+        prefix = "Would create" if options["dry_run"] else "Created"
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix} {report['tasks_created']} task(s) for {report['activity_owners']} due activity owner(s); "
+            f"{report['notifications_queued']} manager notification(s) queued."
+        ))
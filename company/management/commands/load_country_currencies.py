@@ -0,0 +1,66 @@
+from django.core.management.base import BaseCommand, CommandError
+from company import country_currency
+import json
+import requests
+
+
+RESTCOUNTRIES_URL = "https://restcountries.com/v3.1/all?fields=name,cca2,cca3,currencies,altSpellings"
+
+
+def records_from_restcountries(countries):
+    """
+    Convert restcountries.com v3.1 entries to the bundled record format.
+    """
+    records = []
+    for country in countries:
+        currencies = country.get("currencies") or {}
+        if not currencies:
+            continue
+        currency_code, currency = next(iter(currencies.items()))
+        aliases = [country["name"].get("official")] + [
+            spelling for spelling in country.get("altSpellings", []) if len(spelling) > 3
+        ]
+        records.append({
+            "name": country["name"]["common"],
+            "alpha2": country.get("cca2"),
+            "alpha3": country.get("cca3"),
+            "currency_code": currency_code,
+            "currency_symbol": currency.get("symbol") or currency_code,
+            "aliases": [alias for alias in aliases if alias],
+        })
+    return sorted(records, key=lambda record: record["name"])
+
+
+class Command(BaseCommand):
+    help = (
+        "Refresh the local country -> currency table used by reward calculations. "
+        "Downloads from restcountries.com, or imports a previously downloaded JSON export with --source."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--source", help="Path to a restcountries.com v3.1 JSON export to import instead of downloading.")
+        parser.add_argument("--output", help="File to write (defaults to COUNTRY_CURRENCY_DATA_PATH or the bundled table).")
+        parser.add_argument("--timeout", type=float, default=10, help="HTTP timeout in seconds.")
+
+    def handle(self, *args, **options):
+        if options["source"]:
+            with open(options["source"], encoding="utf-8") as source:
+                countries = json.load(source)
+        else:
+            try:
+                response = requests.get(RESTCOUNTRIES_URL, timeout=options["timeout"])
+                response.raise_for_status()
+                countries = response.json()
+            except (requests.RequestException, ValueError) as e:
+                raise CommandError(f"Could not download country data: {e}")
+
+        records = records_from_restcountries(countries)
+        if not records:
+            raise CommandError("No countries with currencies found; keeping the existing table.")
+
+        output = options["output"] or country_currency.get_data_path()
+        with open(output, "w", encoding="utf-8") as data_file:
+            json.dump(records, data_file, ensure_ascii=False, indent=1)
+        country_currency.clear_cache()
+
+        self.stdout.write(self.style.SUCCESS(f"Wrote {len(records)} countries to {output}."))
@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+from company.models import Media
+from company import media_ingestion
+
+
+class Command(BaseCommand):
+    help = (
+        "Extract metadata for Media rows that are still pending or failed with retries left. "
+        "Picks up work lost when a process restarted before its ingestion workers finished."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--limit", type=int, default=500, help="Maximum number of rows to process.")
+        parser.add_argument(
+            "--reset-stuck", action="store_true",
+            help="Return rows left in 'processing' (e.g. by a killed worker) to 'pending' first.",
+        )
+
+    def handle(self, *args, **options):
+        if options["reset_stuck"]:
+            reset = Media.objects.filter(processing_status=media_ingestion.PROCESSING).update(
+                processing_status=media_ingestion.PENDING
+            )
+            self.stdout.write(f"Reset {reset} stuck media row(s).")
+
+        media_ids = list(
+            Media.objects.filter(
+                processing_status__in=[media_ingestion.PENDING, media_ingestion.FAILED],
+                processing_attempts__lt=media_ingestion.MAX_ATTEMPTS,
+            ).order_by("created_date").values_list("id", flat=True)[: options["limit"]]
+        )
+
+        results = {media_ingestion.DONE: 0, media_ingestion.FAILED: 0, None: 0}
+        for media_id in media_ids:
+            results[media_ingestion.process_media(media_id)] += 1
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Processed {len(media_ids)} media row(s): {results[media_ingestion.DONE]} done, "
+            f"{results[media_ingestion.FAILED]} failed, {results[None]} skipped."
+        ))
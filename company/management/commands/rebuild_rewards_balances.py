@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from company import rewards_ledger
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute RewardsPointsBalance, RewardsPointsMonthlyRollup and the running balance "
+        "snapshots from the RewardsPointsTracker ledger."
+    )
+
+    def handle(self, *args, **options):
+        balances, rollups = rewards_ledger.rebuild_balances()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {balances} balance(s) and {rollups} monthly rollup(s)."))
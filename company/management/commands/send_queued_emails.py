@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from company import notifications
+
+
+class Command(BaseCommand):
+    help = "Send queued notification emails over a single SMTP connection."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--limit", type=int, default=200, help="Maximum number of emails to send.")
+
+    def handle(self, *args, **options):
+        sent, failed = notifications.send_queued_emails(limit=options["limit"])
+        self.stdout.write(self.style.SUCCESS(f"Sent {sent} email(s), {failed} failed."))
@@ -0,0 +1,132 @@
+from concurrent.futures import ThreadPoolExecutor
+from django.apps import apps
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db import close_old_connections
+from urllib.parse import urlparse
+import hashlib
+import logging
+import mimetypes
+import os
+import tempfile
+import threading
+
+import requests
+
+from company import uploads
+
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = getattr(settings, "MEDIA_FETCH_CHUNK_SIZE", 1024 * 1024)
+MAX_BYTES = getattr(settings, "MEDIA_FETCH_MAX_BYTES", 100 * 1024 * 1024)
+# (connect, read) timeouts in seconds for remote media downloads.
+TIMEOUT = getattr(settings, "MEDIA_FETCH_TIMEOUT", (5, 30))
+WORKERS = getattr(settings, "MEDIA_FETCH_WORKERS", 2)
+STORAGE_PREFIX = getattr(settings, "MEDIA_FETCH_STORAGE_PREFIX", "remote")
+
+_executor = None
+_executor_lock = threading.Lock()
+_local = threading.local()
+
+
+class MediaFetchError(Exception):
+    pass
+
+
+def get_executor():
+    """
+    Lazily create the process-wide, bounded pool that downloads remote media.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=WORKERS, thread_name_prefix="media-fetch")
+    return _executor
+
+
+def _session():
+    # One HTTP session per worker thread, so connections to the provider are reused.
+    if not hasattr(_local, "session"):
+        _local.session = requests.Session()
+    return _local.session
+
+
+def _extension(media_url, content_type):
+    extension = mimetypes.guess_extension((content_type or "").split(";")[0].strip()) if content_type else None
+    if not extension:
+        extension = os.path.splitext(urlparse(media_url).path)[1]
+    if extension == ".jpe":
+        extension = ".jpg"
+    return (extension or ".jpg").lower()
+
+
+def fetch_to_storage(media_url, auth=None):
+    """
+    Download a remote file into default storage under a content-addressed name.
+
+    The body is streamed in CHUNK_SIZE pieces to a temporary file and hashed on
+    the fly; the stored name is <prefix>/<sha256[:2]>/<sha256><ext>, so the same
+    content sent twice is stored once. Returns the storage name.
+    """
+    digest = hashlib.sha256()
+    size = 0
+    with _session().get(media_url, auth=auth, stream=True, timeout=TIMEOUT) as response:
+        if response.status_code != 200:
+            raise MediaFetchError(f"Download of {media_url} failed with status {response.status_code}")
+        extension = _extension(media_url, response.headers.get("Content-Type"))
+
+        with tempfile.NamedTemporaryFile(dir=uploads.temp_dir()) as tmp:
+            for chunk in response.iter_content(CHUNK_SIZE):
+                size += len(chunk)
+                if size > MAX_BYTES:
+                    raise MediaFetchError(f"Download of {media_url} exceeds {MAX_BYTES} bytes")
+                digest.update(chunk)
+                tmp.write(chunk)
+            tmp.flush()
+
+            name = f"{STORAGE_PREFIX}/{digest.hexdigest()[:2]}/{digest.hexdigest()}{extension}"
+            if default_storage.exists(name):
+                logger.debug("Media %s already stored as %s", media_url, name)
+                return name
+            tmp.seek(0)
+            return default_storage.save(name, File(tmp))
+
+
+def attach_remote_media(media_url, auth=None, **media_fields):
+    """
+    Download a remote file and create the Media row that points at it.
+
+    The row goes through Media.save, so metadata extraction is queued to the
+    media ingestion workers as for any other upload.
+    """
+    Media = apps.get_model("company", "Media")
+    name = fetch_to_storage(media_url, auth=auth)
+    media = Media(**media_fields)
+    media.file.name = name
+    if not media.title:
+        media.title = os.path.basename(name)
+    media.save()
+    return media
+
+
+def _run_in_worker(media_url, auth, media_fields):
+    try:
+        return attach_remote_media(media_url, auth=auth, **media_fields)
+    except Exception:
+        logger.exception("Fetching remote media %s failed", media_url)
+        return None
+    finally:
+        close_old_connections()
+
+
+def enqueue_remote_media(media_url, auth=None, **media_fields):
+    """
+    Download and attach a remote file off the request path. Returns a Future of the Media row (None on failure).
+    """
+    return get_executor().submit(_run_in_worker, media_url, auth, media_fields)
+
+
+def twilio_auth():
+    return (settings.TWILIO_ACCOUNT_SID, settings.TWILIO_AUTH_TOKEN)
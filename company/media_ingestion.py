@@ -0,0 +1,104 @@
+from concurrent.futures import ThreadPoolExecutor
+from django.apps import apps
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import F
+from django.utils.timezone import now
+import logging
+import threading
+
+
+logger = logging.getLogger(__name__)
+
+# Processing states stored on Media.processing_status
+PENDING = "pending"
+PROCESSING = "processing"
+DONE = "done"
+FAILED = "failed"
+
+MAX_ATTEMPTS = getattr(settings, "MEDIA_INGESTION_MAX_ATTEMPTS", 3)
+WORKERS = getattr(settings, "MEDIA_INGESTION_WORKERS", 2)
+RETRY_BACKOFF_SECONDS = getattr(settings, "MEDIA_INGESTION_RETRY_BACKOFF", 5)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """
+    Lazily create the process-wide worker pool used for metadata extraction.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=WORKERS, thread_name_prefix="media-ingest")
+    return _executor
+
+
+def enqueue_media_ingestion(media_id):
+    """
+    Hand a stored Media row to the worker pool. Returns immediately.
+    """
+    get_executor().submit(_run_in_worker, media_id)
+
+
+def _schedule_retry(media_id, attempts):
+    delay = RETRY_BACKOFF_SECONDS * (2 ** (attempts - 1))
+    timer = threading.Timer(delay, enqueue_media_ingestion, args=[media_id])
+    timer.daemon = True
+    timer.start()
+
+
+def _run_in_worker(media_id):
+    try:
+        process_media(media_id, retry=True)
+    except Exception:
+        logger.exception("Media ingestion crashed for media %s", media_id)
+    finally:
+        # Worker threads own their DB connections; don't leak them between jobs.
+        close_old_connections()
+
+
+def process_media(media_id, retry=False):
+    """
+    Extract metadata for one Media row and record the outcome.
+
+    The row is claimed with a conditional UPDATE so two workers never parse the
+    same file. Results are written with queryset updates, which bypass
+    Media.save and therefore never trigger another ingestion.
+
+    Returns the final processing state, or None if the row could not be claimed.
+    """
+    Media = apps.get_model("company", "Media")
+
+    claimed = Media.objects.filter(
+        pk=media_id,
+        processing_status__in=[PENDING, FAILED],
+        processing_attempts__lt=MAX_ATTEMPTS,
+    ).update(processing_status=PROCESSING, processing_attempts=F("processing_attempts") + 1)
+    if not claimed:
+        return None
+
+    media = Media.objects.get(pk=media_id)
+    try:
+        media.extract_metadata()
+    except Exception as e:
+        logger.warning(
+            "Metadata extraction failed for media %s (attempt %s/%s): %s",
+            media_id, media.processing_attempts, MAX_ATTEMPTS, e,
+        )
+        Media.objects.filter(pk=media_id).update(processing_status=FAILED, processing_error=str(e)[:1000])
+        if retry and media.processing_attempts < MAX_ATTEMPTS:
+            _schedule_retry(media_id, media.processing_attempts)
+        return FAILED
+
+    Media.objects.filter(pk=media_id).update(
+        creation_date=media.creation_date,
+        creation_location=media.creation_location,
+        processing_status=DONE,
+        processing_error=None,
+        processed_at=now(),
+    )
+    logger.debug("Media %s processed: creation_date=%s creation_location=%s",
+                 media_id, media.creation_date, media.creation_location)
+    return DONE
@@ -0,0 +1,46 @@
+# Generated by Django 5.1.3 on 2026-10-16 21:01
+
+import company.models
+from django.db import migrations, models
+
+
+def mark_existing_media_processed(apps, schema_editor):
+    # Rows created before this migration had their metadata extracted inline on save.
+    Media = apps.get_model('company', 'Media')
+    Media.objects.update(processing_status='done')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('company', '0050_alter_activityowner_reoccurring_end_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='media',
+            name='processed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='media',
+            name='processing_attempts',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='media',
+            name='processing_error',
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='media',
+            name='processing_status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('processing', 'Processing'), ('done', 'Done'), ('failed', 'Failed')], db_index=True, default='pending', max_length=10),
+        ),
+        migrations.AlterField(
+            model_name='media',
+            name='file',
+            field=models.FileField(max_length=1000, upload_to=company.models.media_upload_path),
+        ),
+        migrations.RunPython(mark_existing_media_processed, migrations.RunPython.noop),
+    ]
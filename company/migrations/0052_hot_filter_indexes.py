@@ -0,0 +1,43 @@
+# Generated by Django 5.1.3 on 2026-10-16 21:03
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('company', '0051_media_processing_state'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='activityowner',
+            index=models.Index(fields=['company', 'branch', 'activity', 'status'], name='company_act_company_976d16_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='media',
+            index=models.Index(fields=['app_name', 'model_name', 'model_id', 'company'], name='company_med_app_nam_4cb9bc_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='media',
+            index=models.Index(fields=['company', 'branch', 'status'], name='company_med_company_06b637_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['assigned_to', 'status', 'due_date'], name='company_tas_assigne_ad3852_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['assistant', 'status', 'due_date'], name='company_tas_assista_215851_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['status', 'due_date'], name='company_tas_status_f9cc45_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['company', 'branch', 'status'], name='company_tas_company_6a92c4_idx'),
+        ),
+    ]
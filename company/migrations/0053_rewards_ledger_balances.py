@@ -0,0 +1,102 @@
+# Generated by Django 5.1.3 on 2026-10-16 21:06
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def build_balances_from_ledger(apps, schema_editor):
+    from company.rewards_ledger import rebuild_balances
+    rebuild_balances(apps)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('company', '0052_hot_filter_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RewardsPointsBalance',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('points_available', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('points_pending', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Rewards Points Balance',
+                'verbose_name_plural': 'Rewards Points Balances',
+            },
+        ),
+        migrations.CreateModel(
+            name='RewardsPointsMonthlyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(help_text='First day of the month')),
+                ('credit_total', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('blocked_total', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('debit_total', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('pending_total', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+            ],
+            options={
+                'verbose_name': 'Rewards Points Monthly Rollup',
+                'verbose_name_plural': 'Rewards Points Monthly Rollups',
+                'ordering': ['-month'],
+            },
+        ),
+        migrations.AlterField(
+            model_name='rewardspointstracker',
+            name='points_available',
+            field=models.DecimalField(decimal_places=2, default=0, help_text='Points available after this entry', max_digits=10),
+        ),
+        migrations.AlterField(
+            model_name='rewardspointstracker',
+            name='points_pending',
+            field=models.DecimalField(decimal_places=2, default=0, help_text='Points pending approval after this entry', max_digits=10),
+        ),
+        migrations.AlterField(
+            model_name='rewardspointstracker',
+            name='transaction_type',
+            field=models.CharField(choices=[('merit', 'Merit'), ('assisted', 'Assisted'), ('pending', 'Pending'), ('approved', 'Approved'), ('staffMember', 'Staff Member')], default='merit', help_text='Type of transaction (merit, assisted, staffMember, pending, approved)', max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='rewardspointstracker',
+            index=models.Index(fields=['user', 'company', 'credit_date'], name='company_rew_user_id_c73370_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='rewardspointstracker',
+            index=models.Index(fields=['task', 'transaction_type'], name='company_rew_task_id_fc4f58_idx'),
+        ),
+        migrations.AddField(
+            model_name='rewardspointsbalance',
+            name='company',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rewards_balances', to='company.company'),
+        ),
+        migrations.AddField(
+            model_name='rewardspointsbalance',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rewards_balances', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='rewardspointsmonthlyrollup',
+            name='company',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rewards_monthly_rollups', to='company.company'),
+        ),
+        migrations.AddField(
+            model_name='rewardspointsmonthlyrollup',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rewards_monthly_rollups', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddConstraint(
+            model_name='rewardspointsbalance',
+            constraint=models.UniqueConstraint(fields=('user', 'company'), name='unique_rewards_balance_per_user_company'),
+        ),
+        migrations.AddConstraint(
+            model_name='rewardspointsmonthlyrollup',
+            constraint=models.UniqueConstraint(fields=('user', 'company', 'month'), name='unique_rewards_rollup_per_user_company_month'),
+        ),
+        migrations.RunPython(build_balances_from_ledger, migrations.RunPython.noop),
+    ]
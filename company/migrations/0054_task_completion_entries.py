@@ -0,0 +1,48 @@
+# Generated by Django 5.1.3 on 2026-10-16 21:11
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def migrate_complete_details(apps, schema_editor):
+    # Turn legacy completeDetails strings into TaskCompletionEntry rows.
+    from company.task_completion import parse_complete_details
+    Task = apps.get_model('company', 'Task')
+    TaskCompletionEntry = apps.get_model('company', 'TaskCompletionEntry')
+
+    batch = []
+    tasks = Task.objects.exclude(completeDetails__isnull=True).exclude(completeDetails='').only('id', 'completeDetails')
+    for task in tasks.iterator(chunk_size=2000):
+        batch.extend(TaskCompletionEntry(task_id=task.id, **entry) for entry in parse_complete_details(task.completeDetails))
+        if len(batch) >= 2000:
+            TaskCompletionEntry.objects.bulk_create(batch)
+            batch = []
+    TaskCompletionEntry.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('company', '0053_rewards_ledger_balances'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskCompletionEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('app_name', models.CharField(max_length=100)),
+                ('model_name', models.CharField(max_length=100)),
+                ('model_id', models.PositiveIntegerField()),
+                ('activity', models.CharField(blank=True, max_length=50, null=True)),
+                ('filled_fields', models.JSONField(blank=True, default=list, help_text='Fields of the record filled out for this task.')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('task', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='completion_entries', to='company.task')),
+            ],
+            options={
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['app_name', 'model_name', 'model_id'], name='company_tas_app_nam_f55a83_idx')],
+            },
+        ),
+        migrations.RunPython(migrate_complete_details, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,71 @@
+# Generated by Django 5.1.3 on 2026-10-16 21:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_next_run_at(apps, schema_editor):
+    # Start existing schedules at their next period from today, without catching up on the past.
+    from django.utils import timezone
+    from company.recurring_tasks import compute_next_run_at
+    ActivityOwner = apps.get_model('company', 'ActivityOwner')
+
+    owners = list(ActivityOwner.objects.filter(reoccurring=True, status='active', interval_days__gt=0))
+    today = timezone.localdate()
+    for owner in owners:
+        owner.next_run_at = compute_next_run_at(owner, after=today)
+    ActivityOwner.objects.bulk_update(owners, ['next_run_at'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('company', '0054_task_completion_entries'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='activityowner',
+            name='next_run_at',
+            field=models.DateTimeField(blank=True, help_text='Start of the next recurrence period to generate a task for. Maintained by the recurring task scheduler.', null=True),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='activity_owner',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='recurring_tasks', to='company.activityowner'),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='recurrence_period',
+            field=models.DateField(blank=True, help_text='Start of the recurrence period this task was generated for.', null=True),
+        ),
+        migrations.CreateModel(
+            name='QueuedEmail',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('recipient', models.EmailField(max_length=254)),
+                ('subject', models.CharField(max_length=255)),
+                ('message', models.TextField()),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('sent', 'Sent'), ('failed', 'Failed')], default='pending', max_length=10)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('last_error', models.TextField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('sent_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Queued Email',
+                'verbose_name_plural': 'Queued Emails',
+                'ordering': ['created_at'],
+                'indexes': [models.Index(fields=['status', 'created_at'], name='company_que_status_eb50f8_idx')],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='activityowner',
+            index=models.Index(fields=['reoccurring', 'status', 'next_run_at'], name='company_act_reoccur_20b4ae_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='task',
+            constraint=models.UniqueConstraint(fields=('activity_owner', 'recurrence_period'), name='unique_recurring_task_per_period'),
+        ),
+        migrations.RunPython(backfill_next_run_at, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.3 on 2026-10-16 23:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('company', '0055_recurring_task_scheduler'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='media',
+            name='checksum',
+            field=models.CharField(blank=True, help_text='SHA-256 of the file, computed while it was uploaded.', max_length=64, null=True),
+        ),
+    ]
@@ -1,8 +1,7 @@
-from django.db import models
+from django.db import models, transaction
 
 import exifread  
 import datetime
-import requests
 import os
 
 from users.models import User 
@@ -17,6 +16,12 @@ from geopy.geocoders import Nominatim
 from pymediainfo import MediaInfo
 from hachoir.parser import createParser
 from hachoir.metadata import extractMetadata
+import logging
+
+from company import country_currency, media_ingestion, recurring_tasks, rewards_ledger
+
+
+logger = logging.getLogger(__name__)
 
 
 
@@ -252,6 +257,17 @@ class Staff(models.Model):
         self.full_clean()
         super().save(*args, **kwargs)
 
+    # Fixed points-per-currency-unit conversion rate
+    REWARD_POINTS_CONVERSION_RATE = 643
+
+    def get_max_reward_points(self):
+        """
+        Maximum reward points that can be allocated to this staff member per month.
+        """
+        if not (self.salary and self.reward_factor):
+            return 0
+        return self.salary * self.reward_factor * self.REWARD_POINTS_CONVERSION_RATE
+
     def get_max_reward_points_and_value(self):
         """
         Calculate the maximum reward points that can be allocated to a staff member per month
@@ -264,14 +280,11 @@ class Staff(models.Model):
                 "currency_symbol": "N/A",
             }
 
-        # Set fixed conversion rate
-        conversion_rate = 643
-
         # Calculate max points
-        max_points = self.salary * self.reward_factor * conversion_rate
+        max_points = self.get_max_reward_points()
 
         # Calculate value in currency
-        value_in_currency = max_points / conversion_rate
+        value_in_currency = max_points / self.REWARD_POINTS_CONVERSION_RATE
 
         # Get branch and country details
         branch = self.company.branches.filter(staff_members__user=self.user).first()
@@ -282,16 +295,8 @@ class Staff(models.Model):
                 "currency_symbol": "N/A",
             }
 
-        country = branch.country
-
-        # Fetch currency symbol from an online API
-        try:
-            response = requests.get(f"https://restcountries.com/v3.1/name/{country}?fullText=true")
-            response.raise_for_status()
-            country_data = response.json()[0]
-            currency_symbol = list(country_data['currencies'].values())[0].get('symbol', "N/A")
-        except Exception as e:
-            currency_symbol = "N/A"  # Default to N/A if API fails
+        # Resolved from the local country table; no network I/O on the reward path
+        currency_symbol = country_currency.get_currency_symbol(branch.country)
 
         return {
             "max_points": max_points,
@@ -352,6 +357,13 @@ class Media(models.Model):
         ("inactive", "Inactive"),
     ]
 
+    PROCESSING_STATUS_CHOICES = [
+        (media_ingestion.PENDING, "Pending"),
+        (media_ingestion.PROCESSING, "Processing"),
+        (media_ingestion.DONE, "Done"),
+        (media_ingestion.FAILED, "Failed"),
+    ]
+
     company = models.ForeignKey(
         'Company', on_delete=models.CASCADE, related_name="media"
     )
@@ -378,6 +390,17 @@ class Media(models.Model):
     negative_flags_count = models.PositiveIntegerField(default=0)
     comments = models.TextField(blank=True, null=True)
 
+    # Background metadata ingestion (see company/media_ingestion.py)
+    processing_status = models.CharField(
+        max_length=10, choices=PROCESSING_STATUS_CHOICES, default=media_ingestion.PENDING, db_index=True
+    )
+    processing_attempts = models.PositiveSmallIntegerField(default=0)
+    processing_error = models.TextField(blank=True, null=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+    checksum = models.CharField(
+        max_length=64, blank=True, null=True, help_text="SHA-256 of the file, computed while it was uploaded."
+    )
+
     def __str__(self):
         return f"Media {self.title} - {self.app_name}/{self.model_name}"
 
@@ -388,126 +411,94 @@ class Media(models.Model):
         if self.app_name == "company" and self.branch:
             raise ValidationError("Branch cannot be specified for the 'company' app.")
 
-   
-    from hachoir.parser import createParser
-    from hachoir.metadata import extractMetadata
-    from pymediainfo import MediaInfo
-    import exifread
-    from datetime import datetime
-
 
     def extract_metadata(self):
         """
         Extract metadata such as creation date and location from the media file.
         This function dynamically determines the file type and uses the appropriate tool
         (hachoir, pymediainfo, or exifread) for metadata extraction.
+
+        Runs in the media ingestion workers, never inside save(). Errors propagate so
+        the worker can record them and retry.
         """
         if not self.file:
             return
 
-        try:
-            #file_path = self.file.path
-            file_path = getattr(self.file, 'path', None)
-            if not file_path or not os.path.exists(file_path):
-                print(f"File not found: {file_path}")
-                return
-            print(f"Extracting metadata for: {file_path}")
-            file_extension = file_path.split('.')[-1].lower()
-
-            # Handle video files with pymediainfo or hachoir
-            if file_extension in ['mp4', 'avi', 'mov', 'mkv']:
-                self._extract_video_metadata(file_path)
-
-            # Handle image files with exifread
-            elif file_extension in ['jpg', 'jpeg', 'png', 'tiff']:
-                self._extract_image_metadata(file_path)
+        file_path = getattr(self.file, 'path', None)
+        if not file_path or not os.path.exists(file_path):
+            raise FileNotFoundError(f"File not found: {file_path}")
+        logger.debug("Extracting metadata for: %s", file_path)
+        file_extension = file_path.split('.')[-1].lower()
 
-            elif file_extension not in ['mp4', 'avi', 'mov', 'mkv', 'jpg', 'jpeg', 'png', 'tiff']:
-                print(f"Unsupported file type: {file_extension}. Skipping metadata extraction.")
-                return
+        # Handle video files with pymediainfo or hachoir
+        if file_extension in ['mp4', 'avi', 'mov', 'mkv']:
+            self._extract_video_metadata(file_path)
 
-            # Fallback for unsupported files (e.g., documents)
-            else:
-                print(f"File format not specifically supported: {file_extension}")
+        # Handle image files with exifread
+        elif file_extension in ['jpg', 'jpeg', 'png', 'tiff']:
+            self._extract_image_metadata(file_path)
 
-        except Exception as e:
-            print(f"Error extracting metadata: {e}")
+        else:
+            logger.debug("Unsupported file type: %s. Skipping metadata extraction.", file_extension)
 
 
     def _extract_video_metadata(self, file_path):
         """
         Extract metadata from video files using pymediainfo and hachoir.
         """
-        try:
-            # Attempt to extract metadata using pymediainfo
-            media_info = MediaInfo.parse(file_path)
-            print(f"MediaInfo tracks: {media_info.tracks}")
-            for track in media_info.tracks:
-                if track.track_type == "General":
-                    # Extract creation date
-                    self.creation_date = track.recorded_date or track.tagged_date
-                    print(f"Extracted creation date (pymediainfo): {self.creation_date}")
-
-                    # Extract GPS location (if available, rare for videos)
-                    if hasattr(track, 'location'):
-                        self.creation_location = track.location
-                        print(f"Extracted GPS location (pymediainfo): {self.creation_location}")
-
-            # Fallback to hachoir if pymediainfo does not provide metadata
-            if not self.creation_date:
-                parser = createParser(file_path)
-                if parser:
-                    metadata = extractMetadata(parser)
-                    if metadata:
-                        self.creation_date = metadata.get('creation_date', None)
-                        print(f"Extracted creation date (hachoir): {self.creation_date}")
-                        self.creation_location = metadata.get('location', None)
-                        print(f"Extracted GPS location (hachoir): {self.creation_location}")
+        # Attempt to extract metadata using pymediainfo
+        media_info = MediaInfo.parse(file_path)
+        for track in media_info.tracks:
+            if track.track_type == "General":
+                # Extract creation date
+                self.creation_date = track.recorded_date or track.tagged_date
+
+                # Extract GPS location (if available, rare for videos)
+                if hasattr(track, 'location'):
+                    self.creation_location = track.location
 
-        except Exception as e:
-            print(f"Error extracting video metadata: {e}")
+        # Fallback to hachoir if pymediainfo does not provide metadata
+        if not self.creation_date:
+            parser = createParser(file_path)
+            if parser:
+                with parser:
+                    metadata = extractMetadata(parser)
+                if metadata:
+                    self.creation_date = metadata.get('creation_date', None)
+                    self.creation_location = metadata.get('location', None)
 
 
     def _extract_image_metadata(self, file_path):
         """
         Extract metadata from image files using exifread.
         """
-        try:
-            with open(file_path, 'rb') as f:
-                tags = exifread.process_file(f)
-
-                # Extract creation date
-                creation_date_tag = tags.get('EXIF DateTimeOriginal') or tags.get('Image DateTime')
-                if creation_date_tag:
-                    try:
-                        # Convert EXIF date format to datetime object
-                        self.creation_date = datetime.strptime(creation_date_tag.values, "%Y:%m:%d %H:%M:%S")
-                        print(f"Extracted creation date (exifread): {self.creation_date}")
-                    except ValueError as ve:
-                        print(f"Error parsing creation date: {ve}")
-
-                else:
-                    print("Creation date not found in EXIF tags.")
-
-                # Extract GPS location
-                gps_latitude = tags.get('GPS GPSLatitude')
-                gps_latitude_ref = tags.get('GPS GPSLatitudeRef')
-                gps_longitude = tags.get('GPS GPSLongitude')
-                gps_longitude_ref = tags.get('GPS GPSLongitudeRef')
-                if gps_latitude and gps_longitude and gps_latitude_ref and gps_longitude_ref:
-                    self.creation_location = self._convert_gps_to_decimal(
-                        gps_latitude, gps_latitude_ref, gps_longitude, gps_longitude_ref
-                    )
-                    print(f"Extracted GPS location (exifread): {self.creation_location}")
-
-        except Exception as e:
-            print(f"Error extracting image metadata: {e}")
+        with open(file_path, 'rb') as f:
+            tags = exifread.process_file(f, details=False)
+
+        # Extract creation date
+        creation_date_tag = tags.get('EXIF DateTimeOriginal') or tags.get('Image DateTime')
+        if creation_date_tag:
+            try:
+                # Convert EXIF date format to datetime object
+                self.creation_date = datetime.datetime.strptime(creation_date_tag.values, "%Y:%m:%d %H:%M:%S")
+            except ValueError as ve:
+                logger.debug("Error parsing creation date: %s", ve)
+
+        # Extract GPS location
+        gps_latitude = tags.get('GPS GPSLatitude')
+        gps_latitude_ref = tags.get('GPS GPSLatitudeRef')
+        gps_longitude = tags.get('GPS GPSLongitude')
+        gps_longitude_ref = tags.get('GPS GPSLongitudeRef')
+        if gps_latitude and gps_longitude and gps_latitude_ref and gps_longitude_ref:
+            self.creation_location = self._convert_gps_to_decimal(
+                gps_latitude, gps_latitude_ref, gps_longitude, gps_longitude_ref
+            )
 
 
     def _convert_gps_to_decimal(self, gps_latitude, gps_latitude_ref, gps_longitude, gps_longitude_ref):
 
         if not (gps_latitude and gps_latitude_ref and gps_longitude and gps_longitude_ref):
-            print("Missing GPS tags. Cannot extract location.")
+            logger.warning("Missing GPS tags. Cannot extract location.")
             return None
         """
         Converts GPS coordinates from EXIF format to decimal degrees.
@@ -525,19 +516,52 @@ class Media(models.Model):
         longitude = _convert_to_decimal(gps_longitude, gps_longitude_ref.values)
         return f"{latitude}, {longitude}"
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored file so save() can tell whether it changed
+        instance._loaded_file_name = instance.__dict__.get('file')
+        return instance
+
     def save(self, *args, **kwargs):
-        try:
-            print("Extracting metadata before saving...")
-            self.extract_metadata()
-            print(f"Metadata extracted: creation_date={self.creation_date}, creation_location={self.creation_location}")
-        except Exception as e:
-            print(f"Error during metadata extraction: {e}")
+        """
+        Store the row and return immediately. Metadata extraction is queued to the
+        ingestion workers only when the file is new or replaced, so re-saving a row
+        (status, comments, ...) never re-parses the file.
+        """
+        file_name = self.file.name if self.file else None
+        file_changed = bool(file_name) and (
+            self._state.adding or file_name != getattr(self, '_loaded_file_name', None)
+        )
+        if file_changed:
+            self.processing_status = media_ingestion.PENDING
+            self.processing_attempts = 0
+            self.processing_error = None
+            self.processed_at = None
+            if not self.file._committed:
+                # A new upload; company.uploads.StreamingUploadHandler hashed it while receiving it.
+                self.checksum = getattr(self.file.file, 'checksum', None)
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None:
+                kwargs['update_fields'] = set(update_fields) | {
+                    'processing_status', 'processing_attempts', 'processing_error', 'processed_at', 'checksum'
+                }
+
         super().save(*args, **kwargs)
+        self._loaded_file_name = self.file.name if self.file else None
+
+        if file_changed:
+            media_id = self.pk
+            transaction.on_commit(lambda: media_ingestion.enqueue_media_ingestion(media_id))
 
     class Meta:
             verbose_name = "Media"
             verbose_name_plural = "Media"
             ordering = ["-created_date"]
+            indexes = [
+                models.Index(fields=["app_name", "model_name", "model_id", "company"]),  # Generic associated-media lookup
+                models.Index(fields=["company", "branch", "status"]),
+            ]
 
        
 
@@ -574,12 +598,49 @@ class Task(models.Model):
     approved_date = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     appealReason = models.TextField(null=True, blank=True)
+    activity_owner = models.ForeignKey('ActivityOwner', on_delete=models.SET_NULL, null=True, blank=True, related_name="recurring_tasks")
+    recurrence_period = models.DateField(null=True, blank=True, help_text="Start of the recurrence period this task was generated for.")
 
     def __str__(self):
         return f"{self.title} ({self.company.name})"
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=["assigned_to", "status", "due_date"]),
+            models.Index(fields=["assistant", "status", "due_date"]),
+            models.Index(fields=["status", "due_date"]),  # Delayed / late task scans
+            models.Index(fields=["company", "branch", "status"]),
+        ]
+        constraints = [
+            # One generated task per activity owner and period; reruns of the scheduler are no-ops.
+            models.UniqueConstraint(fields=['activity_owner', 'recurrence_period'], name='unique_recurring_task_per_period'),
+        ]
+
+
+class TaskCompletionEntry(models.Model):
+    """
+    One record filled out while completing a task, e.g. the NetUseStats row a lay start created.
+
+    Reward evaluation joins these rows to Media for evidence instead of parsing
+    Task.completeDetails, which is kept as a human-readable summary.
+    """
+    task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name="completion_entries")
+    app_name = models.CharField(max_length=100)
+    model_name = models.CharField(max_length=100)
+    model_id = models.PositiveIntegerField()
+    activity = models.CharField(max_length=50, blank=True, null=True)
+    filled_fields = models.JSONField(default=list, blank=True, help_text="Fields of the record filled out for this task.")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=["app_name", "model_name", "model_id"]),
+        ]
+
+    def __str__(self):
+        return f"{self.app_name}.{self.model_name} #{self.model_id} for task {self.task_id}"
 
 class ActivityDefaultSetting(models.Model):
     """
@@ -634,6 +695,7 @@ class ActivityOwner(models.Model):
     interval_days = models.PositiveIntegerField(blank=True, null=True)  # Defines the interval for recurrence
     reoccurring_Start = models.DateField(blank=True, null=True, help_text="latest reoccuring start date. Only requireed if reoccuring is checked") # latest reoccuring start date
     reoccurring_End = models.DateField(blank=True, null=True, help_text="latest reoccuring end date. Only requireed if reoccuring is checked") # latest reoccuring end date
+    next_run_at = models.DateTimeField(blank=True, null=True, help_text="Start of the next recurrence period to generate a task for. Maintained by the recurring task scheduler.")
     appName = models.CharField(max_length=50, blank=True, null=True)
     modelName = models.CharField(max_length=50, blank=True, null=True)
     owner = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name='owned_activities')
@@ -643,6 +705,12 @@ class ActivityOwner(models.Model):
     created_date = models.DateTimeField(auto_now_add=True)
     status = models.CharField(max_length=8, choices=STATUS_CHOICES, default='active')
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["company", "branch", "activity", "status"]),
+            models.Index(fields=["reoccurring", "status", "next_run_at"]),  # Due recurring activities
+        ]
+
     def __str__(self):
         return f"{self.company} - {self.activity} ({self.status})"
     
@@ -660,21 +728,42 @@ class ActivityOwner(models.Model):
         if not self.min_estimated_count or self.min_estimated_count == 0:
             if default_setting:
                 self.min_estimated_count = default_setting.min_count
+        self.refresh_next_run_at()
 
         super().save(*args, **kwargs)
+
+    def refresh_next_run_at(self):
+        """
+        Keep next_run_at in line with the recurrence settings.
+
+        Once a schedule is running its position is kept; it is only recomputed
+        when recurrence is switched on or the schedule stops.
+        """
+        if not self.reoccurring or not self.interval_days or self.status != 'active':
+            self.next_run_at = None
+        elif self.next_run_at is None:
+            self.next_run_at = recurring_tasks.compute_next_run_at(self)
     
 
 class RewardsPointsTracker(models.Model):
     """
     RewardsPointsTracker is a Django model that tracks the rewards points for users within a company.
+
+    Rows form an append-only ledger: each entry is applied once to the user's
+    RewardsPointsBalance and RewardsPointsMonthlyRollup when it is created, and
+    records the running balance after it. Corrections are posted as new entries.
     """
     TRANSACTION_TYPE_CHOICES = [
         ('merit', 'Merit'),
         ('assisted', 'Assisted'),
         ('pending', 'Pending'),
+        ('approved', 'Approved'),
         ('staffMember', 'Staff Member'),
     ]
 
+    # Fields that determine an entry's effect on the balance; frozen once posted.
+    LEDGER_FIELDS = ('user_id', 'company_id', 'transaction_type', 'credit', 'blocked', 'debit', 'credit_date')
+
     
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='rewards_points')
     company = models.ForeignKey(Company, on_delete=models.CASCADE, related_name='rewards_points')
@@ -684,7 +773,7 @@ class RewardsPointsTracker(models.Model):
         max_length=20,
         choices=TRANSACTION_TYPE_CHOICES,
         default='merit',
-        help_text="Type of transaction (merit, assisted, staffMember, pending)"
+        help_text="Type of transaction (merit, assisted, staffMember, pending, approved)"
     )
     credit = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True,  help_text="Points received for the task")
     blocked = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True,  help_text="Points blocked due to non task completion at all or in a timely manner")
@@ -695,8 +784,8 @@ class RewardsPointsTracker(models.Model):
     debit_requested_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='points_requests')
     debit_approved_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='approved_points')
     comments = models.TextField(blank=True, null=True, help_text="Comments regarding the points transaction")
-    points_available = models.DecimalField(max_digits=10, decimal_places=2, default=0, help_text="Points available for use")
-    points_pending = models.DecimalField(max_digits=10, decimal_places=2, default=0, help_text="Points pending approval")
+    points_available = models.DecimalField(max_digits=10, decimal_places=2, default=0, help_text="Points available after this entry")
+    points_pending = models.DecimalField(max_digits=10, decimal_places=2, default=0, help_text="Points pending approval after this entry")
     updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
@@ -706,31 +795,75 @@ class RewardsPointsTracker(models.Model):
         verbose_name = "Rewards Points Tracker"
         verbose_name_plural = "Rewards Points Trackers"
         ordering = ['-credit_date']
+        indexes = [
+            models.Index(fields=['user', 'company', 'credit_date']),
+            models.Index(fields=['task', 'transaction_type']),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._posted_values = {
+            field: getattr(instance, field) for field in cls.LEDGER_FIELDS if field in instance.__dict__
+        }
+        return instance
 
     def save(self, *args, **kwargs):
-        # Ensure points_available and points_pending are initialized
-         # Fetch the last added record before the current one
-        last_record = RewardsPointsTracker.objects.filter(
-            user=self.user,
-            company=self.company,
-        ).exclude(pk=self.pk).order_by('-credit_date').first()
-
-        if last_record :
-            if self.transaction_type == 'pending':
-                self.points_pending = last_record.points_pending + (self.credit or 0)
-                self.points_available = last_record.points_available
-            else:
-                self.points_pending = last_record.points_pending
-                self.points_available = last_record.points_available + (self.credit or 0)
-        else:
-            if self.transaction_type == 'pending':
-                self.points_pending = self.credit or 0
-                self.points_available = 0
-            else:
-                self.points_available = self.credit or 0
-                self.points_pending = 0
+        if not self._state.adding:
+            posted = getattr(self, '_posted_values', {})
+            changed = [field for field, value in posted.items() if getattr(self, field) != value]
+            if changed:
+                raise ValidationError(
+                    f"Rewards ledger entries are append-only; post a correcting entry instead of changing {', '.join(changed)}."
+                )
+            return super().save(*args, **kwargs)
 
-        super().save(*args, **kwargs)
+        rewards_ledger.post_entry(self, lambda: super(RewardsPointsTracker, self).save(*args, **kwargs))
+
+
+class RewardsPointsBalance(models.Model):
+    """
+    Current points balance of a user in a company, maintained from the RewardsPointsTracker ledger.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='rewards_balances')
+    company = models.ForeignKey(Company, on_delete=models.CASCADE, related_name='rewards_balances')
+    points_available = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    points_pending = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Rewards Points Balance"
+        verbose_name_plural = "Rewards Points Balances"
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'company'], name='unique_rewards_balance_per_user_company'),
+        ]
+
+    def __str__(self):
+        return f"{self.user} - {self.company}: {self.points_available} available, {self.points_pending} pending"
+
+
+class RewardsPointsMonthlyRollup(models.Model):
+    """
+    Per-month totals of a user's ledger entries in a company, keyed by the first day of the month.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='rewards_monthly_rollups')
+    company = models.ForeignKey(Company, on_delete=models.CASCADE, related_name='rewards_monthly_rollups')
+    month = models.DateField(help_text="First day of the month")
+    credit_total = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    blocked_total = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    debit_total = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    pending_total = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
+    class Meta:
+        verbose_name = "Rewards Points Monthly Rollup"
+        verbose_name_plural = "Rewards Points Monthly Rollups"
+        ordering = ['-month']
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'company', 'month'], name='unique_rewards_rollup_per_user_company_month'),
+        ]
+
+    def __str__(self):
+        return f"{self.user} - {self.company} ({self.month:%Y-%m})"
 
 
 class Expectations(models.Model):
@@ -793,3 +926,36 @@ class Expectations(models.Model):
                 "Performance levels must be ordered: poor < unsatisfactory < satisfactory < exceeds expectation < outstanding."
             )
 
+
+class QueuedEmail(models.Model):
+    """
+    Outbound email waiting to be sent by the notification worker.
+
+    Code that runs inside request handlers or scheduler loops queues a row
+    here instead of talking to SMTP; company.notifications sends them in bulk.
+    """
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    ]
+
+    recipient = models.EmailField()
+    subject = models.CharField(max_length=255)
+    message = models.TextField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        verbose_name = "Queued Email"
+        verbose_name_plural = "Queued Emails"
+        ordering = ['created_at']
+        indexes = [
+            models.Index(fields=["status", "created_at"]),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} -> {self.recipient} ({self.status})"
@@ -0,0 +1,54 @@
+from django.apps import apps
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db.models import F
+from django.utils import timezone
+import logging
+
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = getattr(settings, "QUEUED_EMAIL_MAX_ATTEMPTS", 5)
+FROM_EMAIL = getattr(settings, "QUEUED_EMAIL_FROM", "no-reply@yourcompany.com")
+
+
+def queue_email(recipient, subject, message):
+    """
+    Queue an email for the notification worker instead of sending it inline.
+    """
+    return apps.get_model("company", "QueuedEmail").objects.create(recipient=recipient, subject=subject, message=message)
+
+
+def send_queued_emails(limit=200):
+    """
+    Send pending (and retryable failed) queued emails over one SMTP connection.
+
+    Each row is claimed with a conditional UPDATE so concurrent workers never
+    send the same email twice. Returns (sent, failed) counts.
+    """
+    QueuedEmail = apps.get_model("company", "QueuedEmail")
+    ids = list(
+        QueuedEmail.objects.filter(status__in=["pending", "failed"], attempts__lt=MAX_ATTEMPTS)
+        .order_by("created_at").values_list("id", flat=True)[:limit]
+    )
+    if not ids:
+        return 0, 0
+
+    sent = failed = 0
+    with get_connection(fail_silently=False) as connection:
+        for email in QueuedEmail.objects.filter(pk__in=ids).order_by("created_at"):
+            claimed = QueuedEmail.objects.filter(
+                pk=email.pk, attempts=email.attempts, status__in=["pending", "failed"]
+            ).update(attempts=F("attempts") + 1)
+            if not claimed:
+                continue
+            try:
+                EmailMessage(email.subject, email.message, FROM_EMAIL, [email.recipient], connection=connection).send()
+            except Exception as exc:
+                logger.warning("Queued email %s to %s failed: %s", email.pk, email.recipient, exc)
+                QueuedEmail.objects.filter(pk=email.pk).update(status="failed", last_error=str(exc))
+                failed += 1
+            else:
+                QueuedEmail.objects.filter(pk=email.pk).update(status="sent", sent_at=timezone.now(), last_error=None)
+                sent += 1
+    return sent, failed
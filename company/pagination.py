@@ -0,0 +1,34 @@
+from django.db.models import QuerySet
+from rest_framework.pagination import CursorPagination
+
+
+class KeysetCursorPagination(CursorPagination):
+    """
+    Cursor (keyset) pagination over a creation timestamp with `id` as tie-breaker.
+
+    New rows inserted while a client is paging never shift or duplicate the
+    rows on later pages, unlike offset pagination.
+
+    Pagination is opt-in so existing clients keep receiving plain lists: it is
+    only applied when the request carries `cursor` or `page_size`. Views set
+    `cursor_ordering` to the timestamp field of their model.
+    """
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+    ordering = ('-created_at', '-id')
+
+    def paginate_queryset(self, queryset, request, view=None):
+        params = request.query_params
+        if self.cursor_query_param not in params and self.page_size_query_param not in params:
+            return None
+        if not isinstance(queryset, QuerySet):
+            # Partial-access results from has_permission are plain lists
+            return None
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_ordering(self, request, queryset, view):
+        ordering = getattr(view, 'cursor_ordering', None)
+        if ordering:
+            return (ordering,) if isinstance(ordering, str) else tuple(ordering)
+        return super().get_ordering(request, queryset, view)
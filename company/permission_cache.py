@@ -0,0 +1,179 @@
+from django.apps import apps
+from django.core.cache import cache
+import logging
+import threading
+
+from .models import Authority, Staff, StaffLevels
+
+
+logger = logging.getLogger(__name__)
+
+# Cross-request cache settings for the authority matrix.
+MATRIX_CACHE_TIMEOUT = 60 * 15  # 15 minutes
+MATRIX_KEY = "perm_matrix_{company_id}_{user_id}_v{version}"
+VERSION_KEY = "perm_matrix_version_{company_id}"
+
+# Attribute used to memoize matrices on the request's user object. A new user
+# instance is attached to every request, so the memo never outlives it.
+REQUEST_MEMO_ATTR = "_permission_matrix_memo"
+
+# Process-local generation, bumped by the invalidation signals so a matrix
+# memoized earlier in the same request is not reused after a write.
+_generation = 0
+
+_stats_lock = threading.Lock()
+_stats = {"request_hits": 0, "cache_hits": 0, "misses": 0}
+STATS_REPORT_EVERY = 1000  # Log the hit rate every N lookups
+
+
+def get_staff_member_models():
+    """
+    Return {app_label: StaffMember model} for every installed app that defines one.
+    """
+    models = {}
+    for app_config in apps.get_app_configs():
+        try:
+            models[app_config.label] = app_config.get_model("StaffMember")
+        except LookupError:
+            continue
+    return models
+
+
+def _get_version(company_id):
+    version = cache.get(VERSION_KEY.format(company_id=company_id))
+    if version is None:
+        version = 1
+        cache.add(VERSION_KEY.format(company_id=company_id), version, None)
+    return version
+
+
+def invalidate_company(company_id):
+    """
+    Drop every cached authority matrix for a company (all users).
+    """
+    global _generation
+    _generation += 1
+    if company_id is None:
+        return
+    key = VERSION_KEY.format(company_id=company_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 2, None)
+
+
+def _record(outcome):
+    with _stats_lock:
+        _stats[outcome] += 1
+        total = _stats["request_hits"] + _stats["cache_hits"] + _stats["misses"]
+    if total % STATS_REPORT_EVERY == 0:
+        log_permission_cache_stats()
+
+
+def permission_cache_stats():
+    """
+    Return the resolver counters and the combined hit rate.
+    """
+    with _stats_lock:
+        stats = dict(_stats)
+    total = stats["request_hits"] + stats["cache_hits"] + stats["misses"]
+    hits = stats["request_hits"] + stats["cache_hits"]
+    stats["total"] = total
+    stats["hit_rate"] = round(hits / total, 4) if total else 0.0
+    return stats
+
+
+def reset_permission_cache_stats():
+    with _stats_lock:
+        for key in _stats:
+            _stats[key] = 0
+
+
+def build_authority_matrix(user, company):
+    """
+    Load everything has_permission needs for one (user, company) pair in a fixed
+    number of queries: staff membership, the company's Authority rows, the
+    company-wide StaffLevels entry and the user's level in each app's StaffMember.
+    """
+    authorities = {}
+    for row in Authority.objects.filter(company=company).values(
+        "app_name", "model_name", "view", "add", "edit", "delete", "accept", "approve"
+    ).order_by("pk"):
+        key = (row.pop("app_name"), row.pop("model_name"))
+        authorities.setdefault(key, row)
+
+    app_levels = {}
+    for app_label, StaffMemberModel in get_staff_member_models().items():
+        app_levels[app_label] = StaffMemberModel.objects.filter(
+            user=user, company=company
+        ).order_by("pk").values_list("level", flat=True).first()
+
+    return {
+        "is_staff": Staff.objects.filter(user=user, company=company).exists(),
+        "authorities": authorities,
+        "company_level": StaffLevels.objects.filter(
+            user=user, company=company
+        ).order_by("pk").values_list("level", flat=True).first(),
+        "app_levels": app_levels,
+    }
+
+
+def get_authority_matrix(user, company):
+    """
+    Return the authority matrix for (user, company), memoized for the lifetime of
+    the request and shared across requests through the Django cache.
+    """
+    memo = getattr(user, REQUEST_MEMO_ATTR, None)
+    if memo is None:
+        memo = {}
+        try:
+            setattr(user, REQUEST_MEMO_ATTR, memo)
+        except AttributeError:
+            pass
+
+    cached = memo.get(company.pk)
+    if cached is not None and cached[0] == _generation:
+        _record("request_hits")
+        return cached[1]
+
+    key = MATRIX_KEY.format(company_id=company.pk, user_id=user.pk, version=_get_version(company.pk))
+    matrix = cache.get(key)
+    if matrix is not None:
+        _record("cache_hits")
+    else:
+        _record("misses")
+        matrix = build_authority_matrix(user, company)
+        cache.set(key, matrix, MATRIX_CACHE_TIMEOUT)
+
+    memo[company.pk] = (_generation, matrix)
+    return matrix
+
+
+def get_required_level(matrix, app_name, model_name, action):
+    """
+    Mirror of int(getattr(authority, action, '5')) against the cached matrix.
+    """
+    authority = matrix["authorities"].get((app_name, model_name))
+    if authority is None:
+        return 5
+    return int(authority.get(action, '5'))
+
+
+def get_app_staff_level(matrix, app_name):
+    """
+    Return the user's StaffMember level in app_name, raising LookupError for apps
+    without a StaffMember model exactly like apps.get_model would.
+    """
+    if app_name not in matrix["app_levels"]:
+        apps.get_model(app_name, "StaffMember")
+        return None
+    return matrix["app_levels"][app_name]
+
+
+def log_permission_cache_stats():
+    stats = permission_cache_stats()
+    logger.info(
+        "Permission cache: %s lookups, %s request hits, %s cache hits, %s misses (hit rate %.2f%%)",
+        stats["total"], stats["request_hits"], stats["cache_hits"], stats["misses"], stats["hit_rate"] * 100,
+    )
+    return stats
@@ -0,0 +1,176 @@
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+from django.apps import apps
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+import logging
+
+
+logger = logging.getLogger(__name__)
+
+# Most periods generated for one activity owner in a run, so a long outage
+# can't flood a branch with tasks; older missed periods are skipped.
+MAX_CATCH_UP_PERIODS = getattr(settings, "RECURRING_TASKS_MAX_CATCH_UP", 31)
+BATCH_SIZE = getattr(settings, "RECURRING_TASKS_BATCH_SIZE", 500)
+
+
+def period_start_at(period):
+    """
+    Aware datetime at which the period starting on `period` becomes due.
+    """
+    return timezone.make_aware(datetime.combine(period, time.min), timezone.get_default_timezone())
+
+
+def compute_next_run_at(activity_owner, after=None):
+    """
+    Start of the first period of a recurring activity owner on or after `after`
+    (a date, default the recurrence start), or None if it no longer recurs.
+    """
+    if not activity_owner.reoccurring or not activity_owner.interval_days or activity_owner.status != "active":
+        return None
+    start = activity_owner.reoccurring_Start or timezone.localdate()
+    period = start
+    if after and after > start:
+        steps = -(-(after - start).days // activity_owner.interval_days)
+        period = start + timedelta(days=steps * activity_owner.interval_days)
+    if activity_owner.reoccurring_End and period > activity_owner.reoccurring_End:
+        return None
+    return period_start_at(period)
+
+
+def due_periods(activity_owner, current_time):
+    """
+    Period start dates of an activity owner that are due at `current_time`,
+    oldest first and capped at MAX_CATCH_UP_PERIODS.
+    """
+    interval = timedelta(days=activity_owner.interval_days)
+    period = timezone.localtime(activity_owner.next_run_at).date()
+    today = timezone.localtime(current_time).date()
+    end = activity_owner.reoccurring_End
+    periods = []
+    while period <= today and (end is None or period <= end):
+        periods.append(period)
+        period += interval
+    return periods[-MAX_CATCH_UP_PERIODS:]
+
+
+def build_task(activity_owner, period):
+    interval = timedelta(days=activity_owner.interval_days)
+    return apps.get_model("company", "Task")(
+        company_id=activity_owner.company_id,
+        branch_id=activity_owner.branch_id,
+        activity_owner=activity_owner,
+        recurrence_period=period,
+        title=f"{activity_owner.activity} - {activity_owner.owner}",
+        description=f"Recurring {activity_owner.activity} for the period starting {period:%Y-%m-%d}.",
+        due_date=period_start_at(period + interval),
+        assigned_to_id=activity_owner.owner_id,
+        assistant_id=activity_owner.assistant_id,
+        appName=activity_owner.appName,
+        modelName=activity_owner.modelName,
+        dataQuantity=activity_owner.dataQuantity,
+        activity=activity_owner.activity,
+        status="active",
+    )
+
+
+def generate_recurring_tasks(current_time=None, dry_run=False, company=None):
+    """
+    Create the tasks of every recurring activity owner whose next period is due.
+
+    Due owners are selected through the (reoccurring, status, next_run_at) index.
+    Every missed period is generated (catch-up), tasks are written with
+    bulk_create and skipped if their (activity owner, period) already exists,
+    so reruns never duplicate. Managers of owners that still have open tasks
+    from earlier periods get an email queued in the notification outbox.
+
+    With dry_run nothing is written. Returns a report of the generated periods.
+    """
+    ActivityOwner = apps.get_model("company", "ActivityOwner")
+    Task = apps.get_model("company", "Task")
+    current_time = current_time or timezone.now()
+
+    due = ActivityOwner.objects.filter(
+        reoccurring=True, status="active", next_run_at__lte=current_time
+    ).select_related("owner", "manager")
+    if company is not None:
+        due = due.filter(company=company)
+
+    report = {"dry_run": dry_run, "run_at": current_time.isoformat(), "activity_owners": 0, "tasks_created": 0, "notifications_queued": 0, "details": []}
+    for chunk in _chunks(due.order_by("next_run_at", "pk").iterator(chunk_size=BATCH_SIZE), BATCH_SIZE):
+        with transaction.atomic():
+            owners = chunk if dry_run else list(
+                ActivityOwner.objects.select_for_update(skip_locked=True)
+                .filter(pk__in=[owner.pk for owner in chunk], next_run_at__lte=current_time)
+                .select_related("owner", "manager")
+            )
+            if not owners:
+                continue
+            open_tasks = _open_task_counts(Task, owners)
+            existing = set(
+                Task.objects.filter(activity_owner__in=owners, recurrence_period__isnull=False)
+                .values_list("activity_owner_id", "recurrence_period")
+            )
+
+            tasks, notifications = [], []
+            for owner in owners:
+                periods = [period for period in due_periods(owner, current_time) if (owner.pk, period) not in existing]
+                tasks.extend(build_task(owner, period) for period in periods)
+                if periods and open_tasks.get(owner.pk) and owner.manager and owner.manager.email:
+                    notifications.append(_overdue_notification(owner, open_tasks[owner.pk]))
+                owner.next_run_at = compute_next_run_at(owner, after=timezone.localdate(current_time) + timedelta(days=1))
+                report["details"].append({
+                    "activity_owner": owner.pk,
+                    "activity": owner.activity,
+                    "periods": [period.isoformat() for period in periods],
+                    "open_tasks": open_tasks.get(owner.pk, 0),
+                    "next_run_at": owner.next_run_at.isoformat() if owner.next_run_at else None,
+                })
+
+            report["activity_owners"] += len(owners)
+            report["tasks_created"] += len(tasks)
+            report["notifications_queued"] += len(notifications)
+            if dry_run:
+                continue
+            Task.objects.bulk_create(tasks, batch_size=BATCH_SIZE, ignore_conflicts=True)
+            ActivityOwner.objects.bulk_update(owners, ["next_run_at"], batch_size=BATCH_SIZE)
+            if notifications:
+                apps.get_model("company", "QueuedEmail").objects.bulk_create(notifications)
+
+    logger.info(
+        "Recurring tasks%s: %s owner(s) due, %s task(s), %s notification(s)",
+        " (dry run)" if dry_run else "", report["activity_owners"], report["tasks_created"], report["notifications_queued"],
+    )
+    return report
+
+
+def _chunks(iterable, size):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _open_task_counts(Task, owners):
+    counts = defaultdict(int)
+    rows = Task.objects.filter(activity_owner__in=owners, status__in=["active", "appeal"]).values_list("activity_owner_id", flat=True)
+    for owner_id in rows:
+        counts[owner_id] += 1
+    return counts
+
+
+def _overdue_notification(owner, open_count):
+    return apps.get_model("company", "QueuedEmail")(
+        recipient=owner.manager.email,
+        subject=f"Reoccurring Task-{owner.activity}, Creation Due",
+        message=(
+            f"Dear Manager,\n\nThe activity '{owner.activity}' assigned to {owner.owner} is due for reoccurring task "
+            f"creation but still has {open_count} task(s) that aren't completed yet.\n\n"
+            "Please take the necessary actions.\n\nBest regards,\nYour Company"
+        ),
+    )
@@ -0,0 +1,258 @@
+from collections import defaultdict
+from decimal import Decimal
+import logging
+
+from django.db import transaction
+
+from . import rewards_ledger
+from .models import ActivityOwner, RewardsPointsTracker, Staff, Task
+from .permission_cache import get_staff_member_models
+from .task_completion import get_completion_evidence
+
+
+logger = logging.getLogger(__name__)
+
+REWARDABLE_STATUSES = ("completed", "appeal")
+REWARD_GRANTED = "rewardGranted"
+
+def compute_task_points(task, max_points, importance_scale, branch_weight, completed_by_branch_staff):
+    """
+    Split a task's share of the monthly points between whoever completed it and the owner.
+
+    The share is `max_points * importance_scale / branch_weight`, adjusted by who
+    completed the task and how late:
+    - the owner: loses 10% per day after a 1-day grace period (at most 50%);
+    - the assistant: earns a 10% bonus, or loses 10% per day after 3 days (at most 50%);
+      the owner forfeits the share plus 10%;
+    - other branch staff: earn a 50% bonus, minus 10% per day after 4 days (at most 70%);
+      the owner forfeits the share;
+    - anyone else: nobody earns it and the owner forfeits it.
+
+    Returns {'proportional_points', 'ownerLoss_points'}.
+    """
+    if not branch_weight:
+        return {'proportional_points': 0, 'ownerLoss_points': 0}
+
+    proportional_points = (max_points / branch_weight) * importance_scale
+    ownerLoss_points = 0
+    days_late = (task.completed_date - task.due_date).days
+
+    if task.assigned_to_id == task.completed_by_id:
+        penalty = min((proportional_points * 10/100) * (days_late - 1), (proportional_points * 50/100))
+        ownerLoss_points += penalty
+        proportional_points -= penalty
+        return {'proportional_points': proportional_points, 'ownerLoss_points': ownerLoss_points}
+
+    if task.completed_by_id == task.assistant_id:
+        ownerLoss_points += proportional_points + (proportional_points * 10/100)
+        penalty_days = days_late - 3
+        if penalty_days <= 0:
+            proportional_points += (proportional_points * 10/100)
+        else:
+            proportional_points -= min((proportional_points * 10/100) * penalty_days, (proportional_points * 50/100))
+        return {'proportional_points': proportional_points, 'ownerLoss_points': ownerLoss_points}
+
+    if completed_by_branch_staff:
+        proportional_points += (proportional_points * 50/100)
+        ownerLoss_points += proportional_points
+        penalty_days = days_late - 4
+        if penalty_days >= 1:
+            proportional_points -= min((proportional_points * 10/100) * penalty_days, (proportional_points * 70/100))
+        return {'proportional_points': proportional_points, 'ownerLoss_points': ownerLoss_points}
+
+    ownerLoss_points += proportional_points
+    return {'proportional_points': 0, 'ownerLoss_points': ownerLoss_points}
+
+
+def reward_entries(task, points):
+    """
+    Unsaved ledger entries for a task's allocation: credit for whoever completed it, blocked points for the owner.
+    """
+    common = dict(company_id=task.company_id, branch_id=task.branch_id, task=task, transaction_type='merit')
+    return [
+        RewardsPointsTracker(user_id=task.completed_by_id, credit=points['proportional_points'], **common),
+        RewardsPointsTracker(user_id=task.assigned_to_id, blocked=points['ownerLoss_points'], **common),
+    ]
+
+
+class BatchRewardAllocator:
+    """
+    Allocate reward points for many completed tasks of one branch at once.
+
+    Everything the per-task PointsRewardSystem looks up per request is loaded up
+    front with a fixed number of queries: the tasks, the branch activity weights,
+    the staff records and reward limits, the StaffMember hierarchy of every app,
+    the completion entries joined to their media evidence, and the month's
+    rollups. All ledger entries are then posted with one bulk write and the
+    tasks are marked as rewarded in the same transaction.
+
+    The task owner (`assigned_to`) is the staff member whose salary sets the
+    points pool and whose lead (or lead's lead) must have approved the task and
+    be the `approver` running the allocation.
+    """
+
+    def __init__(self, company, branch, approver, dry_run=False):
+        self.company = company
+        self.branch = branch
+        self.approver = approver
+        self.dry_run = dry_run
+
+    def get_tasks(self, task_ids=None):
+        tasks = Task.objects.filter(company=self.company, branch=self.branch)
+        if task_ids is None:
+            tasks = tasks.filter(status__in=REWARDABLE_STATUSES)
+        else:
+            tasks = tasks.filter(id__in=task_ids)
+        return list(tasks.order_by('completed_date', 'id'))
+
+    def load_activity_weights(self):
+        """
+        Returns ({appName: sum of importance_scale * min_estimated_count},
+                 {(appName, activity): importance_scale}) for the branch's active activities.
+        """
+        branch_weights = defaultdict(int)
+        importance = {}
+        owners = ActivityOwner.objects.filter(
+            company=self.company, branch=self.branch, status='active'
+        ).order_by('pk').values_list('appName', 'activity', 'importance_scale', 'min_estimated_count')
+        for app_name, activity, importance_scale, min_estimated_count in owners:
+            branch_weights[app_name] += (importance_scale or 0) * (min_estimated_count or 0)
+            importance.setdefault((app_name, activity), importance_scale)
+        return branch_weights, importance
+
+    def load_staff_members(self, app_names):
+        """
+        {app_name: {user_id: StaffMember}} for active members of the company
+        (and branch, where the app's StaffMember has one).
+        """
+        staff_member_models = get_staff_member_models()
+        members = {}
+        for app_name in app_names:
+            StaffMemberModel = staff_member_models.get(app_name)
+            if StaffMemberModel is None:
+                members[app_name] = {}
+                continue
+            queryset = StaffMemberModel.objects.filter(company=self.company, status='active')
+            if any(field.name == 'branch' for field in StaffMemberModel._meta.fields):
+                queryset = queryset.filter(branch=self.branch)
+            members[app_name] = {member.user_id: member for member in queryset.order_by('pk')}
+        return members
+
+    def is_approved_by_hierarchy(self, task, members):
+        if not task.approved_by_id:
+            return False
+        owner = members.get(task.assigned_to_id)
+        if owner is None or owner.leader_id is None:
+            return False
+        leads = {owner.leader_id}
+        owner_lead = members.get(owner.leader_id)
+        if owner_lead is not None and owner_lead.leader_id is not None:
+            leads.add(owner_lead.leader_id)
+        return task.approved_by_id in leads and self.approver.pk in leads
+
+    def check_task(self, task, staff, members, completion):
+        """
+        Return the failure reason for a task, or None if it can be rewarded.
+        """
+        if task.status == REWARD_GRANTED:
+            return "Task reward has already been granted"
+        if task.status not in REWARDABLE_STATUSES:
+            return "Task is not marked as completed or approved appeal."
+        if not task.completed_by_id or not task.completed_date or not task.due_date:
+            return "Task has no completion or due date."
+        if not self.is_approved_by_hierarchy(task, members):
+            return "Task is under appeal and has not been approved by the appropriate lead."
+        if staff is None or not staff.reward:
+            return "Staff is not eligible for rewards."
+        entry_count, has_evidence = completion
+        if entry_count < task.dataQuantity:
+            return "Incomplete dataset. Ensure all required entries are filled."
+        if not has_evidence:
+            return "Video evidence is required for this task."
+        return None
+
+    def allocate(self, task_ids=None):
+        """
+        Allocate points for `task_ids`, or for every completed/appeal task of the branch.
+
+        Returns {'allocated', 'failed', 'dry_run', 'results': [per-task report]}.
+        """
+        tasks = self.get_tasks(task_ids)
+        results = []
+        if task_ids is not None:
+            found = {task.id for task in tasks}
+            results.extend(
+                {"task": task_id, "status": "failure", "reason": "Task not found in this branch."}
+                for task_id in task_ids if int(task_id) not in found
+            )
+
+        owner_ids = {task.assigned_to_id for task in tasks if task.assigned_to_id}
+        branch_weights, importance = self.load_activity_weights()
+        staff_by_user = {}
+        for staff in Staff.objects.filter(company=self.company, user_id__in=owner_ids).order_by('pk'):
+            staff_by_user.setdefault(staff.user_id, staff)
+        members = self.load_staff_members({task.appName for task in tasks})
+        completion = get_completion_evidence([task.id for task in tasks], self.company, self.branch)
+        monthly_totals = rewards_ledger.get_monthly_totals(
+            owner_ids | {task.completed_by_id for task in tasks if task.completed_by_id}, self.company
+        )
+
+        entries = []
+        rewarded_task_ids = []
+        for task in tasks:
+            staff = staff_by_user.get(task.assigned_to_id)
+            app_members = members.get(task.appName, {})
+            reason = self.check_task(task, staff, app_members, completion[task.id])
+            if reason is None and (task.appName, task.activity) not in importance:
+                reason = "No active activity owner for this task's activity."
+
+            if reason is None:
+                max_points = staff.get_max_reward_points()
+                completed_by_branch_staff = (
+                    task.completed_by_id in app_members
+                    and task.completed_by_id not in (task.assigned_to_id, task.assistant_id)
+                )
+                points = compute_task_points(
+                    task, max_points, importance[(task.appName, task.activity)],
+                    branch_weights[task.appName], completed_by_branch_staff,
+                )
+                if (
+                    task.assigned_to_id == task.completed_by_id
+                    and monthly_totals[task.assigned_to_id] + Decimal(str(points['proportional_points'])) > max_points
+                ):
+                    reason = "No points to allocate."
+
+            if reason is not None:
+                results.append({"task": task.id, "status": "failure", "reason": reason})
+                continue
+
+            task_entries = reward_entries(task, points)
+            for entry in task_entries:
+                deltas = rewards_ledger.rollup_deltas(entry)
+                monthly_totals[entry.user_id] = (
+                    monthly_totals.get(entry.user_id, rewards_ledger.ZERO) + deltas["credit_total"] + deltas["blocked_total"]
+                )
+            entries.extend(task_entries)
+            rewarded_task_ids.append(task.id)
+            results.append({
+                "task": task.id,
+                "status": "pending",
+                "staff": task.completed_by_id,
+                "pending_points": points,
+                "total_points_this_month": monthly_totals[task.assigned_to_id],
+            })
+
+        if not self.dry_run and entries:
+            with transaction.atomic():
+                rewards_ledger.post_entries(entries)
+                Task.objects.filter(id__in=rewarded_task_ids).update(status=REWARD_GRANTED)
+
+        logger.info("Batch reward allocation for branch %s: %s allocated, %s failed%s.",
+                    self.branch.pk, len(rewarded_task_ids), len(results) - len(rewarded_task_ids),
+                    " (dry run)" if self.dry_run else "")
+        return {
+            "allocated": len(rewarded_task_ids),
+            "failed": len(results) - len(rewarded_task_ids),
+            "dry_run": self.dry_run,
+            "results": results,
+        }
@@ -0,0 +1,277 @@
+from collections import defaultdict
+from decimal import Decimal
+
+from django.apps import apps as global_apps
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+import logging
+
+
+logger = logging.getLogger(__name__)
+
+ZERO = Decimal("0")
+
+# Transaction types with their own effect on the balance; every other type
+# (merit, assisted, staffMember) credits available points directly.
+PENDING = "pending"
+APPROVED = "approved"
+
+ROLLUP_FIELDS = ("credit_total", "blocked_total", "debit_total", "pending_total")
+
+
+# Ledger amounts are stored with two decimal places; deltas use the stored value.
+CENT = Decimal("0.01")
+
+
+def _amount(value):
+    return Decimal(str(value)).quantize(CENT) if value is not None else ZERO
+
+
+def entry_deltas(entry):
+    """
+    Return (available_delta, pending_delta) for one ledger entry.
+
+    - pending:  credit is held as pending points.
+    - approved: credit moves from pending to available.
+    - others:   credit minus debit changes available points.
+    """
+    credit = _amount(entry.credit)
+    if entry.transaction_type == PENDING:
+        return ZERO, credit
+    if entry.transaction_type == APPROVED:
+        return credit, -credit
+    return credit - _amount(entry.debit), ZERO
+
+
+def rollup_deltas(entry):
+    """
+    Return the monthly rollup increments for one ledger entry.
+
+    credit_total and blocked_total only count allocations (not pending holds or
+    their approvals), matching what the monthly reward cap is checked against.
+    """
+    deltas = dict.fromkeys(ROLLUP_FIELDS, ZERO)
+    deltas["debit_total"] = _amount(entry.debit)
+    if entry.transaction_type == PENDING:
+        deltas["pending_total"] = _amount(entry.credit)
+    elif entry.transaction_type != APPROVED:
+        deltas["credit_total"] = _amount(entry.credit)
+        deltas["blocked_total"] = _amount(entry.blocked)
+    return deltas
+
+
+def month_start(value=None):
+    """
+    First day of the (local) month containing `value`, used as the rollup key.
+    """
+    value = value or timezone.now()
+    if timezone.is_aware(value):
+        value = timezone.localtime(value)
+    return value.date().replace(day=1)
+
+
+def post_entry(entry, save):
+    """
+    Apply a new ledger entry to its (user, company) balance and monthly rollup.
+
+    The balance row is locked with SELECT ... FOR UPDATE, so concurrent entries
+    for the same user and company are applied one after another. The entry
+    records the running balance after it was applied. `save` persists the entry
+    itself inside the same transaction.
+    """
+    RewardsPointsBalance = global_apps.get_model("company", "RewardsPointsBalance")
+    RewardsPointsMonthlyRollup = global_apps.get_model("company", "RewardsPointsMonthlyRollup")
+
+    with transaction.atomic():
+        RewardsPointsBalance.objects.get_or_create(user_id=entry.user_id, company_id=entry.company_id)
+        balance = RewardsPointsBalance.objects.select_for_update().get(
+            user_id=entry.user_id, company_id=entry.company_id
+        )
+
+        available_delta, pending_delta = entry_deltas(entry)
+        balance.points_available += available_delta
+        balance.points_pending += pending_delta
+        balance.save(update_fields=["points_available", "points_pending", "updated_at"])
+
+        entry.points_available = balance.points_available
+        entry.points_pending = balance.points_pending
+        save()
+
+        # Serialized by the balance lock above, so a plain upsert is safe here.
+        rollup, _ = RewardsPointsMonthlyRollup.objects.get_or_create(
+            user_id=entry.user_id, company_id=entry.company_id, month=month_start(entry.credit_date)
+        )
+        RewardsPointsMonthlyRollup.objects.filter(pk=rollup.pk).update(
+            **{field: F(field) + delta for field, delta in rollup_deltas(entry).items()}
+        )
+
+
+def _key_filter(keys, fields):
+    key_filter = Q(pk__in=[])
+    for key in keys:
+        key_filter |= Q(**dict(zip(fields, key)))
+    return key_filter
+
+
+def post_entries(entries):
+    """
+    Bulk counterpart of post_entry: apply and insert many new ledger entries at once.
+
+    All affected balance rows are locked together (in primary-key order, so
+    concurrent batches cannot deadlock), entries are applied in list order to
+    fill their running snapshots, and entries, balances and monthly rollups are
+    written with bulk queries. The number of queries does not grow with the
+    number of entries. Returns the created entries.
+    """
+    RewardsPointsTracker = global_apps.get_model("company", "RewardsPointsTracker")
+    RewardsPointsBalance = global_apps.get_model("company", "RewardsPointsBalance")
+    RewardsPointsMonthlyRollup = global_apps.get_model("company", "RewardsPointsMonthlyRollup")
+
+    entries = list(entries)
+    if not entries:
+        return entries
+
+    balance_keys = {(entry.user_id, entry.company_id) for entry in entries}
+    rollup_increments = defaultdict(lambda: defaultdict(lambda: ZERO))
+    for entry in entries:
+        for field, delta in rollup_deltas(entry).items():
+            rollup_increments[(entry.user_id, entry.company_id, month_start(entry.credit_date))][field] += delta
+
+    with transaction.atomic():
+        RewardsPointsBalance.objects.bulk_create(
+            [RewardsPointsBalance(user_id=user_id, company_id=company_id) for user_id, company_id in balance_keys],
+            ignore_conflicts=True,
+        )
+        balances = {
+            (balance.user_id, balance.company_id): balance
+            for balance in RewardsPointsBalance.objects.select_for_update().filter(
+                _key_filter(balance_keys, ("user_id", "company_id"))
+            ).order_by("pk")
+        }
+
+        for entry in entries:
+            balance = balances[(entry.user_id, entry.company_id)]
+            available_delta, pending_delta = entry_deltas(entry)
+            balance.points_available += available_delta
+            balance.points_pending += pending_delta
+            entry.points_available = balance.points_available
+            entry.points_pending = balance.points_pending
+
+        updated_at = timezone.now()
+        for balance in balances.values():
+            balance.updated_at = updated_at
+        RewardsPointsBalance.objects.bulk_update(
+            balances.values(), ["points_available", "points_pending", "updated_at"]
+        )
+        created = RewardsPointsTracker.objects.bulk_create(entries)
+
+        RewardsPointsMonthlyRollup.objects.bulk_create(
+            [
+                RewardsPointsMonthlyRollup(user_id=user_id, company_id=company_id, month=month)
+                for user_id, company_id, month in rollup_increments
+            ],
+            ignore_conflicts=True,
+        )
+        rollups = list(RewardsPointsMonthlyRollup.objects.filter(
+            _key_filter(rollup_increments, ("user_id", "company_id", "month"))
+        ))
+        for rollup in rollups:
+            for field, delta in rollup_increments[(rollup.user_id, rollup.company_id, rollup.month)].items():
+                setattr(rollup, field, getattr(rollup, field) + delta)
+        RewardsPointsMonthlyRollup.objects.bulk_update(rollups, ROLLUP_FIELDS)
+
+    return created
+
+
+def get_balance(user, company):
+    """
+    Current (points_available, points_pending) for a user in a company; one row read.
+    """
+    RewardsPointsBalance = global_apps.get_model("company", "RewardsPointsBalance")
+    balance = RewardsPointsBalance.objects.filter(user=user, company=company).values_list(
+        "points_available", "points_pending"
+    ).first()
+    return balance or (ZERO, ZERO)
+
+
+def get_monthly_total(user, company, when=None):
+    """
+    Credited plus blocked points allocated to a user in a company during the month of `when`.
+    """
+    RewardsPointsMonthlyRollup = global_apps.get_model("company", "RewardsPointsMonthlyRollup")
+    totals = RewardsPointsMonthlyRollup.objects.filter(
+        user=user, company=company, month=month_start(when)
+    ).values_list("credit_total", "blocked_total").first()
+    return sum(totals) if totals else ZERO
+
+
+def get_monthly_totals(user_ids, company, when=None):
+    """
+    {user_id: credited plus blocked points this month} for many users; one query.
+    """
+    RewardsPointsMonthlyRollup = global_apps.get_model("company", "RewardsPointsMonthlyRollup")
+    rows = RewardsPointsMonthlyRollup.objects.filter(
+        user_id__in=user_ids, company=company, month=month_start(when)
+    ).values_list("user_id", "credit_total", "blocked_total")
+    totals = {user_id: ZERO for user_id in user_ids}
+    for user_id, credit_total, blocked_total in rows:
+        totals[user_id] = credit_total + blocked_total
+    return totals
+
+
+def rebuild_balances(apps=global_apps):
+    """
+    Recompute every balance, running snapshot and monthly rollup from the ledger.
+
+    Used by the migration that introduced the balance tables (with historical
+    models) and by `manage.py rebuild_rewards_balances` to repair drift after
+    rows were deleted. Returns (balances, rollups) written.
+    """
+    RewardsPointsTracker = apps.get_model("company", "RewardsPointsTracker")
+    RewardsPointsBalance = apps.get_model("company", "RewardsPointsBalance")
+    RewardsPointsMonthlyRollup = apps.get_model("company", "RewardsPointsMonthlyRollup")
+
+    balances = defaultdict(lambda: [ZERO, ZERO])
+    rollups = defaultdict(lambda: defaultdict(lambda: ZERO))
+    snapshots = []
+
+    entries = RewardsPointsTracker.objects.order_by("user_id", "company_id", "credit_date", "id").only(
+        "id", "user_id", "company_id", "transaction_type", "credit", "blocked", "debit",
+        "credit_date", "points_available", "points_pending",
+    )
+    for entry in entries.iterator(chunk_size=2000):
+        key = (entry.user_id, entry.company_id)
+        available_delta, pending_delta = entry_deltas(entry)
+        balances[key][0] += available_delta
+        balances[key][1] += pending_delta
+        for field, delta in rollup_deltas(entry).items():
+            rollups[key + (month_start(entry.credit_date),)][field] += delta
+        if (entry.points_available, entry.points_pending) != tuple(balances[key]):
+            entry.points_available, entry.points_pending = balances[key]
+            snapshots.append(entry)
+
+    with transaction.atomic():
+        RewardsPointsBalance.objects.all().delete()
+        RewardsPointsMonthlyRollup.objects.all().delete()
+        RewardsPointsBalance.objects.bulk_create(
+            [
+                RewardsPointsBalance(user_id=user_id, company_id=company_id,
+                                     points_available=available, points_pending=pending)
+                for (user_id, company_id), (available, pending) in balances.items()
+            ],
+            batch_size=1000,
+        )
+        RewardsPointsMonthlyRollup.objects.bulk_create(
+            [
+                RewardsPointsMonthlyRollup(user_id=user_id, company_id=company_id, month=month, **totals)
+                for (user_id, company_id, month), totals in rollups.items()
+            ],
+            batch_size=1000,
+        )
+        # bulk_update skips save(), so correcting snapshots does not re-post entries.
+        RewardsPointsTracker.objects.bulk_update(snapshots, ["points_available", "points_pending"], batch_size=1000)
+
+    logger.info("Rebuilt %s rewards balance(s) and %s monthly rollup(s); corrected %s snapshot(s).",
+                len(balances), len(rollups), len(snapshots))
+    return len(balances), len(rollups)
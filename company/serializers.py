@@ -1,9 +1,76 @@
+from collections import defaultdict
 from rest_framework import serializers
 from .models import Company, Authority, Staff, StaffLevels, Branch, Task, Media
 from django.apps import apps
 from django.db.models import Q
 from users.models import User  # Import the User model
 
+
+def get_requested_fields(request):
+    """
+    Parse the `fields=` sparse-fieldset query parameter (comma separated).
+    Returns a set of field names, or None when the client wants every field.
+    """
+    if request is None or not hasattr(request, 'query_params'):
+        return None
+    raw = request.query_params.get('fields')
+    if not raw:
+        return None
+    requested = {name.strip() for name in raw.split(',') if name.strip()}
+    return requested or None
+
+
+class SparseFieldsetMixin:
+    """
+    Lets list clients request a subset of fields with `?fields=id,status`.
+
+    Unrequested fields are dropped before serialization, so expensive
+    SerializerMethodFields (associated media, nested data) are never computed.
+    Only applies to serializers built with the request in their context, so
+    nested serializers keep their full shape.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = kwargs.get('context', {}).get('request')
+        requested = get_requested_fields(request)
+        if requested and request.method in ('GET', 'HEAD'):
+            for field_name in set(self.fields) - requested:
+                self.fields.pop(field_name)
+
+def prefetch_branch_associations(branches):
+    """
+    Fetch the instances referenced by branches (appName, modelName, branch_id),
+    one in_bulk query per referenced model. Returns {(appName, modelName, id): instance}.
+    """
+    ids_by_model = defaultdict(set)
+    for branch in branches:
+        ids_by_model[(branch.appName, branch.modelName)].add(branch.branch_id)
+
+    associations = {}
+    for (app_name, model_name), ids in ids_by_model.items():
+        try:
+            model_class = apps.get_model(app_label=app_name, model_name=model_name)
+        except (LookupError, ValueError):
+            continue  # Reported per branch by BranchSerializer.get_associated_data
+        for pk, instance in model_class.objects.in_bulk(ids).items():
+            associations[(app_name, model_name, pk)] = instance
+    return associations
+
+
+class BranchListSerializer(serializers.ListSerializer):
+    """
+    Prefetches the associated instance of every branch before the child
+    serializer renders the rows, and shares them through the serializer context.
+    """
+
+    def to_representation(self, data):
+        branches = list(data.all() if hasattr(data, 'all') else data)
+        if 'associated_data' in self.child.fields:
+            self.context.setdefault('branch_associations', {}).update(prefetch_branch_associations(branches))
+        return super().to_representation(branches)
+
+
 class BranchSerializer(serializers.ModelSerializer):
     associated_data = serializers.SerializerMethodField()
     #appName = serializers.CharField(source='app_name')
@@ -11,17 +78,25 @@ class BranchSerializer(serializers.ModelSerializer):
     class Meta:
         model = Branch
         fields = ['id', 'name', 'company', 'branch_id', 'status', 'appName', 'modelName', 'created_at', 'associated_data']
+        list_serializer_class = BranchListSerializer
 
     def get_associated_data(self, obj):
         """
         Dynamically fetch the associated model information.
+        Uses the instances prefetched by BranchListSerializer when serializing many branches.
         """
         try:
             # Dynamically load the model class
             model_class = apps.get_model(app_label=obj.appName, model_name=obj.modelName)
 
             # Fetch the associated instance using branch_id
-            associated_instance = model_class.objects.get(id=obj.branch_id)
+            prefetched = self.context.get('branch_associations')
+            if prefetched is not None:
+                associated_instance = prefetched.get((obj.appName, obj.modelName, obj.branch_id))
+                if associated_instance is None:
+                    raise model_class.DoesNotExist(f"{model_class._meta.object_name} matching query does not exist.")
+            else:
+                associated_instance = model_class.objects.get(id=obj.branch_id)
 
             # Serialize the associated instance
             if hasattr(associated_instance, 'to_dict'):
@@ -123,11 +198,15 @@ class AdminCompanySerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'creator']
 
 
-class MediaSerializer(serializers.ModelSerializer):
+class MediaSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = Media
         fields = "__all__"
-        read_only_fields = ["id", "created_date", "negative_flags_count"]
+        read_only_fields = [
+            "id", "created_date", "negative_flags_count", "checksum",
+            # Set only by the media ingestion worker (company.media_ingestion)
+            "processing_status", "processing_attempts", "processing_error", "processed_at",
+        ]
 
     def validate(self, data):
         """
@@ -158,8 +237,8 @@ class MediaSerializer(serializers.ModelSerializer):
         return media_instance
 
 
-class TaskSerializer(serializers.ModelSerializer):
-    assignedToUserId = serializers.IntegerField(source="assigned_to.id", read_only=True)  # ✅ Ensures assigned user ID is returned
+class TaskSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    assignedToUserId = serializers.IntegerField(source="assigned_to_id", read_only=True)  # ✅ Ensures assigned user ID is returned
 
     class Meta:
         model = Task
@@ -171,10 +250,11 @@ class TaskSerializer(serializers.ModelSerializer):
     
   
 from .models import ActivityOwner
-class ActivityOwnerSerializer(serializers.ModelSerializer):
+class ActivityOwnerSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = ActivityOwner
         fields = '__all__'
+        read_only_fields = ['next_run_at']
         #read_only_fields = ['id', 'user', 'company']
 
 '''
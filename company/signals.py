@@ -27,3 +27,23 @@ def sync_branch_with_farm(sender, instance, created, **kwargs):
             branch.save()
         except Branch.DoesNotExist:
             pass  # If no branch exists, do nothing
+
+
+# Invalidate cached authority matrices whenever the data has_permission depends on changes.
+from django.db.models.signals import post_delete
+from company.models import Authority, Staff, StaffLevels
+from company.permission_cache import get_staff_member_models, invalidate_company
+
+
+def invalidate_permission_cache(sender, instance, **kwargs):
+    """
+    Bump the company's permission-cache version so every user's matrix is rebuilt.
+    """
+    invalidate_company(getattr(instance, 'company_id', None))
+
+
+for permission_model in [Authority, Staff, StaffLevels, *get_staff_member_models().values()]:
+    post_save.connect(invalidate_permission_cache, sender=permission_model,
+                      dispatch_uid=f"perm_cache_save_{permission_model._meta.label}")
+    post_delete.connect(invalidate_permission_cache, sender=permission_model,
+                        dispatch_uid=f"perm_cache_delete_{permission_model._meta.label}")
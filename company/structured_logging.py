@@ -0,0 +1,113 @@
+from logging.handlers import QueueHandler, QueueListener
+import atexit
+import datetime
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+
+
+# LogRecord attributes that are not `extra=` fields.
+RESERVED_ATTRS = frozenset(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+
+class StructuredFormatter(logging.Formatter):
+    """
+    One JSON object per record: time, level, logger, message, location and any `extra=` fields.
+    """
+
+    def format(self, record):
+        entry = {
+            "time": datetime.datetime.fromtimestamp(record.created, datetime.timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "module": record.module,
+            "line": record.lineno,
+            "process": record.process,
+            "thread": record.threadName,
+        }
+        for key, value in record.__dict__.items():
+            if key not in RESERVED_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        if record.stack_info:
+            entry["stack"] = record.stack_info
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class QueuedStreamHandler(QueueHandler):
+    """
+    Hands records to a background thread that formats and writes them, so request threads never block on I/O.
+
+    The message is merged with its arguments on the calling thread, and only
+    for records that passed the level checks: arguments of disabled calls
+    (querysets, model instances) are never turned into strings. Formatting
+    and the write to `stream` happen on the listener thread. The listener is
+    restarted after a fork, so pre-forking servers get one per worker.
+    """
+
+    def __init__(self, stream=None, maxsize=10000):
+        super().__init__(queue.Queue(maxsize=maxsize))
+        self.target = logging.StreamHandler(stream or sys.stderr)
+        self.dropped = 0
+        self._pid = None
+        self._listener = None
+        self._start_lock = threading.Lock()
+
+    def setFormatter(self, fmt):
+        # The formatter runs on the listener thread, in the target handler.
+        self.target.setFormatter(fmt)
+
+    def _ensure_listener(self):
+        if self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._pid != os.getpid():
+                self.queue = queue.Queue(maxsize=self.queue.maxsize)
+                self._listener = QueueListener(self.queue, self.target, respect_handler_level=False)
+                self._listener.start()
+                self._pid = os.getpid()
+                atexit.register(self.close)
+
+    def prepare(self, record):
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            # Tracebacks reference frames of this thread; render them before handing the record over.
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        self._ensure_listener()
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            # Never block a request on logging; count what was dropped instead.
+            self.dropped += 1
+
+    def close(self):
+        if self._listener is not None and self._pid == os.getpid():
+            self._listener.stop()
+            self._pid = None
+        self.target.close()
+        super().close()
+
+
+def parse_levels(spec):
+    """
+    Logger levels from "bsf.views=DEBUG,company=INFO" (LOG_LEVELS) as a LOGGING["loggers"] dict.
+    """
+    loggers = {}
+    for item in (spec or "").split(","):
+        name, _, level = item.partition("=")
+        if name.strip() and level.strip():
+            loggers[name.strip()] = {"level": level.strip().upper()}
+    return loggers
@@ -0,0 +1,103 @@
+from collections import defaultdict
+from django.apps import apps
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+import re
+
+
+# Legacy Task.completeDetails entries were written both as "[ - appName = bsf, ...]" and "[ - appName=bsf, ...]"
+_DETAIL_PATTERNS = {
+    "app_name": re.compile(r"appName\s*=\s*([^,\]]+)"),
+    "model_name": re.compile(r"modelName\s*=\s*([^,\]]+)"),
+    "model_id": re.compile(r"modelId\s*=\s*([^,\]]+)"),
+    "activity": re.compile(r"activity\s*=\s*([^,\]]+)"),
+    "filled_fields": re.compile(r"filledOut\s*=\s*([^\]]*)"),
+}
+
+
+def completion_entry(app_name, model_name, model_id, activity, filled_fields):
+    """
+    Describe one record filled out while completing a task.
+    """
+    return {
+        "app_name": app_name,
+        "model_name": model_name,
+        "model_id": int(model_id),
+        "activity": activity,
+        "filled_fields": list(filled_fields),
+    }
+
+
+def parse_complete_details(complete_details):
+    """
+    Parse a legacy Task.completeDetails string into completion entries.
+
+    Entries without an appName, modelName and numeric modelId are skipped.
+    """
+    entries = []
+    for chunk in (complete_details or "").split("[")[1:]:
+        values = {}
+        for field, pattern in _DETAIL_PATTERNS.items():
+            match = pattern.search(chunk)
+            values[field] = match.group(1).strip() if match else None
+        if not (values["app_name"] and values["model_name"] and (values["model_id"] or "").isdigit()):
+            continue
+        filled_fields = [field.strip() for field in (values["filled_fields"] or "").split(",") if field.strip()]
+        entries.append(completion_entry(
+            values["app_name"], values["model_name"], values["model_id"], values["activity"], filled_fields
+        ))
+    return entries
+
+
+def format_complete_details(entries):
+    """
+    Human-readable Task.completeDetails summary of completion entries.
+    """
+    return "".join(
+        f"[ - appName = {entry['app_name']}, - modelName = {entry['model_name']}, - modelId = {entry['model_id']}, "
+        f"- activity = {entry['activity']}, - filledOut = {', '.join(entry['filled_fields'])}]"
+        for entry in entries
+    )
+
+
+def record_task_completion(task, entries):
+    """
+    Replace the task's completion entries and refresh its completeDetails summary.
+
+    The caller still saves the task; completeDetails is only set on the instance.
+    """
+    TaskCompletionEntry = apps.get_model("company", "TaskCompletionEntry")
+    with transaction.atomic():
+        TaskCompletionEntry.objects.filter(task=task).delete()
+        TaskCompletionEntry.objects.bulk_create([TaskCompletionEntry(task=task, **entry) for entry in entries])
+    task.completeDetails = format_complete_details(entries)
+
+
+def get_completion_evidence(task_ids, company, branch):
+    """
+    {task_id: (completion entry count, has evidence)} for many tasks in one query.
+
+    A task has evidence when one of its completion entries has an active Media
+    file of the same company and branch attached.
+    """
+    Media = apps.get_model("company", "Media")
+    TaskCompletionEntry = apps.get_model("company", "TaskCompletionEntry")
+
+    media = Media.objects.filter(
+        app_name=OuterRef("app_name"),
+        model_name=OuterRef("model_name"),
+        model_id=OuterRef("model_id"),
+        company=company,
+        branch=branch,
+        status="active",
+    ).exclude(file="")
+    rows = TaskCompletionEntry.objects.filter(task_id__in=task_ids).annotate(
+        has_media=Exists(media)
+    ).values_list("task_id", "has_media")
+
+    counts = defaultdict(int)
+    evidence = defaultdict(bool)
+    for task_id, has_media in rows:
+        counts[task_id] += 1
+        evidence[task_id] = evidence[task_id] or has_media
+    return {task_id: (counts[task_id], evidence[task_id]) for task_id in task_ids}
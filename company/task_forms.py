@@ -0,0 +1,184 @@
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from decimal import Decimal, InvalidOperation
+from django.conf import settings
+from types import MappingProxyType
+import hashlib
+import json
+import re
+import threading
+
+
+CACHE_SIZE = getattr(settings, "TASK_FORM_CACHE_SIZE", 1024)
+
+_DATE_PATTERN = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+
+
+class InvalidFormSchema(ValueError):
+    """
+    Task.description is not a usable form schema.
+    """
+
+
+@dataclass(frozen=True)
+class ExistenceCheck:
+    """
+    A record that must exist for a field value to be accepted (the schema's "checkIfExisit").
+    """
+    app_name: str
+    model_name: str
+    search_field: str
+    status: str = "active"
+
+    def lookup(self, value):
+        """
+        Queryset filter kwargs for `value`; "*" in the search field is replaced by the value.
+        """
+        return {self.search_field.replace("*", value): value, "status": self.status}
+
+
+@dataclass(frozen=True)
+class FormField:
+    name: str
+    label: str
+    type: str = "text"
+    required: bool = False
+    multiple: bool = False
+    options: tuple = ()
+    existence: ExistenceCheck = None
+
+    def validate(self, value):
+        """
+        Return an error message for a user-supplied value, or None if it is acceptable.
+        """
+        if self.type == "date":
+            if not _DATE_PATTERN.match(value):
+                return f"❌ Invalid format! Please enter *{self.label}* in YYYY-MM-DD format."
+        elif self.type == "decimal":
+            try:
+                Decimal(value)
+            except InvalidOperation:
+                return f"❌ Invalid input! Please enter a numeric value for *{self.label}*."
+        elif self.type == "dropdown":
+            if value.capitalize() not in self.options:
+                return f"❌ Invalid selection! Choose one of: {', '.join(self.options)} for *{self.label}*."
+        elif self.type == "text" and self.required and not value:
+            return f"❌ {self.label} is required. Please enter a valid value."
+        return None
+
+
+@dataclass(frozen=True)
+class TaskForm:
+    """
+    Compiled, read-only form schema of a task: its fields plus the scalar
+    attributes (model_id, Batch, Stage, Activity, ...) written alongside them.
+    """
+    fields: tuple
+    attributes: MappingProxyType = field(default_factory=lambda: MappingProxyType({}))
+
+    def get(self, key, default=None):
+        return self.attributes.get(key, default)
+
+    @property
+    def required_fields(self):
+        return tuple(form_field for form_field in self.fields if form_field.required)
+
+    def missing_fields(self, data):
+        """
+        Required fields that are absent or empty in `data`.
+        """
+        return [form_field for form_field in self.required_fields if not data.get(form_field.name)]
+
+
+def _parse(description):
+    text = (description or "").strip()
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        try:
+            # Older task descriptions were stored with single quotes.
+            return json.loads(text.replace("'", '"'))
+        except json.JSONDecodeError as exc:
+            raise InvalidFormSchema(f"Task description is not valid JSON: {exc}") from exc
+
+
+def _collect_attributes(node, attributes):
+    # First occurrence wins, matching how processors used to search the raw description.
+    if isinstance(node, dict):
+        for key, value in node.items():
+            if key == "fields":
+                continue
+            if isinstance(value, (dict, list)):
+                _collect_attributes(value, attributes)
+            elif value is not None:
+                attributes.setdefault(key, str(value))
+    elif isinstance(node, list):
+        for item in node:
+            _collect_attributes(item, attributes)
+
+
+def _compile_field(raw):
+    if not isinstance(raw, dict) or not raw.get("name"):
+        raise InvalidFormSchema(f"Form field needs a name: {raw!r}")
+    check = raw.get("checkIfExisit")
+    existence = None
+    # Checks missing the app, model or search field are skipped, as the step engine always did.
+    search_field = (check.get("search_field") or check.get("pondName")) if isinstance(check, dict) else None
+    if search_field and check.get("appName") and check.get("model"):
+        existence = ExistenceCheck(
+            app_name=check["appName"],
+            model_name=check["model"],
+            search_field=search_field,
+            status=check.get("status", "active"),
+        )
+    return FormField(
+        name=raw["name"],
+        label=raw.get("label") or raw["name"],
+        type=raw.get("type", "text"),
+        required=bool(raw.get("required", False)),
+        multiple=bool(raw.get("multiple", False)),
+        options=tuple(raw.get("options") or ()),
+        existence=existence,
+    )
+
+
+def compile_form(description):
+    """
+    Parse and validate a task description into a TaskForm. Raises InvalidFormSchema.
+    """
+    schema = _parse(description)
+    if not isinstance(schema, dict) or not isinstance(schema.get("fields"), list):
+        raise InvalidFormSchema("Task description is missing the 'fields' list.")
+    attributes = {}
+    _collect_attributes(schema, attributes)
+    return TaskForm(
+        fields=tuple(_compile_field(raw) for raw in schema["fields"]),
+        attributes=MappingProxyType(attributes),
+    )
+
+
+_forms = OrderedDict()
+_forms_lock = threading.Lock()
+
+
+def get_task_form(task):
+    """
+    Compiled form of a task, cached per process by (task id, description hash).
+
+    Editing the description changes the hash, so a stale form is never served.
+    Invalid schemas are not cached and raise InvalidFormSchema each time.
+    """
+    description = task.description or ""
+    key = (task.pk, hashlib.sha1(description.encode()).hexdigest())
+    with _forms_lock:
+        form = _forms.get(key)
+        if form is not None:
+            _forms.move_to_end(key)
+            return form
+
+    form = compile_form(description)
+    with _forms_lock:
+        _forms[key] = form
+        while len(_forms) > CACHE_SIZE:
+            _forms.popitem(last=False)
+    return form
@@ -0,0 +1,126 @@
+from datetime import timedelta
+
+from django.db.models import Exists, OuterRef, Q
+from django.utils.timezone import now
+
+from .models import ActivityOwner
+from .permission_cache import get_staff_member_models
+from .serializers import ActivityOwnerSerializer, TaskSerializer, get_requested_fields
+
+
+# Tasks still active this many days past their due date become visible to the
+# branch staff (and, after one day, to the assistant).
+ASSISTANT_LATE_DAYS = 1
+STAFF_DELAYED_DAYS = 2
+
+
+def get_team_member_ids(user):
+    """
+    Resolve the users led by `user` once per app's StaffMember table.
+
+    Returns {app_label: set(user ids)}; one query per app, independent of task volume.
+    """
+    return {
+        app_label: set(StaffMemberModel.objects.filter(leader=user).values_list('user_id', flat=True))
+        for app_label, StaffMemberModel in get_staff_member_models().items()
+    }
+
+
+def managed_tasks_filter(user):
+    """
+    Q matching tasks assigned to a member of the user's team in the task's own app.
+    """
+    member_query_filter = Q(pk__in=[])
+    for app_label, member_ids in get_team_member_ids(user).items():
+        if member_ids:
+            member_query_filter |= Q(appName=app_label, assigned_to_id__in=member_ids)
+    return member_query_filter
+
+
+def delayed_tasks_filter(user, match_branch=False):
+    """
+    Q matching active tasks delayed by STAFF_DELAYED_DAYS or more in companies where
+    the user is an active StaffMember of the task's app.
+
+    Each app contributes a correlated sub-select on its StaffMember table, so the
+    whole visibility rule is evaluated by the database in the task query itself.
+    With match_branch=True the membership must also be on the task's branch (for
+    apps whose StaffMember carries one).
+    """
+    staff_filter = Q(pk__in=[])
+    for app_label, StaffMemberModel in get_staff_member_models().items():
+        membership = StaffMemberModel.objects.filter(user=user, status="active", company=OuterRef('company'))
+        if match_branch and any(field.name == 'branch' for field in StaffMemberModel._meta.fields):
+            membership = membership.filter(branch=OuterRef('branch'))
+        staff_filter |= Q(Exists(membership), appName=app_label)
+
+    return Q(due_date__lt=now() - timedelta(days=STAFF_DELAYED_DAYS), status="active") & staff_filter
+
+
+def late_assistant_tasks_filter(user):
+    return Q(due_date__lt=now() - timedelta(days=ASSISTANT_LATE_DAYS), status="active", assistant=user)
+
+
+def activity_key(obj):
+    """
+    Composite key shared by Task and ActivityOwner: (company, branch, activity, appName, modelName).
+    """
+    return (obj.company_id, obj.branch_id, obj.activity, obj.appName, obj.modelName)
+
+
+def get_activity_owners_for_tasks(tasks):
+    """
+    Bulk-fetch the ActivityOwner for every task in one query.
+
+    Returns {(company_id, branch_id, activity, appName, modelName): ActivityOwner},
+    keeping the lowest id per key to match the previous `.first()` lookups.
+    """
+    keys = {activity_key(task) for task in tasks}
+    if not keys:
+        return {}
+
+    candidates = ActivityOwner.objects.filter(
+        company_id__in={key[0] for key in keys},
+        activity__in={key[2] for key in keys},
+        appName__in={key[3] for key in keys},
+        modelName__in={key[4] for key in keys},
+    ).order_by('pk')
+
+    owners = {}
+    for activity_owner in candidates:
+        key = activity_key(activity_owner)
+        if key in keys:
+            owners.setdefault(key, activity_owner)
+    return owners
+
+
+def serialize_tasks_with_activity(tasks, context=None):
+    """
+    Serialize tasks and attach `associated_activity` using a fixed number of queries.
+
+    `tasks` may be a queryset or an already-fetched page of Task instances. When the
+    request asks for a sparse fieldset without `associated_activity`, the
+    ActivityOwner lookup is skipped entirely.
+    """
+    # TaskSerializer reads only the assigned_to_id column, so a page needs no user join.
+    tasks = list(tasks)
+
+    requested = get_requested_fields((context or {}).get('request'))
+    task_rows = TaskSerializer(tasks, many=True, context=context or {}).data
+    if requested and "associated_activity" not in requested:
+        return list(task_rows)
+
+    owners = get_activity_owners_for_tasks(tasks)
+
+    serialized_owners = {}
+    tasks_with_activity = []
+    for task, task_data in zip(tasks, task_rows):
+        associated_activity = owners.get(activity_key(task))
+        if associated_activity is not None and associated_activity.pk not in serialized_owners:
+            serialized_owners[associated_activity.pk] = ActivityOwnerSerializer(associated_activity).data
+        task_data["associated_activity"] = (
+            serialized_owners[associated_activity.pk] if associated_activity is not None else None
+        )
+        tasks_with_activity.append(task_data)
+
+    return tasks_with_activity
@@ -1,3 +1,85 @@
 from django.test import TestCase
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+from unittest import mock
+import requests
 
-# Create your tests here.
+from bsf.models import StaffMember
+from company import benchmarks, instrumentation
+from company.models import Task
+from company.views import TaskListCreateView
+
+
+class TaskListQueryBudgetTests(TestCase):
+    """
+    TaskListCreateView.list stays within its @query_budget on a seeded dataset, with budgets enforced.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        instrumentation.install()
+        cls.dataset = benchmarks.seed_dataset("small", seed=0)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.dataset['user'])}")
+        patcher = mock.patch.object(instrumentation, "ENFORCE_QUERY_BUDGETS", True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def assertWithinBudget(self, params):
+        self.assertTrue(TaskListCreateView.list.query_budget)
+        response = self.client.get("/api/company/tasks/", params)  # Raises QueryBudgetExceeded over budget
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_paginated_list_within_budget(self):
+        response = self.assertWithinBudget({"page_size": 50})
+        self.assertTrue(response.data["results"])
+
+    def test_unpaginated_list_within_budget(self):
+        response = self.assertWithinBudget({})
+        self.assertTrue(response.data)
+
+    def test_manager_lists_team_tasks(self):
+        user = self.dataset["user"]
+        members = list(
+            StaffMember.objects.filter(company_id=self.dataset["company"]).exclude(user=user)
+            .order_by("user_id").values_list("user_id", flat=True).distinct()[:2]
+        )
+        StaffMember.objects.filter(company_id=self.dataset["company"], user_id__in=members).update(leader=user)
+        expected = set(Task.objects.filter(appName="bsf", assigned_to_id__in=members).values_list("pk", flat=True))
+        self.assertTrue(expected)
+
+        response = self.assertWithinBudget({"manager": "true"})
+        self.assertEqual({task["id"] for task in response.data}, expected)
+
+    def test_all_requires_company(self):
+        response = self.client.get("/api/company/tasks/", {"all": "true"})
+        self.assertEqual(response.status_code, 400)
+
+
+class OutgoingHttpInstrumentationTests(TestCase):
+    """
+    Outgoing HTTP calls are counted however the request is issued.
+    """
+
+    class Adapter(requests.adapters.BaseAdapter):
+        def send(self, request, **kwargs):
+            response = requests.Response()
+            response.status_code, response.url, response.request, response._content = 200, request.url, request, b""
+            return response
+
+        def close(self):
+            pass
+
+    def test_prepared_requests_are_counted(self):
+        instrumentation.install()
+        session = requests.Session()
+        session.mount("https://", self.Adapter())
+        with instrumentation.measure() as metrics:
+            # TwilioHttpClient prepares and sends its requests without Session.request.
+            session.send(session.prepare_request(requests.Request("POST", "https://api.twilio.com/2010-04-01/Messages.json")))
+            session.get("https://api.twilio.com/2010-04-01/Accounts.json")
+        self.assertEqual(metrics.http_calls, 2)
+        self.assertEqual(metrics.http_hosts, {"api.twilio.com": 2})
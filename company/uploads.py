@@ -0,0 +1,141 @@
+from django.conf import settings
+from django.core.exceptions import RequestDataTooBig
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import InMemoryUploadedFile, TemporaryUploadedFile
+from django.core.files.uploadhandler import FileUploadHandler
+import hashlib
+import io
+import os
+
+
+# Bytes read from the request per step; with the spool threshold this bounds the memory one upload can use.
+CHUNK_SIZE = getattr(settings, "MEDIA_UPLOAD_CHUNK_SIZE", 64 * 1024)
+# Files up to this size stay in memory; larger ones are written to FILE_UPLOAD_TEMP_DIR as they arrive.
+SPOOL_SIZE = getattr(settings, "FILE_UPLOAD_MAX_MEMORY_SIZE", 512 * 1024)
+MAX_FILE_SIZE = getattr(settings, "MEDIA_UPLOAD_MAX_FILE_SIZE", 250 * 1024 * 1024)
+MAX_REQUEST_SIZE = getattr(settings, "MEDIA_UPLOAD_MAX_REQUEST_SIZE", 500 * 1024 * 1024)
+
+
+class UploadTooLarge(RequestDataTooBig):
+    """
+    An uploaded file, or all files of one request together, exceeded the configured limit.
+    """
+
+
+def temp_dir():
+    """
+    FILE_UPLOAD_TEMP_DIR, recreated if it was removed after startup (None means the system temp directory).
+    """
+    directory = getattr(settings, "FILE_UPLOAD_TEMP_DIR", None)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    return directory
+
+
+class StreamingUploadHandler(FileUploadHandler):
+    """
+    Receive each file in CHUNK_SIZE pieces, hashing it (SHA-256) in the same pass.
+
+    A file stays in an in-memory buffer until it grows past SPOOL_SIZE, then
+    the buffer is flushed to a temporary file in FILE_UPLOAD_TEMP_DIR and the
+    rest is written there as it arrives, so an upload never holds more than
+    SPOOL_SIZE + CHUNK_SIZE bytes in memory. The resulting upload carries
+    `checksum`. Files over MAX_FILE_SIZE, or requests whose files exceed
+    MAX_REQUEST_SIZE, are rejected with UploadTooLarge as soon as the limit
+    is crossed (or up front from Content-Length).
+    """
+
+    chunk_size = CHUNK_SIZE
+
+    def __init__(self, request=None):
+        super().__init__(request)
+        self.request_size = 0
+        self.buffer = None
+        self.spooled = None
+
+    def handle_raw_input(self, input_data, META, content_length, boundary, encoding=None):
+        # Content-Length also covers the form fields, which Django limits separately.
+        limit = MAX_REQUEST_SIZE + (settings.DATA_UPLOAD_MAX_MEMORY_SIZE or 0)
+        if content_length and content_length > limit:
+            raise UploadTooLarge(f"The request body ({content_length} bytes) exceeds the upload limit of {limit} bytes.")
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.file_size = 0
+        self.digest = hashlib.sha256()
+        self.buffer = io.BytesIO()
+        self.spooled = None
+
+    def receive_data_chunk(self, raw_data, start):
+        self.file_size += len(raw_data)
+        self.request_size += len(raw_data)
+        if self.file_size > MAX_FILE_SIZE:
+            self._discard()
+            raise UploadTooLarge(f"File '{self.file_name}' exceeds the limit of {MAX_FILE_SIZE} bytes per file.")
+        if self.request_size > MAX_REQUEST_SIZE:
+            self._discard()
+            raise UploadTooLarge(f"The uploaded files exceed the limit of {MAX_REQUEST_SIZE} bytes per request.")
+
+        self.digest.update(raw_data)
+        if self.spooled is None and self.file_size > SPOOL_SIZE:
+            temp_dir()  # TemporaryUploadedFile creates its file there
+            self.spooled = TemporaryUploadedFile(self.file_name, self.content_type, 0, self.charset, self.content_type_extra)
+            self.spooled.write(self.buffer.getvalue())
+            self.buffer = None
+        (self.spooled or self.buffer).write(raw_data)
+        return None  # Consumed here; no later handler sees the chunk
+
+    def file_complete(self, file_size):
+        if self.spooled is not None:
+            upload, self.spooled = self.spooled, None
+            upload.size = file_size
+        else:
+            upload = InMemoryUploadedFile(
+                file=self.buffer, field_name=self.field_name, name=self.file_name, content_type=self.content_type,
+                size=file_size, charset=self.charset, content_type_extra=self.content_type_extra,
+            )
+        self.buffer = None
+        upload.seek(0)
+        upload.checksum = self.digest.hexdigest()
+        return upload
+
+    def upload_interrupted(self):
+        self._discard()
+
+    def _discard(self):
+        self.buffer = None
+        if self.spooled is not None:
+            path = self.spooled.temporary_file_path()
+            try:
+                self.spooled.close()
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            self.spooled = None
+
+
+def upload_checksum(upload):
+    """
+    SHA-256 of an upload: the one computed while it streamed in, or one chunked pass for files from other sources.
+
+    Call before store_upload(), which may move a spooled file away.
+    """
+    checksum = getattr(upload, "checksum", None)
+    if checksum is None:
+        digest = hashlib.sha256()
+        for chunk in upload.chunks(CHUNK_SIZE):
+            digest.update(chunk)
+        upload.seek(0)
+        checksum = upload.checksum = digest.hexdigest()
+    return checksum
+
+
+def store_upload(upload, name, storage=None):
+    """
+    Save an upload under `name` without reading it into memory; returns the stored name.
+
+    Spooled uploads are moved into FileSystemStorage by rename (a chunked copy
+    when FILE_UPLOAD_TEMP_DIR is on another filesystem than MEDIA_ROOT);
+    in-memory ones are written from their buffer.
+    """
+    return (storage or default_storage).save(name, upload)
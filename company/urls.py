@@ -1,7 +1,7 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import AddCompanyView, EditCompanyView, DeleteCompanyView, ViewCompanyView, AuthorityView, AddAuthorityView, EditAuthorityView, DeleteAuthorityView, ViewStaffView, AddStaffView, EditStaffView, DeleteStaffView
-from .views import AddStaffLevelView, EditStaffLevelView, DeleteStaffLevelView, StaffLevelView, BranchListCreateView, BranchDetailView, MediaListCreateView, MediaDetailView, apiTest
+from .views import AddStaffLevelView, EditStaffLevelView, DeleteStaffLevelView, StaffLevelView, BranchListCreateView, BranchDetailView, MediaListCreateView, MediaDetailView, apiTest, BatchRewardAllocationView
 
 
 router = DefaultRouter()
@@ -12,6 +12,7 @@ urlpatterns = [
     #path('api/', include(router.urls)),
 
     path('test/', apiTest.as_view(), name='api_Test'),
+    path('rewards/allocate/batch/', BatchRewardAllocationView.as_view(), name='batch-reward-allocation'),
     path('add/', AddCompanyView.as_view(), name='add-company'),
     path('<int:pk>/edit/', EditCompanyView.as_view(), name='edit-company'),
     path('<int:pk>/delete/', DeleteCompanyView.as_view(), name='delete-company'),
@@ -6,11 +6,18 @@ from django.shortcuts import get_object_or_404
 from rest_framework.response import Response
 from rest_framework import status
 from django.apps import apps
+from django.db.models import Q
+from collections import defaultdict
+from .permission_cache import get_authority_matrix, get_required_level, get_app_staff_level
+from . import rewards_ledger
+from .reward_allocation import BatchRewardAllocator, compute_task_points
+from .task_completion import get_completion_evidence
 import logging
 from django.core.mail import send_mail
 
 
 User = get_user_model()
+logger = logging.getLogger(__name__)
 
 # This function is used to save media files associated with a specific model instance.
 def save_media_files(media_data, company, app_name, model_name, model_id, user):
@@ -93,12 +100,56 @@ def get_associated_media(data_id, model_name, app_name, company):
             app_name=app_name,
             company=company
         )
-        print(data_id, model_name, app_name, company)
+        logger.debug("%s %s %s %s", data_id, model_name, app_name, company)
         return media_queryset
     except ObjectDoesNotExist:
         return Media.objects.none()  # Return an empty queryset if no media is found
 
 
+# This function is used to fetch the media of many records at once (avoids one query per row).
+def get_associated_media_bulk(keys, company=None):
+    """
+    Fetches associated media for many records in a single query.
+
+    Args:
+        keys (iterable): (app_name, model_name, model_id) tuples.
+        company (Company, optional): Restrict media to this company.
+
+    Returns:
+        dict: {(app_name, model_name, model_id): [Media, ...]} in the default Media
+        ordering. Keys without media are absent.
+    """
+    ids_by_model = defaultdict(set)
+    for app_name, model_name, model_id in keys:
+        if model_id is not None:
+            ids_by_model[(app_name, model_name)].add(model_id)
+    if not ids_by_model:
+        return {}
+
+    key_filter = Q()
+    for (app_name, model_name), model_ids in ids_by_model.items():
+        key_filter |= Q(app_name=app_name, model_name=model_name, model_id__in=model_ids)
+
+    media_queryset = Media.objects.filter(key_filter)
+    if company is not None:
+        media_queryset = media_queryset.filter(company=company)
+
+    grouped = defaultdict(list)
+    for media in media_queryset:
+        grouped[(media.app_name, media.model_name, media.model_id)].append(media)
+    return dict(grouped)
+
+
+def prefetch_associated_media(instances, app_name, model_name, company=None):
+    """
+    Returns {instance.id: [Media, ...]} for a list of model instances (one query).
+    """
+    media_map = get_associated_media_bulk(
+        [(app_name, model_name, instance.id) for instance in instances], company=company
+    )
+    return {instance.id: media_map.get((app_name, model_name, instance.id), []) for instance in instances}
+
+
 # This function is used to check if a user has the required permission to perform a specific action on a model.
 def has_permission(user, company, app_name, model_name, action, min_level=1, requested_documents=None):
     """
@@ -119,12 +170,14 @@ def has_permission(user, company, app_name, model_name, action, min_level=1, req
     """
 
     # Allow superusers or the company creator to execute the request
-    if user.is_superuser or company.creator == user:
+    if user.is_superuser or company.creator_id == user.pk:
         return True
 
+    # Resolve the user's authority matrix once per request (and across requests via the cache)
+    matrix = get_authority_matrix(user, company)
+
     # Check if the user is a staff member of the company
-    staff_record = Staff.objects.filter(user=user, company=company).first()
-    if not staff_record:
+    if not matrix["is_staff"]:
         raise PermissionDenied("You are not a staff member of this company.")
 
     # Special case: Allow partial access for GET/view actions only
@@ -142,23 +195,11 @@ def has_permission(user, company, app_name, model_name, action, min_level=1, req
             if filtered_documents:
                 return filtered_documents
 
-    # Check if the app_name and model_name exist in the Authority model
-    authority = Authority.objects.filter(company=company, app_name=app_name, model_name=model_name).first()
-    if not authority:
-        # If not defined in Authority, allow request for superusers or company creator
-        if user.is_superuser or company.creator == user:
-            return True
-
-    # Get the required authority level for the specified action
-    try:
-        required_level = int(getattr(authority, action, '5'))  # Default to the highest level if undefined
-    except AttributeError:
-        raise PermissionDenied(f"Invalid action '{action}'.")
+    # Get the required authority level for the specified action (defaults to the highest level if undefined)
+    required_level = get_required_level(matrix, app_name, model_name, action)
 
     # Ensure the staff has the required authority level
-    StaffMemberModel = apps.get_model(app_name, 'StaffMember')
-    staff_level = StaffMemberModel.objects.filter(user=user, company=company).values_list('level', flat=True).first()
-    print(  staff_level, required_level, min_level, user)
+    staff_level = get_app_staff_level(matrix, app_name)
     if not staff_level or int(staff_level) < required_level or int(staff_level) < min_level:
         raise PermissionDenied(f"Insufficient authority level to perform the '{action}' action.")
 
@@ -269,7 +310,7 @@ def handle_file(media_file,  allowed_types):
     try:
         mime_type, _ = mimetypes.guess_type(media_file.name)
         if mime_type in ["image/png"]:
-            print(f"Skipping EXIF for {media_file.name} (PNG file)")
+            logger.debug("Skipping EXIF for %s (PNG file)", media_file.name)
             return  # PNG files do not have EXIF data
 
         image = Image.open(media_file)
@@ -278,11 +319,11 @@ def handle_file(media_file,  allowed_types):
         if exif_data:
             for tag_id, value in exif_data.items():
                 tag = TAGS.get(tag_id, tag_id)
-                print(f"{tag}: {value}")
+                logger.debug("%s: %s", tag, value)
     except UnidentifiedImageError:
-        print(f"File {media_file.name} is not a valid image.")
+        logger.debug("File %s is not a valid image.", media_file.name)
     except AttributeError:
-        print(f"File {media_file.name} does not have EXIF data.")
+        logger.debug("File %s does not have EXIF data.", media_file.name)
 
 ALLOWED_TYPES = ["video/mp4", "image/jpeg", "image/png"]
 def is_valid_file(media_file):
@@ -294,6 +335,8 @@ def is_valid_file(media_file):
 
 import os
 from django.conf import settings
+from django.core.files.move import file_move_safe
+from company.uploads import CHUNK_SIZE
 
 def save_uploaded_file(media_file, destination_dir):
     """
@@ -303,8 +346,12 @@ def save_uploaded_file(media_file, destination_dir):
         os.makedirs(destination_dir)
 
     file_path = os.path.join(destination_dir, media_file.name)
+    if hasattr(media_file, 'temporary_file_path'):
+        # Spooled to disk by the upload handler: move it instead of copying the bytes again
+        file_move_safe(media_file.temporary_file_path(), file_path, allow_overwrite=True)
+        return file_path
     with open(file_path, 'wb+') as destination:
-        for chunk in media_file.chunks():
+        for chunk in media_file.chunks(CHUNK_SIZE):
             destination.write(chunk)
     return file_path
 
@@ -390,8 +437,8 @@ class PointsRewardSystem:
         self.total_monthly_points = self.get_monthly_allocated_points()
         #print(f"Total Monthly Points : {total_monthly_points}")
 
-        self.log_points()
-        print(self.log_points())
+        result = self.log_points()
+        logger.debug("Log points result: %s", result)
 
         self.reward_granted()
 
@@ -399,7 +446,7 @@ class PointsRewardSystem:
             "status": "pending",
             "staff": self.staff.user,
             "pending_points": self.points_per_task,
-            "total_points_this_month": self.total_monthly_points + self.points_per_task,
+            "total_points_this_month": self.total_monthly_points + self.points_per_task['proportional_points'],
         }
 
     def is_approved_by_hierarchy(self, staff, task):
@@ -425,14 +472,22 @@ class PointsRewardSystem:
         if task.status != "pending":
             return {"status": "failure", "reason": "Task is not in a pending state for approval."}
 
-        tracker_entry = RewardsPointsTracker.objects.filter(user=staff.user, task=task, points_pending=points).first()
-        if not tracker_entry:
+        pending_entry = RewardsPointsTracker.objects.filter(
+            user=staff.user, task=task, transaction_type='pending', credit=points
+        ).first()
+        if not pending_entry:
             raise ValueError("No matching pending points entry found for approval.")
 
-        tracker_entry.points_pending -= points
-        tracker_entry.credit += points
-        tracker_entry.credit_date = now()
-        tracker_entry.save()
+        # The ledger is append-only: approval posts an entry moving the points from pending to available.
+        tracker_entry = RewardsPointsTracker.objects.create(
+            user=staff.user,
+            company=task.company,
+            branch=task.branch,
+            task=task,
+            credit=points,
+            transaction_type='approved',
+            comments=f"Approval of pending entry {pending_entry.pk}",
+        )
 
         task.status = "completed"
         task.approved_by = staff.user
@@ -446,143 +501,44 @@ class PointsRewardSystem:
         }
 
     def has_video_evidence(self, task):
-        required_count = task.dataQuantity
-        completed_entries = task.completeDetails.count('[')
-        count = 0
-        result = False
-        for entry in task.completeDetails.split('['):
-            if count > required_count:
-                break
-            if 'appName' in entry and 'modelName' in entry and 'modelId' in entry:
-                app_name = entry.split('appName = ')[1].split(',')[0].strip()
-                model_name = entry.split('modelName = ')[1].split(',')[0].strip()
-                model_id = entry.split('modelId = ')[1].split(',')[0].strip()
-                activity = entry.split('activity = ')[1].split(',')[0].strip()
-                filled_out = entry.split('filledOut = ')[1].split(']')[0].strip()
-                #print(f"appName: {app_name}, modelName: {model_name}, modelId: {model_id}, activity: {activity}, filledOut: {filled_out}")
-            
-                MediaData = Media.objects.filter(company=self.company, branch=self.branch, model_name=model_name, app_name=app_name, model_id=model_id, status='active').first()
-                if MediaData and MediaData.file:
-                    #print(f"Media file found for {model_name} with ID {model_id}")
-                    result = True
-                    
-            count += 1
-
-        return result
+        _, has_evidence = get_completion_evidence([task.id], self.company, self.branch)[task.id]
+        return has_evidence
 
     def is_dataset_complete(self, task):
-        required_count = task.dataQuantity
-        completed_entries = task.completeDetails.count('[')
-        if completed_entries  >= required_count:
-            return True
-        return False
+        return task.completion_entries.count() >= task.dataQuantity
 
     def calculate_points(self, task):
-        print("")
-        print("**** Calculate Points ***************************************")
-        print("")
-        activityData = ActivityOwner.objects.filter(activity=task.activity, branch=self.branch, company=self.company, status='active', appName=task.appName).first()
-        totalBranchActivityData = ActivityOwner.objects.filter(branch=self.branch, company=self.company, status='active', appName=task.appName)
-        totalBranchActivity = sum(activity.importance_scale * activity.min_estimated_count for activity in totalBranchActivityData)
-        #print(self.max_points_data['max_points'])
-        
-        if totalBranchActivity == 0:
-            return 0
-        proportional_points = (self.max_points_data['max_points'] / totalBranchActivity) * (activityData.importance_scale)
-        print(f"Starting Proportional Points : {proportional_points}")
-        ownerLoss_points = 0
-        days_late = (self.task.completed_date - self.task.due_date).days
-        #print(f"days_late : {days_late}")
-
-        
-        #print(f"self.task.assistant : {self.task.assistant}") 
-        #print(f"self.task.completed_by : {self.task.completed_by}")
+        logger.debug("Calculate Points")
+        weights, importance = BatchRewardAllocator(self.company, self.branch, self.request.user).load_activity_weights()
 
-        
-        if self.task.assigned_to == self.task.completed_by:
-            if self.task.completed_date and self.task.due_date:
-                grace_period = 1
-                penalty_days = days_late - grace_period
-                print(f"penalty_days : {penalty_days}")
-                penalty = min((proportional_points * 10/100) * penalty_days, (proportional_points * 50/100))
-                print(f"Penalty Point to be deducted from owner  : {penalty}")
-                ownerLoss_points += penalty
-                proportional_points -= penalty
-                print(f"Owner Proportional Points: {proportional_points}, ownerLoss_points: {ownerLoss_points}")
-                return {'proportional_points': proportional_points, 'ownerLoss_points':ownerLoss_points}
-                
-            
-        if self.task.completed_by == self.task.assistant:
-            ownerLoss_points += proportional_points+(proportional_points * 10/100)
-            grace_period = 3
-            penalty_days = days_late - grace_period
-            print(f"penalty_days : {penalty_days}")
-            
-            if penalty_days <= 0:
-                proportional_points += (proportional_points * 10/100)
-                print(f"Assitant Proportional Points: {proportional_points}, ownerLoss_points: {ownerLoss_points}")
-                return {'proportional_points': proportional_points, 'ownerLoss_points':ownerLoss_points}
-            
-            if penalty_days >= 1:
-                penalty = min((proportional_points * 10/100) * penalty_days, (proportional_points * 50/100))
-                proportional_points -= penalty
-                print(f"proportional_points: {proportional_points}, ownerLoss_points: {ownerLoss_points}")
-                return {'proportional_points': proportional_points, 'ownerLoss_points':ownerLoss_points}
-        
-        StaffMemberModel = apps.get_model(self.task.appName, 'StaffMember')
-        staffMember = StaffMemberModel.objects.filter(
-            user=self.task.completed_by, 
-            company=self.company, 
-            branch=self.branch, 
+        StaffMemberModel = apps.get_model(task.appName, 'StaffMember')
+        completed_by_branch_staff = StaffMemberModel.objects.filter(
+            user=task.completed_by,
+            company=self.company,
+            branch=self.branch,
             status='active'
-        ).exclude(user__in=[self.task.assigned_to, self.task.assistant]).first()
-        if staffMember:
-            proportional_points += (proportional_points * 50/100)
-            ownerLoss_points += proportional_points
-            print(f"Start proportional_points: {proportional_points}, Start ownerLoss_points: {ownerLoss_points}")
-            if self.task.completed_date and self.task.due_date:
-                grace_period = 4
-                penalty_days = days_late - grace_period
-                print(f"penalty_days : {penalty_days}")
-                if penalty_days >= 1:
-                    penalty = min((proportional_points * 10/100) * penalty_days, (proportional_points * 70/100))
-                    proportional_points -= penalty
-                    print(f"proportional_points: {proportional_points}, ownerLoss_points: {ownerLoss_points}")
-                return {'proportional_points': proportional_points, 'ownerLoss_points':ownerLoss_points}
-                
-        
-        #print(proportional_points, ownerLoss_points)
-        ownerLoss_points += proportional_points
-        proportional_points = 0
-        return {'proportional_points': proportional_points, 'ownerLoss_points':ownerLoss_points}
-    
-    def get_monthly_allocated_points(self):
-            print("************ Monthly Allocated Points ****************")
-            current_month = now().month
-            current_year = now().year
-
-            monthly_points = RewardsPointsTracker.objects.filter(
-                user=self.task.assigned_to,
-                credit_date__month=current_month,
-                credit_date__year=current_year
-            ).exclude(transaction_type='pending').aggregate(
-                credit_total=Sum('credit'),
-                blocked_total=Sum('blocked')
-            )
-
-            monthCreditReceived = monthly_points['credit_total'] or 0
-            print(f"Month Credit Received : {monthCreditReceived}")
-            monthBlockedPoints = monthly_points['blocked_total'] or 0
-            print(f"Month Blocked Credit : {monthBlockedPoints}")
+        ).exclude(user__in=[task.assigned_to, task.assistant]).exists()
+
+        points = compute_task_points(
+            task,
+            self.max_points_data['max_points'],
+            importance.get((task.appName, task.activity), 0),
+            weights[task.appName],
+            completed_by_branch_staff,
+        )
+        logger.debug("proportional_points: %s, ownerLoss_points: %s", points['proportional_points'], points['ownerLoss_points'])
+        return points
 
-            total_monthly_points = monthCreditReceived + monthBlockedPoints
+    def get_monthly_allocated_points(self):
+            logger.debug("Monthly Allocated Points")
+            total_monthly_points = rewards_ledger.get_monthly_total(self.task.assigned_to, self.company)
+            logger.debug("Total Monthly Points : %s", total_monthly_points)
 
-            
             return total_monthly_points
 
     def log_points(self):
 
-        print("************ Log Points ****************")
+        logger.debug("Log Points")
 
         if self.task.status == "rewardGranted":
             return {"status": "failure", "reason": "Task reward has been granted already."}
@@ -638,7 +594,7 @@ class PointsRewardSystem:
             )
 
     def reward_granted(self):
-        print("************ Reward Granted ****************")
+        logger.debug("Reward Granted")
         self.task.status = "rewardGranted"
         self.task.save()
         return {"status": "success", "reason": "Reward points granted successfully."}
@@ -653,7 +609,7 @@ def extract_common_data(request, fields):
     # Ensure all required fields are provided
     missing_fields = [field for field, value in data.items() if not value]
     if missing_fields:
-        logging.warning(f"Missing fields: {missing_fields}")
+        logger.warning("Missing fields: %s", missing_fields)
         return Response(
             {"error": f"Missing required fields: {', '.join(missing_fields)}"},
             status=status.HTTP_400_BAD_REQUEST,
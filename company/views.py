@@ -9,7 +9,13 @@ from .models import Company, Authority, Staff, StaffLevels, Branch, Media, Task
 from django.contrib.auth.models import User
 from .serializers import ActivityOwnerSerializer, CompanySerializer, AdminCompanySerializer, AuthoritySerializer, StaffSerializer, StaffLevelsSerializer, MediaSerializer, TaskSerializer, BranchSerializer
 from django.shortcuts import get_object_or_404
-from company.utils import check_user_exists, get_associated_media, PointsRewardSystem
+from company.utils import check_user_exists, get_associated_media, get_associated_media_bulk, PointsRewardSystem
+from company.permission_cache import get_authority_matrix, get_required_level
+from company.pagination import KeysetCursorPagination
+from company.instrumentation import query_budget
+from company.reward_allocation import BatchRewardAllocator
+from company.recurring_tasks import generate_recurring_tasks
+from company.task_queries import serialize_tasks_with_activity, managed_tasks_filter, delayed_tasks_filter, late_assistant_tasks_filter
 import logging
 from django.apps import apps
 from django.utils.timezone import now
@@ -41,12 +47,14 @@ def has_permission(user, company, app_name, model_name, action, min_level=1, req
     """
 
     # Allow superusers or the company creator to execute the request
-    if user.is_superuser or company.creator == user:
+    if user.is_superuser or company.creator_id == user.pk:
         return True
 
+    # Resolve the user's authority matrix once per request (and across requests via the cache)
+    matrix = get_authority_matrix(user, company)
+
     # Check if the user is a staff member of the company
-    staff_record = Staff.objects.filter(user=user, company=company).first()
-    if not staff_record:
+    if not matrix["is_staff"]:
         raise PermissionDenied("You are not a staff member of this company.")
 
     # Special case: Allow partial access for GET/view actions only
@@ -64,21 +72,11 @@ def has_permission(user, company, app_name, model_name, action, min_level=1, req
             if filtered_documents:
                 return filtered_documents
 
-    # Check if the app_name and model_name exist in the Authority model
-    authority = Authority.objects.filter(company=company, app_name=app_name, model_name=model_name).first()
-    if not authority:
-        # If not defined in Authority, allow request for superusers or company creator
-        if user.is_superuser or company.creator == user:
-            return True
-
-    # Get the required authority level for the specified action
-    try:
-        required_level = int(getattr(authority, action, '5'))  # Default to the highest level if undefined
-    except AttributeError:
-        raise PermissionDenied(f"Invalid action '{action}'.")
+    # Get the required authority level for the specified action (defaults to the highest level if undefined)
+    required_level = get_required_level(matrix, app_name, model_name, action)
 
     # Ensure the staff has the required authority level
-    staff_level = StaffLevels.objects.filter(user=user, company=company).values_list('level', flat=True).first()
+    staff_level = matrix["company_level"]
     if not staff_level or int(staff_level) < required_level or int(staff_level) < min_level:
         raise PermissionDenied(f"Insufficient authority level to perform the '{action}' action.")
 
@@ -248,6 +246,38 @@ class apiTest(APIView):
             return Response({"error": "An unexpected error occurred."}, status=500)
 
 
+class BatchRewardAllocationView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, *args, **kwargs):
+        """
+        Allocate points for many completed tasks of a branch in one transaction.
+
+        Body: company, branch, and optionally `tasks` (list of task ids; defaults to
+        every completed/appeal task of the branch) and `dry_run`. Returns a per-task report.
+        """
+        company_id = request.data.get("company")
+        branch_id = request.data.get("branch")
+        if not company_id or not branch_id:
+            return Response({"error": "'company' and 'branch' are required."}, status=400)
+
+        task_ids = request.data.get("tasks")
+        if task_ids is not None:
+            if not isinstance(task_ids, list):
+                return Response({"error": "'tasks' must be a list of task ids."}, status=400)
+            try:
+                task_ids = [int(task_id) for task_id in task_ids]
+            except (TypeError, ValueError):
+                return Response({"error": "'tasks' must be a list of task ids."}, status=400)
+
+        company = get_object_or_404(Company, id=company_id)
+        branch = get_object_or_404(Branch, id=branch_id, company=company)
+        dry_run = str(request.data.get("dry_run", "")).lower() in ("1", "true", "yes")
+
+        report = BatchRewardAllocator(company, branch, request.user, dry_run=dry_run).allocate(task_ids)
+        return Response(report, status=200)
+
+
 # *******  Views for Company Model ***********
 
 class ViewCompanyView(APIView):
@@ -299,15 +329,16 @@ class ViewCompanyView(APIView):
                 queryset = Company.objects.filter(creator=request.user)
 
             companies_data = []
+            companies = list(queryset)
 
-            for company in queryset:
-                # Fetch associated media for each company
-                media_queryset = get_associated_media(
-                    data_id=company.id,
-                    model_name="Company",
-                    app_name="company",
-                    company=company
-                )
+            # Fetch associated media for all companies in one query
+            media_map = get_associated_media_bulk([("company", "Company", company.id) for company in companies])
+
+            for company in companies:
+                media_queryset = [
+                    media for media in media_map.get(("company", "Company", company.id), [])
+                    if media.company_id == company.id
+                ]
                 media_serializer = MediaSerializer(media_queryset, many=True)
 
                 # Serialize company data
@@ -495,7 +526,7 @@ class AddStaffLevelView(generics.CreateAPIView):
             raise PermissionDenied("The specified user is not a staff member of this company.")
 
         # Automatically set the approver field to the authenticated user
-        logger.debug(f"Saving serializer with data: {serializer.validated_data}")
+        logger.debug("Saving serializer with data: %s", serializer.validated_data)
         serializer.save(approver=self.request.user)
 
 class EditStaffLevelView(generics.RetrieveUpdateAPIView):
@@ -535,7 +566,7 @@ class EditStaffLevelView(generics.RetrieveUpdateAPIView):
             raise PermissionDenied("The specified user is not a staff member of this company.")
 
         # Log the data being updated
-        logger.debug(f"Updating serializer with data: {serializer.validated_data}")
+        logger.debug("Updating serializer with data: %s", serializer.validated_data)
         
         # Perform the update
         serializer.save()
@@ -677,6 +708,8 @@ class MediaListCreateView(generics.ListCreateAPIView):
     """
     serializer_class = MediaSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetCursorPagination
+    cursor_ordering = ('-created_date', '-id')
 
     def get_queryset(self):
         """
@@ -757,180 +790,6 @@ class MediaDetailView(generics.RetrieveUpdateDestroyAPIView):
         instance.delete()
 
 
-class TaskListCreateView(generics.ListCreateAPIView):
-    serializer_class = TaskSerializer
-    permission_classes = [IsAuthenticated]
-
-    def get_queryset(self):
-        
-        """
-        Fetch tasks based on user, company, branch, status query parameters,
-        and annotate late task information if the user is an assistant.
-        Include tasks late by 2 days or more if the user is a branch staff.
-        """
-        user = self.request.user # Get the authenticated user
-        queryset = Task.objects.all() # Get all tasks
-
-        # Handle query parameters
-        all_param = self.request.query_params.get("all", "false").lower() == "true"
-        owner_param = self.request.query_params.get("owner", "false").lower() == "true"
-        assistant_param = self.request.query_params.get("assistant", "false").lower() == "true"
-        manager_param = self.request.query_params.get("manager", "false").lower() == "true"
-        company_id = self.request.query_params.get("company")
-        branch_id = self.request.query_params.get("branch")
-        status_param = self.request.query_params.get("status")
-
-        if manager_param:
-            # Initialize an empty query filter
-            member_query_filter = Q()
-
-            
-
-            # Filter tasks where the user is a manager
-            for task in queryset:
-
-                app_name = task.appName
-                # Get the StaffMember model (assumes app_name is constant or known)
-                StaffMemberModel = apps.get_model(app_name, 'StaffMember')  # Replace 'app_name' with actual app name
-
-
-                if StaffMemberModel.objects.filter(user=task.assigned_to, leader=user).exists():
-                    #print(f"User is a manager of {task.assigned_to}")
-                    member_query_filter |= Q(assigned_to=task.assigned_to)
-
-            # Apply the accumulated filter to the queryset
-            member_querySet = queryset.filter(member_query_filter)
-
-            return member_querySet
-        
-    
-        if all_param:
-            # also check if user is a manager of the farm***.
-
-            if branch_id and not company_id:
-                raise ValidationError("'company' is required when 'branch' is provided.")
-
-            if company_id:
-                try:
-                    company = Company.objects.get(id=company_id)
-                except Company.DoesNotExist:
-                    raise ValidationError(f"Company with ID '{company_id}' does not exist.")
-
-                if not has_permission(user, company, app_name="bsf", model_name="Task", action="view"):
-                    raise PermissionDenied("You do not have permission to view tasks for this company.")
-
-                queryset = queryset.filter(company=company)
-
-                if branch_id:
-                    try:
-                        branch = Branch.objects.get(branch_id=branch_id)
-                    except Branch.DoesNotExist:
-                        raise ValidationError(f"Branch with ID '{branch_id}' does not exist.")
-
-                    if branch.company != company:
-                        raise ValidationError(f"Branch '{branch.name}' does not belong to Company '{company.name}'.")
-
-                    queryset = queryset.filter(branch=branch)
-       
-
-        elif owner_param:
-            # Get all tasks where the user is the owner
-            queryset = queryset.filter(owner=user)
-
-        elif assistant_param:
-            # Get all tasks where the user is the assistant
-            queryset = queryset.filter(assistant=user)
-            
-        else:
-            # Get all tasks assigned to the user
-            queryset = queryset.filter(assigned_to=user)
-
-            # Get all late tasks where the user is an assistant
-            late_tasks = Task.objects.filter(
-                due_date__lt=now() - timedelta(days=1),
-                status="active",
-                assistant=user
-            )
-            queryset = queryset | late_tasks  # Combine the two querysets
-
-        
-        # Include extra tasks delayed by 2 or more days for branch staff
-        delayed_tasks = Task.objects.filter(
-            due_date__lt=now() - timedelta(days=2),
-            status="active"
-        )
-
-        for task in delayed_tasks:
-            appName = task.appName
-            # Check if the user is an active staff member of the branch
-            StaffMemberModel = apps.get_model(appName, 'StaffMember')
-            if StaffMemberModel.objects.filter(user=user, status="active", company=task.company).exists():
-                queryset = queryset | delayed_tasks 
-        
-        # Filter by task completion and ownership
-        completed_tasks = Task.objects.exclude(status="active")
-        user_completed_tasks = completed_tasks.filter(completed_by=user)
-        other_completed_tasks = completed_tasks.exclude(completed_by=user)
-        queryset = queryset | user_completed_tasks
-        queryset = queryset.exclude(pk__in=other_completed_tasks.values_list('pk', flat=True))
-
-        # Filter by status
-        if status_param:
-            valid_status_choices = [choice[0] for choice in Task.STATUS_CHOICES]
-            if status_param not in valid_status_choices:
-                raise ValidationError({"status": f"Invalid status '{status_param}'. Valid options are: {', '.join(valid_status_choices)}."})
-            queryset = queryset.filter(status=status_param)
-
-        
-        if company_id:# If company is provided in param:
-                try:
-                    company = Company.objects.get(id=company_id)
-                except Company.DoesNotExist: # Check if company exist
-                    raise ValidationError(f"Company with ID '{company_id}' does not exist.")
-                if not has_permission(user, company, app_name="bsf", model_name="Task", action="view"):
-                    raise PermissionDenied("You do not have permission to view tasks for this company.")
-                if branch_id:
-                    try: 
-                        branch = Branch.objects.get(branch_id=branch_id)
-                    except Branch.DoesNotExist:
-                            raise ValidationError(f"Branch with ID '{branch_id}' does not exist.")
-                    if branch :
-                        queryset = queryset.filter(branch=branch)
-                queryset = queryset.filter(company=company)
-
-        # Annotate each task with associated_activity
-        tasks_with_activity = []
-        for task in queryset:
-            associated_activity = ActivityOwner.objects.filter(
-                branch=task.branch,
-                activity=task.activity,
-                appName=task.appName,
-                modelName=task.modelName,
-                company=task.company,
-            ).first()
-            task_data = TaskSerializer(task).data  # Serialize task data
-            if associated_activity:
-                task_data["associated_activity"] = ActivityOwnerSerializer(associated_activity).data
-            else:
-                task_data["associated_activity"] = None
-            tasks_with_activity.append(task_data)
-
-        return tasks_with_activity
-    
-    def list(self, request, *args, **kwargs):
-        """
-        Override the list method to return the annotated queryset as a response.
-        """
-        queryset = self.get_queryset()
-        return Response(queryset)
-
-    
-        #return queryset
-
-    def perform_create(self, serializer):
-        #**** Create Custom Task 
-        serializer.save()
-
 class TaskDetailView(generics.RetrieveUpdateDestroyAPIView):
     queryset = Task.objects.all()
     serializer_class = TaskSerializer
@@ -940,20 +799,31 @@ class TaskDetailView(generics.RetrieveUpdateDestroyAPIView):
 class TaskListCreateView(generics.ListCreateAPIView):
     serializer_class = TaskSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetCursorPagination
+    cursor_ordering = ('-created_at', '-id')
 
     def get_queryset(self):
         """
         Fetch tasks for logged-in users with filters for:
+        - Team tasks (manager=true) or all tasks of a company/branch (all=true)
         - Past tasks
         - Completed tasks
         - Approved tasks
         - Assistant tasks
         - Date, week, month, year filters
+
+        By default the user's own tasks are listed, together with active tasks
+        late for their assistant and tasks delayed in companies where the user
+        is staff.
         """
         user = self.request.user
         queryset = Task.objects.all()
 
         # ✅ Get query parameters
+        manager_param = self.request.query_params.get("manager", "false").lower() == "true"
+        all_param = self.request.query_params.get("all", "false").lower() == "true"
+        company_id = self.request.query_params.get("company")
+        branch_id = self.request.query_params.get("branch")
         status_param = self.request.query_params.get("status")
         task_type = self.request.query_params.get("task_type")  # assistant, completed, approved
         date_filter = self.request.query_params.get("date")  # YYYY-MM-DD
@@ -962,8 +832,35 @@ class TaskListCreateView(generics.ListCreateAPIView):
         year_filter = self.request.query_params.get("year")  # YYYY
         past_tasks = self.request.query_params.get("past", "false").lower() == "true"
 
-        # ✅ Fetch tasks assigned to the user
-        queryset = queryset.filter(assigned_to=user)
+        if manager_param:
+            # ✅ Tasks assigned to members of the user's team (team resolved once per app)
+            queryset = queryset.filter(managed_tasks_filter(user))
+        elif all_param:
+            # ✅ Every task of a company (optionally one branch) the user may view
+            if not company_id:
+                raise ValidationError("'company' is required when 'all' is provided.")
+            try:
+                company = Company.objects.get(id=company_id)
+            except Company.DoesNotExist:
+                raise ValidationError(f"Company with ID '{company_id}' does not exist.")
+            if not has_permission(user, company, app_name="bsf", model_name="Task", action="view"):
+                raise PermissionDenied("You do not have permission to view tasks for this company.")
+            queryset = queryset.filter(company=company)
+
+            if branch_id:
+                try:
+                    branch = Branch.objects.get(branch_id=branch_id)
+                except Branch.DoesNotExist:
+                    raise ValidationError(f"Branch with ID '{branch_id}' does not exist.")
+                if branch.company_id != company.pk:
+                    raise ValidationError(f"Branch '{branch.name}' does not belong to Company '{company.name}'.")
+                queryset = queryset.filter(branch=branch)
+        else:
+            # ✅ Tasks assigned to the user, late tasks the user assists and tasks delayed
+            # in the user's companies (one query with per-app sub-selects)
+            queryset = queryset.filter(
+                Q(assigned_to=user) | late_assistant_tasks_filter(user) | delayed_tasks_filter(user)
+            )
 
         # ✅ Filter for past tasks
         if past_tasks:
@@ -1019,36 +916,24 @@ class TaskListCreateView(generics.ListCreateAPIView):
             queryset = queryset.filter(status=status_param)
 
         # ✅ Return annotated task list
-        return self.annotate_tasks(queryset)
+        return queryset
 
-    def annotate_tasks(self, queryset):
+    def annotate_tasks(self, tasks):
         """
         Annotate each task with its associated activity.
         """
-        tasks_with_activity = []
-        for task in queryset:
-            associated_activity = ActivityOwner.objects.filter(
-                branch=task.branch,
-                activity=task.activity,
-                appName=task.appName,
-                modelName=task.modelName,
-                company=task.company,
-            ).first()
-            task_data = TaskSerializer(task).data  # Serialize task data
-            if associated_activity:
-                task_data["associated_activity"] = ActivityOwnerSerializer(associated_activity).data
-            else:
-                task_data["associated_activity"] = None
-            tasks_with_activity.append(task_data)
-
-        return tasks_with_activity
+        return serialize_tasks_with_activity(tasks, context=self.get_serializer_context())
 
+    @query_budget(10)
     def list(self, request, *args, **kwargs):
         """
-        Override the list method to return the annotated queryset as a response.
+        Return the annotated tasks, one cursor page at a time when `cursor`/`page_size` is given.
         """
         queryset = self.get_queryset()
-        return Response(queryset)
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(self.annotate_tasks(page))
+        return Response(self.annotate_tasks(queryset))
 
     def perform_create(self, serializer):
         """
@@ -1106,6 +991,8 @@ class ActivityOwnerListCreateView(generics.ListCreateAPIView):
     queryset = ActivityOwner.objects.all().order_by('-created_date')
     serializer_class = ActivityOwnerSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetCursorPagination
+    cursor_ordering = ('-created_date', '-id')
 
     def perform_create(self, serializer):
         serializer.save(created_by=self.request.user)
@@ -1116,63 +1003,20 @@ class ActivityOwnerDetailView(generics.RetrieveUpdateDestroyAPIView):
     permission_classes = [IsAuthenticated]
 
 class Recurance(APIView):
+    """
+    Run the recurring task scheduler now. Pass dry_run to only report what would be generated.
+    """
     permission_classes = [IsAuthenticated]
 
     def post(self, request, *args, **kwargs):
         if not request.user.is_superuser:
             raise PermissionDenied("You do not have permission to perform this action.")
 
-        nowTime = now()
-        activities = ActivityOwner.objects.filter(status="active", reoccurring=True)
-        # print(f"Checking for activities at {now}")
-
-        for activity in activities:
-            # check if activity is on-going (activity.start_date <= now <= activity.start_date + activity.interval_days)
-            if activity.reoccurring_Start and activity.reoccurring_Start <= nowTime.date() and nowTime.date() <= (activity.reoccurring_Start + timedelta(days=activity.interval_days)):
-                print(f"Activity {activity.activity} is on-going.")
-                continue
-            # Check if the activity is due for reoccurring task creation
-            elif activity.reoccurring_End is None or activity.reoccurring_End > nowTime:
-                print(f"Creating task for activity {activity.activity} - {activity.owner}")
-                # Generate new task
-
-                # Create the next task in the workflow
-                Task.objects.create(
-                    company=activity.company,
-                    branch=activity.branch,
-                    title=f"{activity.activity} - {activity.owner}",
-                    due_date=(activity.reoccurring_End or nowTime) + timedelta(days=activity.interval_days),
-                    assigned_to=activity.owner if activity else None,
-                    assistant=activity.assistant if activity else None,
-                    appName=activity.appName,
-                    modelName=activity.modelName,
-                    activity=activity.activity,
-                    status="active",
-                )
-                print(f"Created task for activity {activity.activity} - {activity.owner}")
-
-                #update reoccurring_Start time 
-                activity.reoccurring_Start = nowTime
-                activity.save()
-
-            # need to send an email to activity owner manager inform that activity is due for reoccurring task creation but still has one that isn't completed yet
-            else:
-                # Send an email to the activity owner's manager
-
-                # Get the manager's email
-                manager_email = activity.owner.manager.email if activity.owner.manager else None
-
-                if manager_email:
-                    send_mail(
-                        subject="Reoccurring Task-{activity.activity}, Creation Due",
-                        message=f"Dear Manager,\n\nThe activity '{activity.activity}' assigned to {activity.owner} is due for reoccurring task creation but still has one that isn't completed yet.\n\nPlease take the necessary actions.\n\nBest regards,\nYour Company",
-                        from_email="no-reply@yourcompany.com",
-                        recipient_list=[manager_email],
-                        fail_silently=False,
-                    )
-
-                print(f"Activity {activity.activity} is due for reoccurring task creation but still has one that isn't completed yet.")
-                continue
+        dry_run = str(request.data.get("dry_run", request.query_params.get("dry_run", ""))).lower() in ("1", "true", "yes")
+        company_id = request.data.get("company") or request.query_params.get("company")
+        company = get_object_or_404(Company, id=company_id) if company_id else None
 
-        return Response({"message": "Reoccurring tasks created successfully."})
+        report = generate_recurring_tasks(dry_run=dry_run, company=company)
+        message = "Dry run: no tasks were created." if dry_run else "Reoccurring tasks created successfully."
+        return Response({"message": message, **report})
     
@@ -12,8 +12,13 @@ import random
 from rest_framework.parsers import JSONParser
 from django_otp.plugins.otp_totp.models import TOTPDevice
 from company.task import check_and_generate_tasks
+from whatsapp.sessions import has_active_task
+from company.pagination import KeysetCursorPagination
 from django_otp import devices_for_user
 from django.shortcuts import get_object_or_404
+import logging
+
+logger = logging.getLogger(__name__)
 
 class RegisterView(generics.CreateAPIView):
     queryset = User.objects.all()
@@ -142,6 +147,8 @@ class UserListView(generics.ListAPIView):
     queryset = User.objects.all()
     serializer_class = UserSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetCursorPagination
+    cursor_ordering = ('-date_joined', '-id')
 
 class EnableTOTPView(APIView):
     permission_classes = [IsAuthenticated]
@@ -198,7 +205,7 @@ class WhatsAppView(APIView):
         sender_phone = sender.replace("whatsapp:", "").strip()
         self.media_url = request.data.get("MediaUrl0")
 
-        print(f"Received message from {sender_phone}: {message}")
+        logger.debug("Received message from %s: %s", sender_phone, message)
 
         if message.lower().startswith("help"):
             help_handler = WhatsAppHelpHandler(sender_phone, message)
@@ -236,12 +243,11 @@ class WhatsAppView(APIView):
         
         # ✅ Step 6: Handle Task Retrieval with Filters
         if message.lower().startswith("show tasks") or message.lower().startswith("my task"):
-            print("Starts with My Task")
+            logger.debug("Starts with My Task")
             return WhatsAppTaskHandler.handle_task_retrieval(user, message)
         
         # ✅ Step 8: If a task is active, do NOT validate input
-        active_task = cache.get(f"whatsapp_task_active_{user_id}", None)
-        if active_task:
+        if has_active_task(sender_phone):
             task_handler = WhatsAppTaskHandler(request)  # ✅ Initialize first to set `task_id`
             #return task_handler.process_whatsapp_task_step()  # ✅ Process task actions
             return task_handler.process_task_step()  # ✅ Process task actions
@@ -258,14 +264,14 @@ class WhatsAppView(APIView):
         # ✅ Validate Input - Return error if not part of recognized actions or active session
         help_handler = WhatsAppHelpHandler(sender_phone, message)
         invalid_input_response = help_handler.validate_input()
-        print(invalid_input_response)
+        logger.debug("%s", invalid_input_response)
 
         if invalid_input_response:
             return invalid_input_response
 
         
         # ✅ Step Final: Only send invalid input message if no active session
-        if not cache.get(f"whatsapp_task_active_{user_id}"):
+        if not has_active_task(sender_phone):
             return WhatsAppUtils.send_message(sender_phone, "❌ Invalid input. Send 'Help' for available commands.")
 
         return Response({"message": "Task session active, awaiting input."}, status=200)
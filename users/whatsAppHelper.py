@@ -2,7 +2,11 @@ from django.core.cache import cache
 from django.contrib.auth import authenticate
 from rest_framework.response import Response
 from rest_framework.test import APIRequestFactory
-from twilio.rest import Client
+from whatsapp.outbox import enqueue_message, twiml_ack
+from whatsapp.sessions import (
+    StaleSessionError, activate_task, clear_active_task, delete_session, load_session, save_session,
+    touch_active_task, update_session,
+)
 from decouple import config
 from django.utils.timezone import now
 import re
@@ -19,7 +23,13 @@ from users.models import User, UserProfile
 from company.models import Task, Media, ActivityOwner
 from company.views import TaskListCreateView
 from company.serializers import TaskSerializer, ActivityOwnerSerializer
+from company.media_fetcher import enqueue_remote_media, twilio_auth
+from company.task_forms import InvalidFormSchema, get_task_form
+from company.task_queries import serialize_tasks_with_activity, delayed_tasks_filter, late_assistant_tasks_filter
 import importlib
+import logging
+
+logger = logging.getLogger(__name__)
 
 
 def get_user_phone(user):
@@ -117,18 +127,10 @@ class WhatsAppHelpHandler:
         """
         Sends a WhatsApp message to the user.
         """
-        TWILIO_ACCOUNT_SID = config("TWILIO_ACCOUNT_SID")
-        TWILIO_AUTH_TOKEN = config("TWILIO_AUTH_TOKEN")
-        client = Client(TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN)
-
-        client.messages.create(
-            from_="whatsapp:+14155238886",
-            to=f"whatsapp:{self.sender_phone}",
-            body=message_body
-        )
+        enqueue_message(self.sender_phone, message_body)
 
-        print(f"📤 Sent WhatsApp Message to {self.sender_phone}: {message_body}")
-        return Response({"message": "WhatsApp message sent"}, status=200)
+        logger.debug("📤 Queued WhatsApp Message to %s: %s", self.sender_phone, message_body)
+        return twiml_ack()
 
 
 class WhatsAppLoginHandler:
@@ -198,7 +200,7 @@ class WhatsAppLoginHandler:
         Handles the user's response to login confirmation.
         """
         pending_user_id = cache.get(f"whatsapp_pending_confirmation_{self.sender_phone}")
-        print(f"🔒 Pending User ID: {pending_user_id}")
+        logger.debug("🔒 Pending User ID: %s", pending_user_id)
 
         if not pending_user_id:
             return self.send_message("❌ No pending login confirmation. Please start login by typing 'login'.")
@@ -269,19 +271,10 @@ class WhatsAppLoginHandler:
         """
         Sends a WhatsApp message to the user.
         """
-        TWILIO_ACCOUNT_SID = config("TWILIO_ACCOUNT_SID")
-        TWILIO_AUTH_TOKEN = config("TWILIO_AUTH_TOKEN")
-        client = Client(TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN)
-
-        client.messages.create(
-            from_="whatsapp:+14155238886",
-            to=f"whatsapp:{self.sender_phone}",
-            body=message_body
-        )
-
+        enqueue_message(self.sender_phone, message_body)
 
-        print(f"📤 Sent WhatsApp Message to {self.sender_phone}: {message_body}")
-        return Response({"message": "WhatsApp message sent"}, status=200)
+        logger.debug("📤 Queued WhatsApp Message to %s: %s", self.sender_phone, message_body)
+        return twiml_ack()
 
 
 class WhatsAppTaskHandler5:
@@ -424,27 +417,15 @@ class WhatsAppTaskHandler5:
         """
         Sends a WhatsApp message to the user.
         """
-        TWILIO_ACCOUNT_SID = config("TWILIO_ACCOUNT_SID")
-        TWILIO_AUTH_TOKEN = config("TWILIO_AUTH_TOKEN")
-        client = Client(TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN)
+        enqueue_message(self.sender_phone, message_body)
 
-        client.messages.create(
-            from_="whatsapp:+14155238886",
-            to=f"whatsapp:{self.sender_phone}",
-            body=message_body
-        )
-
-        print(f"📤 Sent WhatsApp Message to {self.sender_phone}: {message_body}")
-        return Response({"message": "WhatsApp message sent"}, status=200)
+        logger.debug("📤 Queued WhatsApp Message to %s: %s", self.sender_phone, message_body)
+        return twiml_ack()
 
     def submit_task(self, task_id):
         """
         Submits the collected task form data.
         """
-        TWILIO_ACCOUNT_SID = config("TWILIO_ACCOUNT_SID")
-        TWILIO_AUTH_TOKEN = config("TWILIO_AUTH_TOKEN")
-        client = Client(TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN)
-
         end_date = cache.get(f"task_{self.sender_phone}_end_date", "")
         harvest_weight = cache.get(f"task_{self.sender_phone}_harvest_weight", "")
         harvest_date = cache.get(f"task_{self.sender_phone}_harvest_date", "")
@@ -457,13 +438,9 @@ class WhatsAppTaskHandler5:
             "media": media
         }
 
-        print(f"📤 Submitting Task Data: {form_data}")
+        logger.debug("📤 Submitting Task Data: %s", form_data)
 
-        client.messages.create(
-            from_="whatsapp:+14155238886",
-            to=f"whatsapp:{self.sender_phone}",
-            body="✅ Task submission complete! Sending for approval."
-        )
+        enqueue_message(self.sender_phone, "✅ Task submission complete! Sending for approval.")
 
         return Response({"message": "Task submitted"}, status=200)
 
@@ -492,10 +469,10 @@ class WhatsAppTaskHandler:
             self.has_error = True
             return
 
-        # ✅ Retrieve active task ID
-        stored_task_id = cache.get(f"task_{self.user_id}_id")
+        # ✅ Retrieve active task ID from the phone's conversation session
         extracted_task_id = self.extract_task_id()
-        self.task_id = extracted_task_id if extracted_task_id else stored_task_id
+        self.phone_session = load_session(self.sender_phone)
+        self.task_id = extracted_task_id if extracted_task_id else self.phone_session.data.get("active_task_id")
 
         # ✅ Step 5: If no task ID is found, prompt user to start a task
         if not self.task_id:
@@ -510,47 +487,17 @@ class WhatsAppTaskHandler:
             self.has_error = True
             return
             
-        # ✅ Retrieve Task Description from Cache (Ensures no redundant DB calls)
-        task_description = cache.get(f"task_description_{self.task_id}")
-        
-        if not task_description:
-            
-            #print(f"🔍 Switching to Task {self.task_id} - {self.task.title}")
-            
-            task_description = self.task.description.strip()
-            task_description = task_description.replace("'", '"')  # Replace single quotes with double quotes
-            cache.set(f"task_description_{self.task_id}", task_description, timeout=1800)  # Cache for 30 minutes
+        # ✅ Compiled form schema of the task (parsed once per description, then cached)
+        try:
+            self.form = get_task_form(self.task)
+        except InvalidFormSchema as e:
+            logger.warning("❌ Task form configuration is invalid: %s", e)
+            self.send_message("❌ Task form configuration is invalid. Please contact support.")
+            self.has_error = True
+            return
 
-            # ✅ Parse form schema from task description
-            try:
-                # ✅ Try parsing JSON directly
-                self.form_schema = json.loads(task_description)
-                
-            except json.JSONDecodeError as e:
-                print(f"⚠️ Initial JSON Parsing Error: {e}. Attempting fix...")
-
-                 # ✅ Second attempt: Replace single quotes only if JSON parsing fails
-                try:
-                    task_description_fixed = task_description.replace("'", '"') # Replace single quotes with double quotes
-                    self.form_schema = json.loads(task_description_fixed)
-                    print("✅ Fixed JSON format successfully.")
-
-                    # ✅ Save fixed version back to cache
-                    cache.set(f"task_description_{self.task_id}", task_description_fixed, timeout=1800)
-
-                except json.JSONDecodeError as e2:
-                    print(f"❌ JSON Parsing Failed Again: {e2}")
-                    self.send_message("❌ Task form configuration is invalid. Please contact support.")
-                    self.has_error = True
-                    return
-                
-            # ✅ Validate schema structure
-            if not isinstance(self.form_schema, dict) or "fields" not in self.form_schema:
-                self.send_message("❌ Task form configuration is missing required fields.")
-                self.has_error = True
-                return
-
-            #print(f"✅ Loaded Form Schema for Task {self.task_id}")
+        # ✅ Load this task's form progress (step and collected fields) in one round-trip
+        self.session = load_session(self.sender_phone, self.task_id)
             
     
     def process_task_step(self):
@@ -562,32 +509,14 @@ class WhatsAppTaskHandler:
             return  # ✅ Prevents further processing if __init__() encountered an error
 
         # ✅ Ensure the task is in progress
-        cache.set(f"whatsapp_task_active_{self.user_id}", True, timeout=900)  # Task is active for 15 minutes   
-
-        task_id = cache.get(f"task_{self.user_id}_id")
-
-        if not task_id:
-            return self.send_message("❌ No active task found. Please start a task first.")
-
-        # ✅ Retrieve task form description from cache
-        task_description = cache.get(f"task_description_{task_id}")
-
-        if not task_description:
-            return self.send_message("❌ Task form configuration is missing.")
-
-        try:
-            form_data = json.loads(task_description)  # Convert JSON string to dictionary
-        except json.JSONDecodeError as e:
-            print(f"❌ JSON Parsing Error: {e}")
-            return self.send_message("❌ Task form configuration is invalid.")
-
-        fields = form_data.get("fields", [])
+        task_id = self.task_id
+        fields = self.form.fields
         if not fields:
             return self.send_message("❌ No fields found in task form.")
 
         # ✅ Get the current step dynamically
-        current_step = self.get_current_step(task_id)
-        print(f"🔄 Processing Step(s): {current_step} for Task {task_id}")
+        current_step = self.get_current_step()
+        logger.debug("🔄 Processing Step(s): %s for Task %s", current_step, task_id)
 
         # ✅ Check if all fields are completed
         if current_step >= len(fields):
@@ -595,7 +524,7 @@ class WhatsAppTaskHandler:
 
         # ✅ Get the field for the current step
         current_field = fields[current_step]
-        print(f"🔍 Current Field: {current_field}")
+        logger.debug("🔍 Current Field: %s", current_field)
 
         # ✅ Prompt the user for input if they haven't provided it
         if "start task" not in self.message.lower():
@@ -606,11 +535,14 @@ class WhatsAppTaskHandler:
                 return validation_response  # ✅ Return error message if validation fails
             
         else:
-            return self.ask_next_step(current_field)
+            return self.save_progress() or self.ask_next_step(current_field)
 
 
         # ✅ Move to the next step **after validation**
         self.set_next_step(task_id, current_step + 1)
+        conflict_response = self.save_progress()
+        if conflict_response:
+            return conflict_response
 
         # ✅ If more fields remain, prompt for the next field
         if current_step + 1 < len(fields):
@@ -628,89 +560,69 @@ class WhatsAppTaskHandler:
         """
 
         # ✅ Extract field metadata
-        field_name = current_field.get("name")
-        field_label = current_field.get("label")
-        field_type = current_field.get("type")
-        is_required = current_field.get("required", False)
-        is_multiple = current_field.get("multiple", False)
-        check_existence = current_field.get("checkIfExisit", None)
+        field_name = current_field.name
+        field_label = current_field.label
 
         user_input = self.message.strip()
 
-        if field_type == "date":
-            if not re.match(r"^\d{4}-\d{2}-\d{2}$", user_input):
-                return self.send_message(f"❌ Invalid format! Please enter *{field_label}* in YYYY-MM-DD format.")
-
-        elif field_type == "decimal":
-            try:
-                float(user_input)
-            except ValueError:
-                return self.send_message(f"❌ Invalid input! Please enter a numeric value for *{field_label}*.")
-
-        elif field_type == "dropdown":
-            options = current_field.get("options", [])
-            if user_input.capitalize() not in options:
-                return self.send_message(f"❌ Invalid selection! Choose one of: {', '.join(options)} for *{field_label}*.")
-
-        elif field_type == "text" and is_required and not user_input:
-            return self.send_message(f"❌ {field_label} is required. Please enter a valid value.")
+        error_message = current_field.validate(user_input)
+        if error_message:
+            return self.send_message(error_message)
 
         # ✅ Check existence if applicable
-        if check_existence:
-            if not self.validate_existence(field_name, check_existence, user_input):
+        if current_field.existence:
+            if not self.validate_existence(current_field, user_input):
                 return self.send_message(f"❌ {field_label} does not exist. Please enter a valid value.")
 
+        # ✅ Media fields keep the uploaded file's URL rather than the message text
+        if current_field.type == "media" and self.media_url:
+            user_input = self.media_url
+
         # ✅ Handle multiple inputs (if enabled)
-        if is_multiple:
-            stored_values = cache.get(f"task_{self.user_id}_{task_id}_{field_name}", [])
-            stored_values.append(user_input)
-            cache.set(f"task_{self.user_id}_{task_id}_{field_name}", stored_values)
-            return self.send_message(f"✅ Added '{user_input}' for *{field_label}*. Type 'NEXT' to proceed or enter another value.")
+        if current_field.multiple:
+            self.session.fields.setdefault(field_name, []).append(user_input)
+            return self.save_progress() or self.send_message(f"✅ Added '{user_input}' for *{field_label}*. Type 'NEXT' to proceed or enter another value.")
 
         # ✅ Store user input for required fields
-        cache.set(f"task_{self.user_id}_{task_id}_{field_name}", user_input) 
+        self.session.fields[field_name] = user_input
 
         return None  # ✅ Validation passed, no error message needed
 
-    def get_current_step(self, task_id):
+    def get_current_step(self):
         """
-        Retrieves the current step for a given task from the cache.
-        If not found, initializes it at step 0.
+        Retrieves the current step of the active task from its conversation session (0 for a new one).
         """
-        step_key = f"whatsapp_step_{self.user_id}_{task_id}"
-        print(f"🔍 Checking for Step: {step_key}")  # ✅ Debugging print
-        current_step = cache.get(step_key) 
-        print(f"🔄 Current Step from Cache is: {current_step}")  # ✅ Debugging print
-        
-        # ✅ Handle invalid string values like "start_task"
-        if isinstance(current_step, str) and not current_step.isdigit():
-            print(f"⚠️ Invalid step value ('{current_step}') found. Resetting Task {task_id} to Step 0.")
-            self.set_next_step(task_id, 0)  # Reset step
-            return 0  # Reset to the first step if conversion fails
-
-        try:
-            step_int = int(current_step)
-            print(f"🔍 Current Step for Task {task_id}: {step_int}")  # ✅ Debugging print 
-            return step_int
-        except ValueError:
-            print(f"⚠️ Step conversion failed. Resetting Task {task_id} to Step 0.")
-            self.set_next_step(task_id, 0)  # Reset step
-            return 0  # Reset to the first step if conversion fails
+        current_step = self.session.step
+        if not isinstance(current_step, int) or current_step < 0:
+            logger.warning("⚠️ Invalid step value ('%s') found. Resetting Task %s to Step 0.", current_step, self.task_id)
+            self.session.step = current_step = 0
+        return current_step
 
     def set_next_step(self, task_id, next_step):
         """
-        Updates the current step for a given task in the cache.
+        Updates the current step of the active task; stored by save_progress().
         """
-        step_key = f"whatsapp_step_{self.user_id}_{task_id}"
-        cache.set(step_key, next_step, timeout=900)  # Keep task active for 15 minutes
-        print(f"✅ Step Updated: Task {task_id} -> Next Step: {next_step}")  # ✅ Debugging print
+        self.session.step = next_step
+        logger.debug("✅ Step Updated: Task %s -> Next Step: %s", task_id, next_step)
 
-         # ✅ Verify cache update
-        confirm_step = cache.get(step_key)
-        print(f"🔄 Step Confirmation from Cache: {confirm_step}")  # ✅ Ensure step is updated
-        if str(confirm_step) != str(next_step):
-            print(f"⚠️ Step update failed! Expected {next_step}, but got {confirm_step}. Retrying...")
-            cache.set(step_key, str(next_step), timeout=900)  # Retry cache update
+    def save_progress(self):
+        """
+        Stores the task's form progress and keeps the task active for this phone.
+
+        Returns a reply asking the user to resend when another message for the
+        same task was processed concurrently, otherwise None.
+        """
+        def keep_task_active(phone_session):
+            phone_session.data["active_task_id"] = self.task_id
+            touch_active_task(phone_session)
+
+        try:
+            save_session(self.session)
+            update_session(self.sender_phone, None, keep_task_active)
+        except StaleSessionError:
+            logger.warning("⚠️ Conversation for Task %s changed concurrently.", self.task_id)
+            return self.send_message("⚠️ Your previous message is still being processed. Please send that again.")
+        return None
 
 
     def ask_next_step(self, field):
@@ -718,10 +630,10 @@ class WhatsAppTaskHandler:
         Sends the next question to the user based on the step and field attributes.
         """
 
-        field_label = field["label"]
-        field_type = field["type"]
-        is_required = field.get("required", False)
-        is_multiple = field.get("multiple", False)
+        field_label = field.label
+        field_type = field.type
+        is_required = field.required
+        is_multiple = field.multiple
 
         question_text = f"🔹 *{field_label}*: "
 
@@ -732,7 +644,7 @@ class WhatsAppTaskHandler:
         elif field_type == "text":
             question_text += "✏️ Please enter a text value."
         elif field_type == "dropdown":
-            options = ", ".join(field.get("options", []))
+            options = ", ".join(field.options)
             question_text += f"📋 Choose one: {options}."
         elif field_type == "media":
             question_text = "📸 Upload an image/video or type 'SKIP' to continue."
@@ -748,31 +660,19 @@ class WhatsAppTaskHandler:
         return self.send_message(question_text)
 
 
-    def validate_existence(self, field_name, check_conditions, user_input):
+    def validate_existence(self, field, user_input):
         """
         Checks if a field exists in the database before allowing input.
-        Dynamically validates model records based on given criteria.
+        Dynamically validates model records based on the field's compiled existence check.
         """
-
-        model_name = check_conditions.get("model")
-        app_name = check_conditions.get("appName")
-        status = check_conditions.get("status", "active")  # Default to active status
-        search_field_template = check_conditions.get("search_field", "")
-
-        if not model_name or not app_name or not search_field_template:
-            print(f"⚠️ Missing validation details for {field_name}. Skipping existence check.")
-            return True  # ✅ Skip validation if details are incomplete
-
-        Model = apps.get_model(app_name, model_name)
-
-        # ✅ Replace wildcard (*) in field search template with actual user input
-        search_field = search_field_template.replace("*", user_input)
+        check = field.existence
+        Model = apps.get_model(check.app_name, check.model_name)
 
         # ✅ Perform database query
-        record_exists = Model.objects.filter(**{search_field: user_input, "status": status}).exists()
+        record_exists = Model.objects.filter(**check.lookup(user_input)).exists()
 
         if not record_exists:
-            print(f"❌ {field_name} validation failed. Value '{user_input}' does not exist in {model_name}.")
+            logger.warning("❌ %s validation failed. Value '%s' does not exist in %s.", field.name, user_input, check.model_name)
         return record_exists
 
     # ✅ Submit the task and call the dynamic function for processing
@@ -788,41 +688,35 @@ class WhatsAppTaskHandler:
                 return self.send_message("❌ Task not found. Please start a valid task.")
 
             # ✅ Retrieve all field values dynamically
-            task_description = cache.get(f"task_description_{task_id}")
-            form_data = json.loads(task_description) if task_description else {}
-            fields = form_data.get("fields", [])
+            fields = self.form.fields
 
             # ✅ Store collected data
             collected_data = {}
 
             for field in fields:
-                field_name = field.get("name")
-                is_multiple = field.get("multiple", False)
-                value = cache.get(f"task_{self.user_id}_{task_id}_{field_name}")
+                field_name = field.name
+                value = self.session.fields.get(field_name)
 
-                if is_multiple:
+                if field.multiple:
                     collected_data[field_name] = value if value else []
                 else:
                     collected_data[field_name] = value if value else ""
 
 
-            # ✅ Handle media field separately
-            media_url = cache.get(f"task_{self.user_id}_{task_id}_media", None)
-            if media_url:
-                print(f"📥 Downloading media from Twilio: {media_url}")
-                media_file_path = download_media_from_twilio(media_url)
-                if media_file_path:
-                    collected_data["media"] = media_file_path  # ✅ Store media file path
-                else:
-                    collected_data["media"] = None  # ✅ If media download failed
+            # ✅ Handle media field separately: downloaded in the background and attached to the task as Media
+            media_url = self.session.fields.get("media")
+            if media_url and str(media_url).lower() != "skip":
+                logger.debug("📥 Queueing media download from Twilio: %s", media_url)
+                download_media_from_twilio(media_url, task, self.user_id)
+                collected_data["media"] = media_url  # ✅ Store the source URL(s); the file arrives as Media
 
 
             # ✅ Validate required fields
-            missing_fields = [field["label"] for field in fields if field.get("required", False) and not collected_data.get(field["name"])]
+            missing_fields = [field.label for field in self.form.missing_fields(collected_data)]
             if missing_fields:
                 return self.send_message(f"❌ Some required fields are missing: {', '.join(missing_fields)}. Please complete all steps.")
 
-            print(f"📤 Task Data Ready for Processing: {collected_data}")
+            logger.debug("📤 Task Data Ready for Processing: %s", collected_data)
 
             # ✅ Call dynamic processing function: `{appName}.whatsapp.{ModelName}`
             try:
@@ -837,26 +731,25 @@ class WhatsAppTaskHandler:
                     process_function = getattr(module, function_name)
                     task_approved = process_function(task_id=task_id, processed_data=collected_data, user_id=self.user_id)
                     if task_approved:
-                        # ✅ Clear session-related caches after task submission
-                        cache.delete(f"whatsapp_step_{self.user_id}_{task_id}")  # ✅ Clear step tracking
-                        cache.delete(f"task_{self.user_id}_id")  # ✅ Clear active task ID
+                        # ✅ Clear the conversation session after task submission
+                        delete_session(self.sender_phone, task_id)  # ✅ Clear step tracking and collected fields
+                        clear_active_task(self.sender_phone)  # ✅ Clear active task ID
                         self.send_message("✅ You have  sucessefully completed Task...")
-                        #cache.delete(f"whatsapp_task_active_{self.user_id}")  # ✅ Clear active task flag
-                        print(f"✅ Successfully called dynamic function: {module_path}.{function_name}")
+                        logger.debug("✅ Successfully called dynamic function: %s.%s", module_path, function_name)
                         return Response({"message": "Task successfully submitted"}, status=200)
                 else:
-                    print(f"⚠️ Function {function_name} not found in {module_path}. Skipping dynamic processing.")
+                    logger.warning("⚠️ Function %s not found in %s. Skipping dynamic processing.", function_name, module_path)
                     self.send_message("❌ Task processing function is invalid!!")
                     return Response({"message": "Task processing function is invalid!!"}, status=500)
             except ModuleNotFoundError as e:
-                print(f"⚠️ Module not found: {e}. Skipping dynamic processing.")
+                logger.warning("⚠️ Module not found: %s. Skipping dynamic processing.", e)
                 self.send_message("❌ Unsucessful!!! Something went wrong while trying to submit task!")
                 return Response({"message": "Something went wrong!"}, status=500)
 
             # ✅ Inform user that submission is in progress
             
         except Exception as e:
-            print(f"❌ Error in submit_task: {e}")
+            logger.warning("❌ Error in submit_task: %s", e)
             return Response({"error": "Task submission failed"}, status=500)
 
         
@@ -889,7 +782,7 @@ class WhatsAppTaskHandler:
         current_step = cache.get(f"whatsapp_step_{self.user_id}_{self.task_id}", "start_task")
         
 
-        print(f"🔄 Processing Step: {current_step} for Task {self.task_id}")
+        logger.debug("🔄 Processing Step: %s for Task %s", current_step, self.task_id)
 
         if current_step == "start_task":
             cache.set(f"whatsapp_step_{self.user_id}_{self.task_id}", "end_date")
@@ -952,7 +845,7 @@ class WhatsAppTaskHandler:
         Also switches to a new task if the user specifies a different one.
         """
         match = re.search(r"task\s+(\d+)", self.message)
-        print(f"🔍 Extracted Task ID: {match.group(1)}" if match else "❌ No Task ID found.")
+        logger.debug("🔍 Extracted Task ID: %s", match.group(1) if match else None)
         if match:
             task_id = int(match.group(1))
             self.activate_task(task_id)
@@ -973,9 +866,8 @@ class WhatsAppTaskHandler:
         match = re.search(r"(?:start|switch to) task\s+(\d+)", self.message)
         if match:
             task_id = int(match.group(1))
-            print(f"🔄 Switching to Task {task_id}")
-            cache.set(f"task_{self.user_id}_id", task_id)  # Update active task
-            cache.set(f"whatsapp_step_{self.user_id}_{task_id}", 0)  # Ensure the new task starts fresh 
+            logger.debug("🔄 Switching to Task %s", task_id)
+            activate_task(self.sender_phone, task_id)  # Update active task; the new task starts fresh
             return task_id
         return None
 
@@ -1001,19 +893,10 @@ class WhatsAppTaskHandler:
         """
         Sends a WhatsApp message to the user.
         """
-        TWILIO_ACCOUNT_SID = config("TWILIO_ACCOUNT_SID")
-        TWILIO_AUTH_TOKEN = config("TWILIO_AUTH_TOKEN")
-        client = Client(TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN)
-        TWILIO_PHONE_NUMBER = config("TWILIO_SANDBOX_PHONE_NUMBER")
-
-        client.messages.create(
-            from_=f"whatsapp:{TWILIO_PHONE_NUMBER}",
-            to=f"whatsapp:{self.sender_phone}",
-            body=message_body
-        )
+        enqueue_message(self.sender_phone, message_body)
 
-        print(f"📤 Sent WhatsApp Message to {self.sender_phone}: {message_body}")
-        return Response({"message": "WhatsApp message sent"}, status=200)
+        logger.debug("📤 Queued WhatsApp Message to %s: %s", self.sender_phone, message_body)
+        return twiml_ack()
 
     def submit_tasks(self):
         """
@@ -1026,42 +909,22 @@ class WhatsAppTaskHandler:
             harvest_date = cache.get(f"task_{self.user_id}_{self.task_id}_harvest_date", "")
             media_url  = cache.get(f"task_{self.user_id}_{self.task_id}_media")
             
-            print(f"📤 Submitting Task Data: {end_date}, {harvest_weight}, {harvest_date}, {media_url }")
+            logger.debug("📤 Submitting Task Data: %s, %s, %s, %s", end_date, harvest_weight, harvest_date, media_url)
 
             # ✅ Validate if all required fields are collected before submission
             if not end_date or not harvest_weight or not harvest_date:
                 return self.send_message("❌ Some task fields are missing. Please complete all steps.")
 
-            # ✅ Try downloading media
-            media_file = None
-            if media_url:
-                print(f"📥 Downloading media from Twilio: {media_url}")
-                media_file = download_media_from_twilio(media_url)
-
-                if not media_file:
-                    print("⚠️ No media file was saved. Proceeding without media.")
-
             task = Task.objects.get(id=self.task_id)
             if not task:
                 return self.send_message("❌ Task not found. Please start a valid task.")
             
             userInstance = User.objects.get(id=self.user_id)
-            # Save media if provided
-
-            # ✅ Submit the task completion data
-
-            media_obj = Media.objects.create( 
-                    company=task.company,
-                    branch=task.branch,
-                    app_name=task.appName,
-                    model_name=task.modelName,
-                    file=media_file,  # Save downloaded file,
-                    status="active",
-                    model_id=task.id,
-                    uploaded_by=userInstance,
-                )
-            
-            print(f"📤 Media saved successfully: {media_obj.file.name}")
+
+            # ✅ Save media if provided; it is downloaded in the background and attached to the task
+            if media_url:
+                logger.debug("📥 Queueing media download from Twilio: %s", media_url)
+                download_media_from_twilio(media_url, task, userInstance.id)
 
          
 
@@ -1070,7 +933,7 @@ class WhatsAppTaskHandler:
             task.status = "pending"
             task.save()
 
-            print(f"📤 Task Submission Complete: {end_date}, {harvest_weight}, {harvest_date}, {media_url}")
+            logger.debug("📤 Task Submission Complete: %s, %s, %s, %s", end_date, harvest_weight, harvest_date, media_url)
 
 
              # ✅ Inform user that submission is in progress
@@ -1084,12 +947,12 @@ class WhatsAppTaskHandler:
             return Response({"message": "Task successfully submitted"}, status=200)
 
         except Exception as e:
-            print(f"❌ Error in submit_task: {e}")
+            logger.warning("❌ Error in submit_task: %s", e)
             return Response({"error": "Task submission failed"}, status=500)
 
     def handle_task_retrieval(user, message):
 
-        print(f"🔍 User: {user.id if hasattr(user, 'email') else 'Unknown User'}")
+        logger.debug("🔍 User: %s", user.id if hasattr(user, 'email') else 'Unknown User')
         """
         Retrieves a user's active tasks with filtering options (e.g., past, completed, pending).
         """
@@ -1141,8 +1004,8 @@ class WhatsAppTaskHandler:
         query_params["page_size"] = page_size
 
          # ✅ Print query parameters for debugging
-        print(f"🔍 Task Query Params: {query_params}")
-        print(f"🔍 User: {user.email if hasattr(user, 'email') else 'Unknown User'}")
+        logger.debug("🔍 Task Query Params: %s", query_params)
+        logger.debug("🔍 User: %s", user.email if hasattr(user, 'email') else 'Unknown User')
 
         # ✅ Fetch tasks using WhatsAppTaskFetcher
         tasks = WhatsAppTaskFetcher.get_filtered_tasks(user, query_params)
@@ -1182,56 +1045,32 @@ class WhatsAppUtils:
         """
         Sends a WhatsApp message to the user.
         """
-        TWILIO_ACCOUNT_SID = config("TWILIO_ACCOUNT_SID")
-        TWILIO_AUTH_TOKEN = config("TWILIO_AUTH_TOKEN")
-        client = Client(TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN)
-        TWILIO_PHONE_NUMBER = config("TWILIO_SANDBOX_PHONE_NUMBER")
-
-        client.messages.create(
-            from_=f"whatsapp:{TWILIO_PHONE_NUMBER}",
-            to=f"whatsapp:{sender_phone}",
-            body=message_body
-        )
+        enqueue_message(sender_phone, message_body)
 
-        print(f"📤 Sent WhatsApp Message to {sender_phone}: {message_body}")
-        return Response({"message": "WhatsApp message sent"}, status=200)
+        logger.debug("📤 Queued WhatsApp Message to %s: %s", sender_phone, message_body)
+        return twiml_ack()
     
-from urllib.parse import urlparse
-def download_media_from_twilio(media_url):
-    """
-    Downloads media from Twilio and saves it to local storage.
+def download_media_from_twilio(media_url, task, user_id):
     """
-    TWILIO_ACCOUNT_SID = settings.TWILIO_ACCOUNT_SID
-    TWILIO_AUTH_TOKEN = settings.TWILIO_AUTH_TOKEN
-
-    try:
-        # ✅ Extract filename from Twilio URL
-        parsed_url = urlparse(media_url)
-        file_name = os.path.basename(parsed_url.path)  # Extracts only 'MExxxxx'
-
-        # ✅ Ensure file has a valid extension
-        file_extension = file_name.split('.')[-1] if '.' in file_name else 'jpg'  # Default to jpg
-        file_name = f"twilio_media_{int(time.time())}.{file_extension}"
-        file_path = os.path.join(settings.MEDIA_ROOT, file_name)
-
-        # ✅ Download media from Twilio
-        response = requests.get(media_url, auth=(TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN), stream=True)
+    Queue Twilio media (one URL or a list) for download and attach each file to the task as Media.
 
-        if response.status_code == 200:
-            with open(file_path, 'wb') as f:
-                for chunk in response.iter_content(1024):
-                    f.write(chunk)
-
-            print(f"✅ Media downloaded and saved at {file_path}")
-            return file_path  # Return saved file path
-
-        else:
-            print(f"❌ Failed to download media from Twilio: {response.status_code}")
-            return None
-
-    except Exception as e:
-        print(f"❌ Error downloading media: {e}")
-        return None
+    Returns the futures of the background downloads.
+    """
+    media_urls = media_url if isinstance(media_url, (list, tuple)) else [media_url]
+    return [
+        enqueue_remote_media(
+            url,
+            auth=twilio_auth(),
+            company_id=task.company_id,
+            branch_id=task.branch_id,
+            app_name=task.appName,
+            model_name=task.modelName,
+            model_id=task.id,
+            status="active",
+            uploaded_by_id=user_id,
+        )
+        for url in media_urls if url
+    ]
 
 
 class WhatsAppTaskFetcher:
@@ -1258,28 +1097,13 @@ class WhatsAppTaskFetcher:
 
         queryset = Task.objects.filter(assigned_to=user)
         # Get all late tasks where the user is an assistant
-        late_tasks = Task.objects.filter(
-            due_date__lt=now() - timedelta(days=1),
-            status="active",
-            assistant=user
-        )
-        queryset = queryset | late_tasks
+        queryset = queryset | Task.objects.filter(late_assistant_tasks_filter(user))
 
         # Get all tasks delayed by more than 2 days where the user is a staff member of the company branch
-        delayed_tasks = Task.objects.filter(
-            due_date__lt=now() - timedelta(days=2),
-            status="active",
-        )
-
-        for task in delayed_tasks:
-            appName = task.appName
-            # Check if the user is an active staff member of the branch
-            StaffMemberModel = apps.get_model(appName, 'StaffMember')
-            if StaffMemberModel.objects.filter(user=user, status="active", company=task.company, branch=task.branch).exists():
-                queryset = queryset | delayed_tasks
+        queryset = queryset | Task.objects.filter(delayed_tasks_filter(user, match_branch=True))
 
-        print(f"🔍 User Before filters: {user.email if hasattr(user, 'email') else 'Unknown User'}")
-        print(filters)
+        logger.debug("🔍 User Before filters: %s", user.email if hasattr(user, 'email') else 'Unknown User')
+        logger.debug("%s", filters)
 
         # ✅ Extract query parameters
         role_param = filters.get("role")
@@ -1301,7 +1125,7 @@ class WhatsAppTaskFetcher:
 
         # ✅ Filter by task type
         if task_type == "assistant":
-            print("🔍 Fetching assistant tasks")
+            logger.debug("🔍 Fetching assistant tasks")
             queryset = queryset.filter(assistant=user)
         elif task_type == "completed":
             queryset = queryset.filter(status="completed", completed_by=user)
@@ -1355,23 +1179,7 @@ class WhatsAppTaskFetcher:
         """
         Annotate each task with its associated activity.
         """
-        tasks_with_activity = []
-        for task in queryset:
-            associated_activity = ActivityOwner.objects.filter(
-                branch=task.branch,
-                activity=task.activity,
-                appName=task.appName,
-                modelName=task.modelName,
-                company=task.company,
-            ).first()
-            task_data = TaskSerializer(task).data  # Serialize task data
-            if associated_activity:
-                task_data["associated_activity"] = ActivityOwnerSerializer(associated_activity).data
-            else:
-                task_data["associated_activity"] = None
-            tasks_with_activity.append(task_data)
-
-        return tasks_with_activity
+        return serialize_tasks_with_activity(queryset)
 
 
 
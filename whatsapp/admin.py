@@ -1,3 +1,18 @@
 from django.contrib import admin
+from .models import OutboundMessage
 
-# Register your models here.
+
+@admin.register(OutboundMessage)
+class OutboundMessageAdmin(admin.ModelAdmin):
+    list_display = ('id', 'to', 'status', 'attempts', 'next_attempt_at', 'created_at', 'sent_at')
+    search_fields = ('to', 'body', 'provider_sid')
+    list_filter = ('status',)
+    readonly_fields = ('attempts', 'last_error', 'provider_sid', 'created_at', 'sent_at')
+
+
+from .models import ConversationSession
+@admin.register(ConversationSession)
+class ConversationSessionAdmin(admin.ModelAdmin):
+    list_display = ('id', 'phone', 'task_key', 'version', 'expires_at', 'updated_at')
+    search_fields = ('phone',)
+    readonly_fields = ('version', 'updated_at')
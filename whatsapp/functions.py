@@ -4,6 +4,10 @@
 
 import re
 from django.core.cache import cache
+import logging
+
+logger = logging.getLogger(__name__)
+
 def extract_task_id(self):
         
         task_id = None
@@ -16,7 +20,7 @@ def extract_task_id(self):
         Also switches to a new task if the user specifies a different one.
         """
         match = re.search(r"task\s+(\d+)", self.message)
-        print(f"🔍 Extracted Task ID: {match.group(1)}" if match else "❌ No Task ID found.")
+        logger.debug("🔍 Extracted Task ID: %s", match.group(1) if match else None)
         if match:
             task_id = int(match.group(1))
             self.activate_task(self, task_id)
@@ -5,13 +5,17 @@ from datetime import datetime
 from django.core.cache import cache
 from django.db.models import Q
 from rest_framework.response import Response
-from twilio.rest import Client
 from django.apps import apps
 from decouple import config
 
 from company.models import Task
+from company.task_forms import InvalidFormSchema, get_task_form
 
 from .functions import extract_task_id
+from .outbox import enqueue_message, twiml_ack
+import logging
+
+logger = logging.getLogger(__name__)
 
 
 
@@ -50,7 +54,7 @@ class WhatsAppTaskHandler:
         else:
             self.task_id = None  # No valid task ID found
 
-        print(f"🔍 Final Active Task ID: {self.task_id}")  # ✅ Debug print
+        logger.debug("🔍 Final Active Task ID: %s", self.task_id)
 
         # ✅ Retrieve active task ID
         self.task_id = cache.get(f"task_{self.user_id}_id")
@@ -62,10 +66,10 @@ class WhatsAppTaskHandler:
             self.send_message("❌ Task not found. Please start with 'Start Task <TaskID>'.")
             return
 
-        # ✅ Parse form schema from task description
+        # ✅ Compiled form schema of the task (parsed once per description, then cached)
         try:
-            self.form_schema = json.loads(self.task.description)
-        except json.JSONDecodeError:
+            self.form = get_task_form(self.task)
+        except InvalidFormSchema:
             self.send_message("❌ Task form configuration is invalid.")
             return
 
@@ -75,37 +79,35 @@ class WhatsAppTaskHandler:
         """
 
         current_step = cache.get(f"whatsapp_step_{self.user_id}_{self.task_id}", 0)  # Track current field index
-        fields = self.form_schema.get("fields", [])
+        fields = self.form.fields
 
         if current_step >= len(fields):
             return self.submit_task()
 
         field = fields[current_step]  # Get the current field
-        field_name = field["name"]
-        field_type = field["type"]
-        required = field.get("required", False)
-        multiple = field.get("multiple", False)
-        check_existence = field.get("checkIfExisit", None)
+        field_name = field.name
+        field_type = field.type
+        multiple = field.multiple
 
         # ✅ Process user input based on field type
         if field_type == "text":
             if not self.message:
-                return self.send_message(f"❌ Please enter a valid {field['label']}.")
+                return self.send_message(f"❌ Please enter a valid {field.label}.")
 
-            if check_existence:
-                if not self.validate_existence(field_name, check_existence):
-                    return self.send_message(f"❌ {field['label']} does not exist. Please enter a valid name.")
+            if field.existence:
+                if not self.validate_existence(field):
+                    return self.send_message(f"❌ {field.label} does not exist. Please enter a valid name.")
 
             stored_values = cache.get(f"task_{self.user_id}_{self.task_id}_{field_name}", [])
             stored_values.append(self.message)
             cache.set(f"task_{self.user_id}_{self.task_id}_{field_name}", stored_values)
 
             if multiple:
-                return self.send_message(f"✅ {field['label']} saved. Enter another or type 'done' to continue.")
+                return self.send_message(f"✅ {field.label} saved. Enter another or type 'done' to continue.")
 
         elif field_type == "dropdown":
-            if self.message not in field["options"]:
-                return self.send_message(f"❌ Invalid selection. Choose: {', '.join(field['options'])}.")
+            if self.message not in field.options:
+                return self.send_message(f"❌ Invalid selection. Choose: {', '.join(field.options)}.")
 
             cache.set(f"task_{self.user_id}_{self.task_id}_{field_name}", self.message)
 
@@ -122,32 +124,27 @@ class WhatsAppTaskHandler:
         cache.set(f"whatsapp_step_{self.user_id}_{self.task_id}", current_step + 1)
         return self.ask_next_step()
 
-    def validate_existence(self, field_name, check_conditions):
+    def validate_existence(self, field):
         """
         Checks if a field exists in the database before allowing input.
         """
-        model_name = check_conditions.get("model")
-        app_name = check_conditions.get("appName")
-        status = check_conditions.get("status")
-        search_field = check_conditions.get("pondName", "").replace("*", self.message)
-
-        Model = apps.get_model(app_name, model_name)
+        Model = apps.get_model(field.existence.app_name, field.existence.model_name)
 
         # ✅ Query database
-        return Model.objects.filter(**{search_field: self.message, "status": status}).exists()
+        return Model.objects.filter(**field.existence.lookup(self.message)).exists()
 
     def ask_next_step(self):
         """
         Sends the next question to the user.
         """
         current_step = cache.get(f"whatsapp_step_{self.user_id}_{self.task_id}", 0)
-        fields = self.form_schema.get("fields", [])
+        fields = self.form.fields
 
         if current_step >= len(fields):
             return self.submit_task()
 
         field = fields[current_step]
-        return self.send_message(f"📋 {field['label']}:")
+        return self.send_message(f"📋 {field.label}:")
 
     def submit_task(self):
         """
@@ -155,11 +152,11 @@ class WhatsAppTaskHandler:
         """
         form_data = {}
 
-        for field in self.form_schema.get("fields", []):
-            field_name = field["name"]
+        for field in self.form.fields:
+            field_name = field.name
             form_data[field_name] = cache.get(f"task_{self.user_id}_{self.task_id}_{field_name}", "")
 
-        print(f"📤 Submitting Task Data: {form_data}")
+        logger.debug("📤 Submitting Task Data: %s", form_data)
 
         self.send_message("✅ Task submitted successfully! Sending for approval.")
 
@@ -173,15 +170,7 @@ class WhatsAppTaskHandler:
         """
         Sends a WhatsApp message to the user.
         """
-        TWILIO_ACCOUNT_SID = config("TWILIO_ACCOUNT_SID")
-        TWILIO_AUTH_TOKEN = config("TWILIO_AUTH_TOKEN")
-        client = Client(TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN)
-
-        client.messages.create(
-            from_="whatsapp:+14155238886",
-            to=f"whatsapp:{self.sender_phone}",
-            body=message_body
-        )
-
-        print(f"📤 Sent WhatsApp Message to {self.sender_phone}: {message_body}")
-        return Response({"message": "WhatsApp message sent"}, status=200)
+        enqueue_message(self.sender_phone, message_body)
+
+        logger.debug("📤 Queued WhatsApp Message to %s: %s", self.sender_phone, message_body)
+        return twiml_ack()
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from whatsapp import sessions
+
+
+class Command(BaseCommand):
+    help = "Delete expired WhatsApp conversation sessions from the configured session backend."
+
+    def handle(self, *args, **options):
+        removed = sessions.get_backend().purge_expired()
+        self.stdout.write(self.style.SUCCESS(f"Removed {removed} expired conversation session(s)."))
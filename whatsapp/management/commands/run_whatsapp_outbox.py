@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+import time
+
+from whatsapp import outbox
+
+
+class Command(BaseCommand):
+    help = (
+        "Deliver queued WhatsApp messages. Runs until stopped, reusing one provider "
+        "session; use with WHATSAPP_OUTBOX_DISPATCH = 'worker'."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Drain the queue once and exit.")
+        parser.add_argument("--poll-interval", type=float, default=1.0, help="Seconds to wait when the queue is empty.")
+
+    def handle(self, *args, **options):
+        while True:
+            results = outbox.drain()
+            if any(results.values()):
+                self.stdout.write(
+                    f"Sent {results['sent']}, retrying {results['pending']}, failed {results['failed']} message(s)."
+                )
+            if options["once"]:
+                break
+            if not any(results.values()):
+                time.sleep(options["poll_interval"])
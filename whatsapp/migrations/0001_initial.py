@@ -0,0 +1,36 @@
+# Generated by Django 5.1.3 on 2026-10-16 22:05
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboundMessage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('to', models.CharField(help_text="Recipient phone number without the 'whatsapp:' prefix.", max_length=32)),
+                ('from_number', models.CharField(help_text="Sender phone number without the 'whatsapp:' prefix.", max_length=32)),
+                ('body', models.TextField(blank=True)),
+                ('media_url', models.URLField(blank=True, max_length=500, null=True)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('sending', 'Sending'), ('sent', 'Sent'), ('failed', 'Failed')], default='pending', max_length=10)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('last_error', models.TextField(blank=True, null=True)),
+                ('provider_sid', models.CharField(blank=True, help_text='Message SID returned by the provider.', max_length=64, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('sent_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['status', 'next_attempt_at'], name='whatsapp_ou_status_41704e_idx'), models.Index(fields=['to', 'status'], name='whatsapp_ou_to_658f34_idx')],
+            },
+        ),
+    ]
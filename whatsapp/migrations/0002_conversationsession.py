@@ -0,0 +1,29 @@
+# Generated by Django 5.1.3 on 2026-10-16 22:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('whatsapp', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ConversationSession',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('phone', models.CharField(max_length=32)),
+                ('task_key', models.PositiveIntegerField(default=0, help_text='Task id, or 0 for phone-level state.')),
+                ('state', models.JSONField(blank=True, default=dict)),
+                ('version', models.PositiveIntegerField(default=1)),
+                ('expires_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['expires_at'], name='whatsapp_co_expires_149b54_idx')],
+                'constraints': [models.UniqueConstraint(fields=('phone', 'task_key'), name='unique_conversation_session_per_phone_task')],
+            },
+        ),
+    ]
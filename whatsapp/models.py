@@ -1,3 +1,65 @@
 from django.db import models
+from django.utils.timezone import now
 
-# Create your models here.
+
+class OutboundMessage(models.Model):
+    """
+    WhatsApp message waiting to be delivered by the outbox worker.
+
+    Webhook handlers only insert rows here; whatsapp.outbox sends them in
+    order per recipient, with retries and a global rate limit.
+    """
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('sending', 'Sending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    ]
+
+    to = models.CharField(max_length=32, help_text="Recipient phone number without the 'whatsapp:' prefix.")
+    from_number = models.CharField(max_length=32, help_text="Sender phone number without the 'whatsapp:' prefix.")
+    body = models.TextField(blank=True)
+    media_url = models.URLField(max_length=500, blank=True, null=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=now)
+    last_error = models.TextField(blank=True, null=True)
+    provider_sid = models.CharField(max_length=64, blank=True, null=True, help_text="Message SID returned by the provider.")
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=["status", "next_attempt_at"]),  # Due messages
+            models.Index(fields=["to", "status"]),  # Per-recipient ordering
+        ]
+
+    def __str__(self):
+        return f"To {self.to} ({self.status}): {self.body[:40]}"
+
+
+class ConversationSession(models.Model):
+    """
+    Stored WhatsApp conversation state for one phone and task (task_key 0 holds phone-level state).
+
+    Written only through whatsapp.sessions, which bumps `version` on every save
+    so concurrent webhooks can't overwrite each other's progress.
+    """
+    phone = models.CharField(max_length=32)
+    task_key = models.PositiveIntegerField(default=0, help_text="Task id, or 0 for phone-level state.")
+    state = models.JSONField(default=dict, blank=True)
+    version = models.PositiveIntegerField(default=1)
+    expires_at = models.DateTimeField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['phone', 'task_key'], name='unique_conversation_session_per_phone_task'),
+        ]
+        indexes = [
+            models.Index(fields=["expires_at"]),  # Expired session cleanup
+        ]
+
+    def __str__(self):
+        return f"{self.phone} / task {self.task_key or '-'} (v{self.version})"
@@ -0,0 +1,203 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections, transaction
+from django.db.models import F, Min
+from django.http import HttpResponse
+from django.utils import timezone
+from django.utils.module_loading import import_string
+import logging
+import threading
+import time
+
+from .models import OutboundMessage
+from .transports import TransportError
+
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = getattr(settings, "WHATSAPP_SEND_MAX_ATTEMPTS", 5)
+RETRY_BACKOFF_SECONDS = getattr(settings, "WHATSAPP_SEND_RETRY_BACKOFF", 2)
+RATE_LIMIT_PER_SECOND = getattr(settings, "WHATSAPP_SEND_RATE_LIMIT", 10)
+SENDING_LEASE_SECONDS = getattr(settings, "WHATSAPP_SENDING_LEASE", 60)
+BATCH_SIZE = getattr(settings, "WHATSAPP_SEND_BATCH_SIZE", 50)
+# "thread": drain the outbox from a background thread of the web process after
+# each commit. "worker": leave it to `manage.py run_whatsapp_outbox` processes.
+DISPATCH = getattr(settings, "WHATSAPP_OUTBOX_DISPATCH", "thread")
+
+_transport = None
+_transport_lock = threading.Lock()
+_executor = None
+_executor_lock = threading.Lock()
+_drain_pending = threading.Event()
+
+
+def get_transport():
+    """
+    Process-wide transport built from WHATSAPP_TRANSPORT, so every send reuses one HTTP session.
+    """
+    global _transport
+    with _transport_lock:
+        if _transport is None:
+            _transport = import_string(getattr(settings, "WHATSAPP_TRANSPORT", "whatsapp.transports.TwilioTransport"))()
+    return _transport
+
+
+def set_transport(transport):
+    """
+    Replace the process-wide transport, e.g. with a FakeTransport in tests.
+    """
+    global _transport
+    with _transport_lock:
+        _transport = transport
+
+
+def normalize_number(number):
+    return (number or "").replace("whatsapp:", "").strip()
+
+
+def enqueue_message(to, body, media_url=None, from_number=None):
+    """
+    Queue a WhatsApp message. Returns immediately; delivery happens after the current transaction commits.
+    """
+    message = OutboundMessage.objects.create(
+        to=normalize_number(to),
+        from_number=normalize_number(from_number or settings.TWILIO_WHATSAPP_NUMBER),
+        body=body,
+        media_url=media_url,
+    )
+    if DISPATCH == "thread":
+        transaction.on_commit(wake_dispatcher)
+    return message
+
+
+def twiml_ack():
+    """
+    Empty TwiML reply that lets Twilio close the webhook request right away.
+    """
+    return HttpResponse('<?xml version="1.0" encoding="UTF-8"?><Response></Response>', content_type="text/xml")
+
+
+def wake_dispatcher():
+    """
+    Schedule a drain on the background dispatcher thread; wake-ups that arrive during a drain coalesce.
+    """
+    global _executor
+    if _drain_pending.is_set():
+        return
+    _drain_pending.set()
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="whatsapp-outbox")
+    _executor.submit(_run_dispatcher)
+
+
+def _run_dispatcher():
+    _drain_pending.clear()
+    try:
+        drain()
+        retry_at = OutboundMessage.objects.filter(status="pending").aggregate(first=Min("next_attempt_at"))["first"]
+        if retry_at:
+            # At least a second, so messages blocked behind another worker's send don't spin.
+            timer = threading.Timer(max((retry_at - timezone.now()).total_seconds(), 1), wake_dispatcher)
+            timer.daemon = True
+            timer.start()
+    except Exception:
+        logger.exception("WhatsApp outbox dispatcher crashed")
+    finally:
+        close_old_connections()
+
+
+def acquire_send_slot():
+    """
+    Block until the global per-second send budget, shared through the cache by every worker, has room.
+    """
+    while True:
+        second = int(time.time())
+        key = f"whatsapp_outbox_rate_{second}"
+        cache.add(key, 0, timeout=5)
+        try:
+            used = cache.incr(key)
+        except ValueError:
+            # Key expired between add and incr; retry within the next second.
+            continue
+        if used <= RATE_LIMIT_PER_SECOND:
+            return
+        time.sleep(max(second + 1 - time.time(), 0.01))
+
+
+def release_expired_leases():
+    """
+    Return messages whose worker died mid-send to the queue.
+    """
+    return OutboundMessage.objects.filter(status="sending", next_attempt_at__lte=timezone.now()).update(status="pending")
+
+
+def claim_batch(limit=BATCH_SIZE):
+    """
+    Claim due messages that are first in line for their recipient.
+
+    A recipient's later messages wait until its earliest unsent message is
+    sent or has permanently failed, which keeps conversations in order even
+    across retries. Rows are claimed with a conditional UPDATE that also sets
+    a lease, so concurrent workers never send the same message.
+    """
+    current_time = timezone.now()
+    due = list(
+        OutboundMessage.objects.filter(status="pending", next_attempt_at__lte=current_time)
+        .order_by("id").values_list("id", "to")[: limit * 4]
+    )
+    if not due:
+        return []
+    heads = dict(
+        OutboundMessage.objects.filter(to__in={to for _, to in due}, status__in=["pending", "sending"])
+        .values("to").annotate(first=Min("id")).values_list("to", "first")
+    )
+    eligible = [message_id for message_id, to in due if heads.get(to) == message_id][:limit]
+
+    lease = current_time + timedelta(seconds=SENDING_LEASE_SECONDS)
+    claimed = []
+    for message_id in eligible:
+        if OutboundMessage.objects.filter(pk=message_id, status="pending").update(
+            status="sending", attempts=F("attempts") + 1, next_attempt_at=lease
+        ):
+            claimed.append(message_id)
+    return list(OutboundMessage.objects.filter(pk__in=claimed).order_by("id"))
+
+
+def deliver(message, transport=None):
+    """
+    Send one claimed message and record the outcome. Returns the final status.
+    """
+    transport = transport or get_transport()
+    acquire_send_slot()
+    try:
+        sid = transport.send(message.to, message.from_number, message.body, message.media_url)
+    except TransportError as exc:
+        if exc.retryable and message.attempts < MAX_ATTEMPTS:
+            delay = RETRY_BACKOFF_SECONDS * (2 ** (message.attempts - 1))
+            status, next_attempt_at = "pending", timezone.now() + timedelta(seconds=delay)
+        else:
+            status, next_attempt_at = "failed", timezone.now()
+        logger.warning("WhatsApp message %s to %s failed (attempt %s): %s", message.pk, message.to, message.attempts, exc)
+        OutboundMessage.objects.filter(pk=message.pk).update(status=status, next_attempt_at=next_attempt_at, last_error=str(exc))
+        return status
+
+    OutboundMessage.objects.filter(pk=message.pk).update(status="sent", sent_at=timezone.now(), provider_sid=sid, last_error=None)
+    return "sent"
+
+
+def drain(max_messages=None, transport=None):
+    """
+    Send due messages until the queue has nothing eligible. Returns a count per final status.
+    """
+    results = {"sent": 0, "pending": 0, "failed": 0}
+    release_expired_leases()
+    while max_messages is None or sum(results.values()) < max_messages:
+        batch = claim_batch(BATCH_SIZE if max_messages is None else min(BATCH_SIZE, max_messages - sum(results.values())))
+        if not batch:
+            break
+        for message in batch:
+            results[deliver(message, transport)] += 1
+    return results
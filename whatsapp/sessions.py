@@ -0,0 +1,285 @@
+from datetime import timedelta
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+import copy
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+
+
+logger = logging.getLogger(__name__)
+
+SESSION_TTL_SECONDS = getattr(settings, "WHATSAPP_SESSION_TTL", 24 * 60 * 60)
+# Seconds a started task keeps routing free-text messages to the task form.
+TASK_ACTIVE_SECONDS = getattr(settings, "WHATSAPP_TASK_ACTIVE_SECONDS", 15 * 60)
+
+
+class StaleSessionError(Exception):
+    """
+    The session was saved by another request since it was loaded.
+    """
+
+
+class ConversationSession:
+    """
+    Conversation state of one phone number for one task (task_id None for phone-level state).
+
+    `step` is the index of the form field being asked, `fields` the values
+    collected so far and `data` any other per-conversation values.
+    """
+
+    def __init__(self, phone, task_id=None, step=0, fields=None, data=None, version=0):
+        self.phone = phone
+        self.task_id = task_id
+        self.step = step
+        self.fields = fields if fields is not None else {}
+        self.data = data if data is not None else {}
+        self.version = version
+
+    @property
+    def is_new(self):
+        return self.version == 0
+
+    def to_state(self):
+        return {"step": self.step, "fields": self.fields, "data": self.data}
+
+    @classmethod
+    def from_state(cls, phone, task_id, state, version):
+        return cls(phone, task_id, state.get("step", 0), state.get("fields", {}), state.get("data", {}), version)
+
+    def __repr__(self):
+        return f"<ConversationSession {self.phone} task={self.task_id} step={self.step} v{self.version}>"
+
+
+class DatabaseBackend:
+    """
+    Sessions in the whatsapp.ConversationSession table; one SELECT to load, one conditional UPDATE to save.
+    """
+
+    def load(self, phone, task_key):
+        from .models import ConversationSession as SessionRow
+
+        row = SessionRow.objects.filter(phone=phone, task_key=task_key, expires_at__gt=timezone.now()).values_list(
+            "state", "version"
+        ).first()
+        return row
+
+    def save(self, phone, task_key, state, version, expires_at):
+        from .models import ConversationSession as SessionRow
+
+        if version:
+            updated = SessionRow.objects.filter(phone=phone, task_key=task_key, version=version).update(
+                state=state, version=version + 1, expires_at=expires_at, updated_at=timezone.now()
+            )
+            if not updated:
+                raise StaleSessionError(f"Conversation {phone}/{task_key} changed since version {version}")
+            return version + 1
+
+        # A new session may replace an expired row, but never a live one.
+        try:
+            with transaction.atomic():
+                SessionRow.objects.filter(phone=phone, task_key=task_key, expires_at__lte=timezone.now()).delete()
+                SessionRow.objects.create(phone=phone, task_key=task_key, state=state, version=1, expires_at=expires_at)
+        except IntegrityError:
+            raise StaleSessionError(f"Conversation {phone}/{task_key} was started by another request")
+        return 1
+
+    def delete(self, phone, task_key):
+        from .models import ConversationSession as SessionRow
+
+        SessionRow.objects.filter(phone=phone, task_key=task_key).delete()
+
+    def purge_expired(self):
+        from .models import ConversationSession as SessionRow
+
+        return SessionRow.objects.filter(expires_at__lte=timezone.now()).delete()[0]
+
+
+class LocalBackend:
+    """
+    In-process key-value stand-in for tests and single-process development servers.
+    """
+
+    def __init__(self):
+        self._items = {}
+        self._lock = threading.Lock()
+
+    def load(self, phone, task_key):
+        with self._lock:
+            item = self._items.get((phone, task_key))
+            if not item or item[2] <= timezone.now():
+                return None
+            return copy.deepcopy(item[0]), item[1]
+
+    def save(self, phone, task_key, state, version, expires_at):
+        with self._lock:
+            item = self._items.get((phone, task_key))
+            current = item[1] if item and item[2] > timezone.now() else 0
+            if current != version:
+                raise StaleSessionError(f"Conversation {phone}/{task_key} changed since version {version}")
+            self._items[(phone, task_key)] = (copy.deepcopy(state), version + 1, expires_at)
+            return version + 1
+
+    def delete(self, phone, task_key):
+        with self._lock:
+            self._items.pop((phone, task_key), None)
+
+    def purge_expired(self):
+        with self._lock:
+            expired = [key for key, item in self._items.items() if item[2] <= timezone.now()]
+            for key in expired:
+                del self._items[key]
+            return len(expired)
+
+
+class FileBackend:
+    """
+    One JSON file per session under WHATSAPP_SESSION_DIR, shared by every process on the host.
+
+    Saves hold an exclusive lock on a sidecar lock file, check the version and
+    replace the file atomically.
+    """
+
+    def __init__(self, directory=None):
+        self.directory = directory or getattr(
+            settings, "WHATSAPP_SESSION_DIR", os.path.join(settings.BASE_DIR, "var", "whatsapp_sessions")
+        )
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _path(self, phone, task_key):
+        digest = hashlib.sha1(f"{phone}:{task_key}".encode()).hexdigest()
+        return os.path.join(self.directory, f"{digest}.json")
+
+    def _read(self, path):
+        try:
+            with open(path) as handle:
+                item = json.load(handle)
+        except (FileNotFoundError, ValueError):
+            return None
+        if item["expires_at"] <= timezone.now().timestamp():
+            return None
+        return item
+
+    def load(self, phone, task_key):
+        item = self._read(self._path(phone, task_key))
+        return (item["state"], item["version"]) if item else None
+
+    def save(self, phone, task_key, state, version, expires_at):
+        import fcntl
+
+        path = self._path(phone, task_key)
+        with open(f"{path}.lock", "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            item = self._read(path)
+            if (item["version"] if item else 0) != version:
+                raise StaleSessionError(f"Conversation {phone}/{task_key} changed since version {version}")
+            with tempfile.NamedTemporaryFile("w", dir=self.directory, delete=False) as tmp:
+                json.dump({"state": state, "version": version + 1, "expires_at": expires_at.timestamp()}, tmp)
+            os.replace(tmp.name, path)
+        return version + 1
+
+    def delete(self, phone, task_key):
+        try:
+            os.remove(self._path(phone, task_key))
+        except FileNotFoundError:
+            pass
+
+    def purge_expired(self):
+        removed = 0
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if name.endswith(".json") and self._read(path) is None:
+                os.remove(path)
+                removed += 1
+        return removed
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    """
+    Process-wide session backend built from WHATSAPP_SESSION_BACKEND.
+    """
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = import_string(getattr(settings, "WHATSAPP_SESSION_BACKEND", "whatsapp.sessions.DatabaseBackend"))()
+    return _backend
+
+
+def load_session(phone, task_id=None):
+    """
+    Load a conversation in one round-trip; returns an empty session if none is stored or it expired.
+    """
+    row = get_backend().load(phone, task_id or 0)
+    if row is None:
+        return ConversationSession(phone, task_id)
+    state, version = row
+    return ConversationSession.from_state(phone, task_id, state, version)
+
+
+def save_session(session, ttl=None):
+    """
+    Store a session if nobody saved it since it was loaded; raises StaleSessionError otherwise.
+    """
+    expires_at = timezone.now() + timedelta(seconds=ttl or SESSION_TTL_SECONDS)
+    session.version = get_backend().save(session.phone, session.task_id or 0, session.to_state(), session.version, expires_at)
+    return session
+
+
+def delete_session(phone, task_id=None):
+    get_backend().delete(phone, task_id or 0)
+
+
+def update_session(phone, task_id, mutate, retries=3, ttl=None):
+    """
+    Load, apply `mutate(session)` and save, reloading and reapplying on concurrent updates.
+    """
+    for attempt in range(retries):
+        session = load_session(phone, task_id)
+        mutate(session)
+        try:
+            return save_session(session, ttl=ttl)
+        except StaleSessionError:
+            logger.debug("Conversation %s/%s changed concurrently (attempt %s)", phone, task_id, attempt + 1)
+    raise StaleSessionError(f"Conversation {phone}/{task_id} kept changing; gave up after {retries} attempts")
+
+
+def activate_task(phone, task_id):
+    """
+    Make a task the phone's active one and start its form from the first field.
+    """
+    delete_session(phone, task_id)
+
+    def mutate(session):
+        session.data["active_task_id"] = task_id
+        session.data["active_until"] = (timezone.now() + timedelta(seconds=TASK_ACTIVE_SECONDS)).timestamp()
+
+    return update_session(phone, None, mutate)
+
+
+def touch_active_task(session):
+    """
+    Extend the window in which free-text messages go to the active task (phone-level session).
+    """
+    session.data["active_until"] = (timezone.now() + timedelta(seconds=TASK_ACTIVE_SECONDS)).timestamp()
+
+
+def clear_active_task(phone):
+    def mutate(session):
+        session.data.pop("active_task_id", None)
+        session.data.pop("active_until", None)
+
+    return update_session(phone, None, mutate)
+
+
+def has_active_task(phone):
+    session = load_session(phone)
+    return bool(session.data.get("active_task_id")) and session.data.get("active_until", 0) > timezone.now().timestamp()
@@ -1,3 +1,92 @@
+from datetime import timedelta
 from django.test import TestCase
+from django.utils import timezone
+from unittest import mock
+import tempfile
 
-# Create your tests here.
+from whatsapp import sessions
+
+
+PHONE = "+15550001111"
+
+
+class SessionBackendTests:
+    """
+    Optimistic versioning shared by every session backend; subclasses provide make_backend().
+    """
+
+    def setUp(self):
+        self.backend = self.make_backend()
+        patcher = mock.patch.object(sessions, "_backend", self.backend)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def expires(self, seconds=3600):
+        return timezone.now() + timedelta(seconds=seconds)
+
+    def test_save_bumps_version(self):
+        self.assertEqual(self.backend.save(PHONE, 0, {"step": 1}, 0, self.expires()), 1)
+        self.assertEqual(self.backend.save(PHONE, 0, {"step": 2}, 1, self.expires()), 2)
+        self.assertEqual(self.backend.load(PHONE, 0), ({"step": 2}, 2))
+
+    def test_stale_save_is_rejected(self):
+        self.backend.save(PHONE, 0, {"step": 1}, 0, self.expires())
+        self.backend.save(PHONE, 0, {"step": 2}, 1, self.expires())
+        with self.assertRaises(sessions.StaleSessionError):
+            self.backend.save(PHONE, 0, {"step": 9}, 1, self.expires())  # Loaded at version 1, now 2
+        self.assertEqual(self.backend.load(PHONE, 0), ({"step": 2}, 2))
+
+    def test_new_session_replaces_expired_one(self):
+        self.backend.save(PHONE, 0, {"step": 5}, 0, self.expires(-60))
+        self.assertIsNone(self.backend.load(PHONE, 0))
+        self.assertEqual(self.backend.save(PHONE, 0, {"step": 0}, 0, self.expires()), 1)
+        self.assertEqual(self.backend.load(PHONE, 0), ({"step": 0}, 1))
+
+    def test_new_session_never_replaces_live_one(self):
+        self.backend.save(PHONE, 0, {"step": 5}, 0, self.expires())
+        with self.assertRaises(sessions.StaleSessionError):
+            self.backend.save(PHONE, 0, {"step": 0}, 0, self.expires())
+        self.assertEqual(self.backend.load(PHONE, 0), ({"step": 5}, 1))
+
+    def test_update_session_reapplies_change_after_conflict(self):
+        sessions.save_session(sessions.ConversationSession(PHONE, 7, fields={"weight": "10"}))
+        calls = []
+
+        def mutate(session):
+            calls.append(session.version)
+            if len(calls) == 1:
+                # Another webhook saves the same conversation between this load and save.
+                other = sessions.load_session(PHONE, 7)
+                other.fields["date"] = "2026-01-05"
+                sessions.save_session(other)
+            session.step += 1
+
+        session = sessions.update_session(PHONE, 7, mutate)
+        self.assertEqual(calls, [1, 2])
+        self.assertEqual((session.version, session.step), (3, 1))
+        self.assertEqual(sessions.load_session(PHONE, 7).fields, {"weight": "10", "date": "2026-01-05"})
+
+    def test_update_session_gives_up_after_retries(self):
+        def always_conflicting(session):
+            other = sessions.load_session(PHONE)
+            sessions.save_session(other)
+
+        with self.assertRaises(sessions.StaleSessionError):
+            sessions.update_session(PHONE, None, always_conflicting, retries=2)
+
+
+class DatabaseBackendTests(SessionBackendTests, TestCase):
+    def make_backend(self):
+        return sessions.DatabaseBackend()
+
+
+class FileBackendTests(SessionBackendTests, TestCase):
+    def make_backend(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        return sessions.FileBackend(directory.name)
+
+
+class LocalBackendTests(SessionBackendTests, TestCase):
+    def make_backend(self):
+        return sessions.LocalBackend()
@@ -0,0 +1,66 @@
+from django.conf import settings
+import threading
+
+
+class TransportError(Exception):
+    """
+    A send failed. `retryable` is False for errors that will never succeed (e.g. an invalid number).
+    """
+
+    def __init__(self, message, retryable=True):
+        super().__init__(message)
+        self.retryable = retryable
+
+
+class TwilioTransport:
+    """
+    Sends through the Twilio REST API with one client, and so one pooled HTTP session, per worker.
+    """
+
+    def __init__(self, account_sid=None, auth_token=None, timeout=None):
+        from twilio.http.http_client import TwilioHttpClient
+        from twilio.rest import Client
+
+        self.client = Client(
+            account_sid or settings.TWILIO_ACCOUNT_SID,
+            auth_token or settings.TWILIO_AUTH_TOKEN,
+            http_client=TwilioHttpClient(
+                pool_connections=True, timeout=timeout or getattr(settings, "WHATSAPP_SEND_TIMEOUT", 10)
+            ),
+        )
+
+    def send(self, to, from_number, body, media_url=None):
+        from twilio.base.exceptions import TwilioRestException
+
+        kwargs = {"from_": f"whatsapp:{from_number}", "to": f"whatsapp:{to}", "body": body}
+        if media_url:
+            kwargs["media_url"] = [media_url]
+        try:
+            return self.client.messages.create(**kwargs).sid
+        except TwilioRestException as exc:
+            # 4xx other than throttling means the request itself is wrong; retrying won't help.
+            retryable = exc.status == 429 or exc.status >= 500
+            raise TransportError(str(exc), retryable=retryable) from exc
+        except Exception as exc:
+            raise TransportError(str(exc)) from exc
+
+
+class FakeTransport:
+    """
+    In-memory transport for tests and local development.
+
+    Records every message in `sent`; `fail_next` makes the next N sends raise.
+    """
+
+    def __init__(self):
+        self.sent = []
+        self.fail_next = 0
+        self._lock = threading.Lock()
+
+    def send(self, to, from_number, body, media_url=None):
+        with self._lock:
+            if self.fail_next:
+                self.fail_next -= 1
+                raise TransportError("Simulated transport failure")
+            self.sent.append({"to": to, "from": from_number, "body": body, "media_url": media_url})
+            return f"FAKE{len(self.sent):06d}"